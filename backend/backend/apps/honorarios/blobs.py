@@ -0,0 +1,275 @@
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from core.storage import BLOB_DIR, ContentAddressedStorage, pdf_storage
+
+from .models import Honorario, Payment, PdfBlob, PdfUpload
+from .previews import PREVIEW_SIZES, preview_name, preview_source
+
+logger = logging.getLogger(__name__)
+
+# Campos que guardan PDFs por contenido; cada fila que apunta a un blob es una referencia
+BLOB_FIELDS = {Honorario: 'honorario', Payment: 'ticket_pdf'}
+# qpdf: 0 = ok, 3 = terminó con advertencias (el archivo de salida sirve)
+OPTIMIZER_OK_CODES = (0, 3)
+# la linealización agrega tablas de hints: se acepta que el archivo crezca hasta un 5%
+OPTIMIZE_MAX_GROWTH = 1.05
+
+
+def stored_name(value):
+    """Nombre guardado de un valor de FileField (str, FieldFile o None)."""
+    name = getattr(value, 'name', value)
+    return name if ContentAddressedStorage.is_blob(name) else None
+
+
+def retain(name):
+    """Suma una referencia al blob `name`; crea su fila la primera vez que se usa."""
+    if not ContentAddressedStorage.is_blob(name):
+        return
+    if PdfBlob.objects.filter(name=name).update(refcount=F('refcount') + 1, released_at=None):
+        return
+    size = pdf_storage().size(name)
+    try:
+        with transaction.atomic():
+            PdfBlob.objects.create(
+                sha256=ContentAddressedStorage.digest(name), name=name, size=size, original_size=size, refcount=1
+            )
+    except IntegrityError:
+        # otro request creó la fila al mismo tiempo
+        PdfBlob.objects.filter(name=name).update(refcount=F('refcount') + 1, released_at=None)
+
+
+def release(name):
+    """Resta una referencia. El archivo no se borra acá: la transacción todavía
+    puede deshacerse y otra subida puede volver a usarlo (ver `collect_garbage`)."""
+    if not ContentAddressedStorage.is_blob(name):
+        return
+    PdfBlob.objects.filter(name=name, refcount__gt=0).update(refcount=F('refcount') - 1)
+    PdfBlob.objects.filter(name=name, refcount=0, released_at=None).update(released_at=timezone.now())
+
+
+def upload_digest(upload):
+    """sha256 de una subida por partes; se calcula antes de `ingest_upload` y sin locks."""
+    return pdf_storage().file_digest(upload.file.path)
+
+
+def ingest_upload(upload, digest=None):
+    """Pasa una subida por partes terminada a su blob; si el contenido ya existía
+    se descarta la copia. Con `digest` sólo renombra el archivo."""
+    extension = os.path.splitext(upload.file.name)[1].lower()
+    upload.file.name = pdf_storage().ingest(upload.file.path, extension, digest)
+
+
+def recount_references():
+    """Recalcula `refcount` desde las filas que apuntan a cada blob.
+
+    Corrige lo que no pasa por los signals (`QuerySet.update`, SQL a mano) y
+    da de alta los blobs que todavía no tienen fila. Devuelve cuántos blobs
+    cambiaron. Conviene correrlo con poca carga: no bloquea las escrituras.
+    """
+    counts = Counter()
+    for model, field in BLOB_FIELDS.items():
+        names = model.objects.filter(**{f'{field}__startswith': BLOB_DIR + '/'}).values_list(field, flat=True)
+        counts.update(names.iterator(chunk_size=5000))
+
+    now = timezone.now()
+    changed = []
+    for blob in PdfBlob.objects.iterator(chunk_size=2000):
+        refcount = counts.pop(blob.name, 0)
+        if refcount != blob.refcount:
+            blob.refcount = refcount
+            blob.released_at = None if refcount else now
+            changed.append(blob)
+    PdfBlob.objects.bulk_update(changed, ['refcount', 'released_at'], batch_size=1000)
+
+    storage = pdf_storage()
+    missing = []
+    for name, refcount in counts.items():
+        if storage.exists(name):
+            size = storage.size(name)
+            missing.append(PdfBlob(
+                sha256=ContentAddressedStorage.digest(name), name=name, size=size, original_size=size, refcount=refcount
+            ))
+        else:
+            logger.warning('Blob %s is referenced by %s rows but the file is missing', name, refcount)
+    PdfBlob.objects.bulk_create(missing, batch_size=1000, ignore_conflicts=True)
+    return len(changed) + len(missing)
+
+
+def collect_garbage(grace=None, dry_run=False, batch_size=1000):
+    """Borra los blobs sin referencias desde hace más de `grace` (`PDF_BLOB_GC_GRACE_HOURS`).
+
+    También borra los archivos de `blobs/` que nunca tuvieron fila (subidas
+    por partes que nadie usó, escrituras cortadas) y las `PdfUpload` que
+    apuntaban a ellos: una subida terminada vence si no se usa en ese plazo.
+    Las vistas previas de cada blob se borran con él.
+    El período de gracia cubre las transacciones en curso; además se respeta
+    el mtime del archivo, que se renueva cada vez que se vuelve a subir el
+    mismo contenido. Devuelve `(archivos, bytes)` liberados.
+    """
+    if grace is None:
+        grace = timedelta(hours=settings.PDF_BLOB_GC_GRACE_HOURS)
+    cutoff = timezone.now() - grace
+    storage = pdf_storage()
+    files = freed = 0
+
+    def expired(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_size if stat.st_mtime < cutoff.timestamp() else None
+
+    def remove(name, path, size):
+        nonlocal files, freed
+        files += 1
+        freed += size
+        if not dry_run:
+            PdfUpload.objects.filter(file=name).delete()
+            os.remove(path)
+            for preview_size in PREVIEW_SIZES:
+                if storage.exists(preview_name(name, preview_size)):
+                    storage.delete(preview_name(name, preview_size))
+
+    last_pk = ''
+    while True:
+        batch = list(
+            PdfBlob.objects.filter(refcount=0, released_at__lt=cutoff, pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', 'name')[:batch_size]
+        )
+        if not batch:
+            break
+        last_pk = batch[-1][0]
+        for pk, name in batch:
+            path = storage.path(name)
+            # se vuelve a evaluar con la fila bloqueada hasta borrar el archivo:
+            # `retain` espera el lock y una nueva subida del mismo contenido
+            # renueva el mtime, así que ninguno de los dos se queda sin archivo
+            with transaction.atomic():
+                blob = PdfBlob.objects.select_for_update().filter(pk=pk, refcount=0)
+                if not blob.exists():
+                    continue
+                size = expired(path)
+                if size is None and os.path.exists(path):
+                    continue
+                if not dry_run:
+                    blob.delete()
+                if size is not None:
+                    remove(name, path, size)
+
+    orphans = {}
+    for directory, _, filenames in os.walk(storage.path(BLOB_DIR)):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            size = expired(path)
+            if size is None:
+                continue
+            name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+            source = preview_source(name)
+            if filename.endswith('.part') or (source and not storage.exists(source)):
+                # copia temporal de una escritura que no terminó o vista previa de un PDF borrado
+                files += 1
+                freed += size
+                if not dry_run:
+                    os.remove(path)
+            elif not source:
+                orphans[name] = (path, size)
+
+    # archivos sin fila: se descartan los que alguna fila usa aunque no se
+    # haya contado (ej. un `update()`); eso lo corrige `recount_references`
+    candidates = list(orphans)
+    for start in range(0, len(candidates), batch_size):
+        names = set(candidates[start:start + batch_size])
+        names -= set(PdfBlob.objects.filter(name__in=names).values_list('name', flat=True))
+        for model, field in BLOB_FIELDS.items():
+            names -= set(model.objects.filter(**{f'{field}__in': names}).values_list(field, flat=True))
+        for name in sorted(names):
+            remove(name, *orphans[name])
+    return files, freed
+
+
+def optimizer_command():
+    binary = shutil.which(settings.PDF_OPTIMIZER)
+    if binary is None:
+        return None
+    return [
+        binary, '--linearize', '--object-streams=generate', '--compress-streams=y',
+        '--recompress-flate', '--compression-level=9',
+    ]
+
+
+def optimize_file(command, source, target, timeout=120):
+    """Recomprime y linealiza `source` en `target`. Devuelve si qpdf terminó bien."""
+    result = subprocess.run([*command, source, target], capture_output=True, timeout=timeout)
+    if result.returncode not in OPTIMIZER_OK_CODES:
+        logger.warning('PDF optimizer failed on %s: %s', source, result.stderr.decode(errors='replace')[-500:])
+        return False
+    return True
+
+
+def optimize_blobs(limit=100):
+    """Recomprime y linealiza (primera página sin leer todo el archivo) los blobs en uso
+    que todavía no se procesaron.
+
+    El blob conserva su nombre (el sha256 del archivo subido, así una nueva
+    subida del mismo original se sigue deduplicando) y se reemplaza con
+    `os.replace`: una descarga en curso termina de leer la versión anterior.
+    Si el resultado no sirve o crece más de `OPTIMIZE_MAX_GROWTH` queda el
+    original. Devuelve `(procesados, bytes ahorrados)`.
+    """
+    command = optimizer_command()
+    if command is None:
+        raise FileNotFoundError(f'PDF optimizer {settings.PDF_OPTIMIZER!r} not found.')
+    storage = pdf_storage()
+    blobs = list(PdfBlob.objects.filter(optimized_at=None, refcount__gt=0).order_by('created_at')[:limit])
+    saved = 0
+    for blob in blobs:
+        path = storage.path(blob.name)
+        size = blob.size
+        handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+        os.close(handle)
+        try:
+            if optimize_file(command, path, temporary) and os.path.getsize(temporary) <= size * OPTIMIZE_MAX_GROWTH:
+                os.chmod(temporary, storage.file_permissions_mode or 0o644)
+                os.replace(temporary, path)
+                saved += size - os.path.getsize(path)
+                size = os.path.getsize(path)
+        except (OSError, subprocess.SubprocessError):
+            logger.exception('Could not optimize blob %s', blob.name)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        PdfBlob.objects.filter(pk=blob.pk).update(size=size, optimized_at=timezone.now())
+    return len(blobs), saved
+
+
+def storage_stats():
+    """Bytes que ocuparían los PDFs con un archivo por fila contra lo que ocupan los blobs."""
+    in_use = PdfBlob.objects.filter(refcount__gt=0)
+    totals = in_use.aggregate(
+        references=Sum('refcount'),
+        logical=Sum(F('original_size') * F('refcount')),
+        original=Sum('original_size'),
+    )
+    stored = PdfBlob.objects.aggregate(stored=Sum('size'))['stored'] or 0
+    logical = totals['logical'] or 0
+    return {
+        'blobs': PdfBlob.objects.count(),
+        'blobs_in_use': in_use.count(),
+        'references': totals['references'] or 0,
+        'logical_bytes': logical,
+        'deduplicated_bytes': logical - (totals['original'] or 0),
+        'stored_bytes': stored,
+        'saved_bytes': logical - stored,
+    }
@@ -0,0 +1,159 @@
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.honorarios.models import Honorario
+from apps.users.models import User
+from core.jwt import CustomTokenObtainPairSerializer
+
+# Endpoints principales para `--main-endpoints`; `{honorario}` es un id existente
+MAIN_ENDPOINTS = (
+    "/api/v1/honorario/?page_size=20",
+    "/api/v1/honorario/?pagination=cursor&page_size=20",
+    "/api/v1/honorario/{honorario}/",
+    "/api/v1/honorario/summary/",
+    "/api/v1/payment/?page_size=20",
+    "/api/v1/clients/?page_size=20",
+    "/api/v1/notifications/unread_count/",
+)
+
+
+async def read_response(reader):
+    """`(status, headers)`; el cuerpo se descarta. `headers["connection"]` es `close` si hay que reconectar."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ValueError("Connection closed")
+    status = int(status_line.split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip().lower()
+        if name.strip().lower() == "etag":
+            # el ETag se reenvía tal cual (distingue mayúsculas)
+            headers["etag-raw"] = value.strip()
+    if status == 304:
+        # un 304 no tiene cuerpo
+        return status, headers
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding") == "chunked":
+        while size := int((await reader.readline()).split(b";")[0], 16):
+            await reader.readexactly(size + 2)
+        await reader.readline()
+    else:
+        await reader.read()
+        headers["connection"] = "close"
+    return status, headers
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de throughput de la API: N clientes concurrentes con conexiones "
+        "keep-alive repiten requests durante `--duration` segundos y se reportan "
+        "req/s, latencias (p50/p95/p99) por endpoint y errores. Sirve para comparar "
+        "el mismo endpoint servido por WSGI (gunicorn) y por ASGI (uvicorn). Con "
+        "`--revalidate` cada cliente repite el ETag que recibió (`If-None-Match`), "
+        "como el navegador al volver a una pantalla, y cuenta los 304."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="*", help="URLs a pedir (se reparten entre los clientes).")
+        parser.add_argument(
+            "--main-endpoints",
+            metavar="BASE_URL",
+            help="Agrega los endpoints principales de la API sobre BASE_URL (ej. http://127.0.0.1:8000).",
+        )
+        parser.add_argument("--concurrency", type=int, default=500)
+        parser.add_argument("--duration", type=float, default=30)
+        parser.add_argument("--username", required=True, help="Usuario con el que se firma el token.")
+        parser.add_argument("--timeout", type=float, default=30)
+        parser.add_argument(
+            "--revalidate", action="store_true", help="Envía `If-None-Match` con el último ETag recibido."
+        )
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"User {options['username']!r} does not exist.")
+        urls = list(options["urls"])
+        if options["main_endpoints"]:
+            honorario = Honorario.objects.order_by("pk").values_list("pk", flat=True).first()
+            if honorario is None:
+                raise CommandError("There are no honorarios, run seed_honorarios first.")
+            base = options["main_endpoints"].rstrip("/")
+            urls += [base + path.format(honorario=honorario) for path in MAIN_ENDPOINTS]
+        if not urls:
+            raise CommandError("Pass at least one URL or --main-endpoints.")
+        token = str(CustomTokenObtainPairSerializer.get_token(user).access_token)
+        asyncio.run(self.run(token, urls, options))
+
+    async def run(self, token, urls, options):
+        latencies = {url: [] for url in urls}
+        not_modified = {url: 0 for url in urls}
+        errors = {}
+        deadline = time.monotonic() + options["duration"]
+
+        async def client(index):
+            url = urls[index % len(urls)]
+            target = urlsplit(url)
+            path = target.path + (f"?{target.query}" if target.query else "")
+            request = (
+                f"GET {path} HTTP/1.1\r\nHost: {target.netloc}\r\n"
+                f"Authorization: Bearer {token}\r\nAccept: application/json\r\n"
+            )
+            etag = None
+            reader = writer = None
+            while time.monotonic() < deadline:
+                started = time.monotonic()
+                try:
+                    if writer is None:
+                        reader, writer = await asyncio.open_connection(target.hostname, target.port or 80)
+                    conditional = f"If-None-Match: {etag}\r\n" if etag else ""
+                    writer.write(f"{request}{conditional}\r\n".encode())
+                    status, headers = await asyncio.wait_for(read_response(reader), options["timeout"])
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as exc:
+                    errors[type(exc).__name__] = errors.get(type(exc).__name__, 0) + 1
+                    if writer is not None:
+                        writer.close()
+                    reader = writer = None
+                    await asyncio.sleep(0.1)
+                    continue
+                if status in (200, 304):
+                    latencies[url].append(time.monotonic() - started)
+                    not_modified[url] += status == 304
+                    if options["revalidate"]:
+                        etag = headers.get("etag-raw")
+                else:
+                    errors[f"HTTP {status} {path}"] = errors.get(f"HTTP {status} {path}", 0) + 1
+                if headers.get("connection") == "close":
+                    writer.close()
+                    reader = writer = None
+            if writer is not None:
+                writer.close()
+
+        started = time.monotonic()
+        await asyncio.gather(*(client(index) for index in range(options["concurrency"])))
+        elapsed = time.monotonic() - started
+
+        total = []
+        for url, values in latencies.items():
+            total.extend(values)
+            target = urlsplit(url)
+            path = target.path + (f"?{target.query}" if target.query else "")
+            revalidated = f"  ({not_modified[url]} x 304)" if options["revalidate"] else ""
+            self.stdout.write(f"{self.describe(values, elapsed)}  {path}{revalidated}")
+        if not total:
+            raise CommandError(f"No successful requests. Errors: {errors}")
+        self.stdout.write(self.style.SUCCESS(f"{self.describe(total, elapsed)}  TOTAL | errores {errors or 0}"))
+
+    def describe(self, values, elapsed):
+        if len(values) < 2:
+            return f"{len(values):>7} req"
+        quantiles = statistics.quantiles(sorted(values), n=100)
+        return (
+            f"{len(values):>7} req {len(values) / elapsed:>8.1f} req/s  p50 {quantiles[49] * 1000:>6.0f} ms  "
+            f"p95 {quantiles[94] * 1000:>6.0f} ms  p99 {quantiles[98] * 1000:>6.0f} ms"
+        )
@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.users.models import User
+from core.jwt import CustomTokenObtainPairSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de la emisión masiva: `--rows` honorarios en un solo POST a `bulk/` "
+        "contra `--single-rows` POST individuales a `/api/v1/honorario/`. Reporta filas/s "
+        "y consultas por fila. Todo corre en una transacción que se revierte al final "
+        "(salvo `--keep`). Reparte las filas entre los clientes de `seed_honorarios`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", required=True, help="Empleado o admin con el que se firma el token.")
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--single-rows", type=int, default=200, help="Filas del recorrido uno por uno.")
+        parser.add_argument("--keep", action="store_true", help="Confirma los honorarios creados.")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"User {options['username']!r} does not exist.")
+        clients = list(User.objects.filter(role="client").values_list("pk", flat=True)[:1000])
+        if not clients:
+            raise CommandError("No clients found; run seed_honorarios first.")
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {CustomTokenObtainPairSerializer.get_token(user).access_token}")
+
+        def rows(count):
+            return [
+                {"title": f"Honorario bench {index}", "amount": "1500.00", "user": clients[index % len(clients)]}
+                for index in range(count)
+            ]
+
+        with transaction.atomic():
+            bulk = self.measure(
+                options["rows"], lambda: client.post("/api/v1/honorario/bulk/", rows(options["rows"]), format="json")
+            )
+            single = self.measure(
+                options["single_rows"],
+                lambda: [client.post("/api/v1/honorario/", row, format="json") for row in rows(options["single_rows"])][-1],
+            )
+            if not options["keep"]:
+                transaction.set_rollback(True)
+
+        self.stdout.write(f"{'':<12} {'filas':>8} {'consultas':>10} {'q/fila':>8} {'tiempo':>10} {'filas/s':>10}")
+        for label, (count, queries, elapsed) in (("bulk/", bulk), ("uno por uno", single)):
+            self.stdout.write(
+                f"{label:<12} {count:>8} {queries:>10} {queries / count:>8.2f} "
+                f"{elapsed:>8.2f} s {count / elapsed:>10.0f}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"bulk/ emite {(bulk[0] / bulk[2]) / (single[0] / single[2]):.0f}x más filas por segundo."
+        ))
+
+    def measure(self, count, run):
+        """`(filas, consultas, segundos)` de `run`, que devuelve la última respuesta."""
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = run()
+            elapsed = time.perf_counter() - started
+        if response.status_code != 201:
+            raise CommandError(f"HTTP {response.status_code}: {response.content[:500]!r}")
+        return count, len(queries), elapsed
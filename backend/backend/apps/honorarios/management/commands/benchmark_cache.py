@@ -0,0 +1,101 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from apps.users.models import User
+from core.jwt import CustomTokenObtainPairSerializer
+
+from ...models import Honorario
+
+# una caché local nueva en cada corrida para que no arranque con hits de otra
+CACHES = {
+    "con caché": {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "benchmark"}},
+    "sin caché": {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+}
+
+
+def api_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {CustomTokenObtainPairSerializer.get_token(user).access_token}")
+    return client
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de la caché de respuestas con una carga de lectura y algunas escrituras: "
+        "listados paginados y detalles de staff y de `--clients` clientes, con "
+        "`--write-ratio` de PATCH a honorarios (invalidan su namespace). Corre la misma "
+        "secuencia con LocMemCache y con DummyCache y reporta req/s, p50, p95 y la tasa de "
+        "hits. Las escrituras reescriben el mismo título. Usa los datos de `seed_honorarios`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", required=True, help="Empleado o admin (lecturas de staff y escrituras).")
+        parser.add_argument("--clients", type=int, default=20)
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--write-ratio", type=float, default=0.05)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        staff = User.objects.filter(username=options["username"], role__in=("admin", "employee")).first()
+        if staff is None:
+            raise CommandError(f"No admin or employee named {options['username']!r}.")
+        clients = list(User.objects.filter(role="client").order_by("pk")[: options["clients"]])
+        if not clients:
+            raise CommandError("No clients found; run seed_honorarios first.")
+        staff_client = api_client(staff)
+        users = [staff_client, *(api_client(client) for client in clients)]
+        honorarios = {
+            client.pk: list(Honorario.objects.filter(user=client).values_list("pk", "title")[:20]) for client in clients
+        }
+
+        # la misma secuencia para las dos corridas
+        rng = random.Random(options["seed"])
+        workload = []
+        for _ in range(options["requests"]):
+            owner = rng.choice(clients)
+            pk, title = rng.choice(honorarios[owner.pk] or [(None, None)])
+            if pk is not None and rng.random() < options["write_ratio"]:
+                workload.append((staff_client, "patch", f"/api/v1/honorario/{pk}/", {"title": title}))
+                continue
+            client = rng.choice((users[0], users[1 + clients.index(owner)]))
+            path = rng.choice((
+                f"/api/v1/honorario/?page={rng.randint(1, 3)}",
+                "/api/v1/payment/",
+                *((f"/api/v1/honorario/{pk}/",) if pk is not None else ()),
+            ))
+            workload.append((client, "get", path, None))
+
+        self.stdout.write(f"{len(workload)} requests, {sum(method == 'patch' for _, method, _, _ in workload)} escrituras")
+        self.stdout.write(f"{'':<10} {'req/s':>8} {'p50':>8} {'p95':>8} {'hits':>7}")
+        for label, caches in CACHES.items():
+            with override_settings(CACHES=caches):
+                rate, p50, p95, hits = self.run(workload)
+            self.stdout.write(f"{label:<10} {rate:>8.0f} {p50:>6.1f}ms {p95:>6.1f}ms {hits:>6.0%}")
+
+    def run(self, workload):
+        """`(req/s, p50 ms, p95 ms, hits / respuestas cacheables)` de la secuencia."""
+        times = []
+        results = {"HIT": 0, "MISS": 0}
+        started = time.perf_counter()
+        for client, method, path, data in workload:
+            request_started = time.perf_counter()
+            response = getattr(client, method)(path, data, format="json") if data else getattr(client, method)(path)
+            times.append(time.perf_counter() - request_started)
+            if response.status_code != 200:
+                raise CommandError(f"{method.upper()} {path} returned HTTP {response.status_code}.")
+            if response.get("X-Cache") in results:
+                results[response["X-Cache"]] += 1
+        elapsed = time.perf_counter() - started
+        cacheable = sum(results.values())
+        percentiles = statistics.quantiles(times, n=20)
+        return (
+            len(workload) / elapsed,
+            statistics.median(times) * 1000,
+            percentiles[-1] * 1000,
+            results["HIT"] / cacheable if cacheable else 0,
+        )
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.honorarios.management.commands.benchmark_api import read_response
+from apps.users.models import User
+from core.jwt import CustomTokenObtainPairSerializer
+
+# lo que pide el dashboard de `admin`/`employee` al cargar
+DASHBOARD_PATHS = (
+    "/api/v1/honorario/?page_size=10",
+    "/api/v1/payment/?page_size=10",
+    "/api/v1/clients/?page_size=10",
+    "/api/v1/notifications/unread_count/",
+    "/api/profile/",
+)
+MODES = ("serie", "paralelo", "batch")
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de latencia de la carga del dashboard: cada carga pide los mismos GET "
+        "en serie por una conexión, en paralelo por una conexión cada uno (como el "
+        "navegador) o en un solo `POST /api/batch/`, y se reporta p50/p95 por modo. "
+        "`--rtt` simula la latencia de la red: se espera ese tiempo por cada ida y vuelta."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("base_url", help="Ej. http://127.0.0.1:8000")
+        parser.add_argument("paths", nargs="*", help=f"GETs de la carga (por defecto {', '.join(DASHBOARD_PATHS)}).")
+        parser.add_argument("--username", required=True, help="Usuario con el que se firma el token.")
+        parser.add_argument("--loads", type=int, default=50, help="Cargas por modo.")
+        parser.add_argument("--concurrency", type=int, default=1, help="Dashboards que cargan a la vez.")
+        parser.add_argument("--rtt", type=float, default=0, help="Milisegundos de ida y vuelta a simular.")
+        parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"User {options['username']!r} does not exist.")
+        token = str(CustomTokenObtainPairSerializer.get_token(user).access_token)
+        target = urlsplit(options["base_url"])
+        paths = options["paths"] or DASHBOARD_PATHS
+        self.stdout.write(f"{len(paths)} GETs por carga, RTT simulado {options['rtt']:.0f} ms")
+        for mode in options["modes"]:
+            latencies, errors = asyncio.run(self.run(mode, target, token, paths, options))
+            if not latencies:
+                raise CommandError(f"No successful loads in mode {mode}. Errors: {errors}")
+            quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+            self.stdout.write(
+                f"{mode:<9} {len(latencies):>5} cargas  p50 {quantiles[49] * 1000:>7.1f} ms  "
+                f"p95 {quantiles[94] * 1000:>7.1f} ms  errores {errors or 0}"
+            )
+
+    async def run(self, mode, target, token, paths, options):
+        rtt = options["rtt"] / 1000
+        head = f"Host: {target.netloc}\r\nAuthorization: Bearer {token}\r\nAccept: application/json\r\n"
+        batch_body = json.dumps({"requests": [{"id": str(index), "path": path} for index, path in enumerate(paths)]})
+        latencies = []
+        errors = {}
+        loads = iter(range(options["loads"]))
+
+        async def fetch(connection, request):
+            """Envía `request` por `connection` (`[reader, writer]`, reconecta si hace falta)."""
+            if connection[1] is None:
+                connection[:] = await asyncio.open_connection(target.hostname, target.port or 80)
+            connection[1].write(request)
+            status, headers = await read_response(connection[0])
+            # la ida y vuelta por la red se suma al tiempo del servidor
+            await asyncio.sleep(rtt)
+            if headers.get("connection") == "close":
+                connection[1].close()
+                connection[:] = [None, None]
+            if status != 200:
+                raise ValueError(f"HTTP {status}")
+            return status
+
+        def get(path):
+            return f"GET {path} HTTP/1.1\r\n{head}\r\n".encode()
+
+        async def dashboard():
+            # conexiones keep-alive: una para serie/batch, una por GET para paralelo
+            connections = [[None, None] for _ in paths]
+            for _ in loads:
+                started = time.monotonic()
+                try:
+                    if mode == "serie":
+                        for path in paths:
+                            await fetch(connections[0], get(path))
+                    elif mode == "paralelo":
+                        await asyncio.gather(*(fetch(connection, get(path)) for connection, path in zip(connections, paths)))
+                    else:
+                        request = (
+                            f"POST /api/batch/ HTTP/1.1\r\n{head}Content-Type: application/json\r\n"
+                            f"Content-Length: {len(batch_body)}\r\n\r\n{batch_body}"
+                        )
+                        await fetch(connections[0], request.encode())
+                except (OSError, asyncio.IncompleteReadError, ValueError) as exc:
+                    errors[str(exc) or type(exc).__name__] = errors.get(str(exc) or type(exc).__name__, 0) + 1
+                    for connection in connections:
+                        if connection[1] is not None:
+                            connection[1].close()
+                        connection[:] = [None, None]
+                    continue
+                latencies.append(time.monotonic() - started)
+            for _, writer in connections:
+                if writer is not None:
+                    writer.close()
+
+        await asyncio.gather(*(dashboard() for _ in range(options["concurrency"])))
+        return latencies, errors
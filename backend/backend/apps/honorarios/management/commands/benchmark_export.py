@@ -0,0 +1,59 @@
+import resource
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIClient
+
+from apps.users.models import User
+from core.jwt import CustomTokenObtainPairSerializer
+
+from ...models import Honorario, Payment
+
+MODELS = {"honorario": Honorario, "payment": Payment}
+
+
+def peak_rss_mb():
+    # en Linux `ru_maxrss` está en KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de `export/` y `export/xlsx/`: descarga el export completo en proceso y "
+        "reporta bytes, tiempo y el pico de RSS antes y después. Con un admin se exportan "
+        "todas las filas; para 1M de filas cargar antes `seed_honorarios --honorarios 1000000`. "
+        "El pico no debería crecer con la cantidad de filas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", required=True, help="Usuario con el que se firma el token.")
+        parser.add_argument("--model", choices=sorted(MODELS), default="honorario")
+        parser.add_argument("--format", choices=("csv", "xlsx"), default="csv")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"User {options['username']!r} does not exist.")
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {CustomTokenObtainPairSerializer.get_token(user).access_token}")
+        rows = MODELS[options["model"]].objects.count()
+        path = f"/api/v1/{options['model']}/export/" + ("xlsx/" if options["format"] == "xlsx" else "")
+
+        # una primera descarga chica deja cargado todo lo que no depende de las filas
+        client.get(f"/api/v1/{options['model']}/", {"page_size": 1})
+        baseline = peak_rss_mb()
+        started = time.perf_counter()
+        response = client.get(path)
+        if response.status_code != 200:
+            raise CommandError(f"{path} returned HTTP {response.status_code}.")
+        size = sum(len(chunk) for chunk in response.streaming_content)
+        elapsed = time.perf_counter() - started
+        peak = peak_rss_mb()
+
+        self.stdout.write(
+            f"{path}: {rows} filas en la tabla, {size / 2**20:.1f} MB en {elapsed:.1f} s "
+            f"({rows / elapsed:.0f} filas/s)"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"RSS pico: {baseline:.1f} MB antes, {peak:.1f} MB después (+{peak - baseline:.1f} MB)."
+        ))
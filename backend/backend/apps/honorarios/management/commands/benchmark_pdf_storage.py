@@ -0,0 +1,122 @@
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+
+from apps.honorarios.blobs import OPTIMIZE_MAX_GROWTH, optimize_file, optimizer_command
+from apps.honorarios.management.commands.seed_honorarios import MONTHS, SERVICES, SURNAMES
+from core.storage import BLOB_DIR, ContentAddressedStorage
+
+
+def synthetic_pdf(rng, pages):
+    """PDF válido con `pages` páginas de texto sin comprimir (como los que genera un ERP)."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for _ in range(pages):
+        lines = [
+            f"({rng.choice(SERVICES)} {rng.choice(MONTHS)} - {rng.choice(SURNAMES)} ${rng.randint(1000, 999999)}) Tj"
+            for _ in range(rng.randint(20, 60))
+        ]
+        stream = ("BT /F1 10 Tf 14 TL 40 800 Td\n" + "\nT*\n".join(lines) + "\nET").encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> "
+            b"/Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids), len(kids)
+    )
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(output)
+
+
+def megabytes(value):
+    return f"{value / 1024 / 1024:8.1f} MB"
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el espacio que ahorra el storage por contenido sobre un corpus sintético: "
+        "plantillas que el estudio adjunta a muchos honorarios, tickets que los clientes "
+        "vuelven a subir y PDFs únicos. Escribe en un directorio temporal (no toca "
+        "MEDIA_ROOT ni la base) y, si está qpdf, mide también la recompresión."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--documents", type=int, default=5000, help="PDFs adjuntados en total.")
+        parser.add_argument("--templates", type=int, default=20, help="PDFs plantilla distintos.")
+        parser.add_argument("--template-share", type=float, default=0.4, help="Fracción de adjuntos que son plantillas.")
+        parser.add_argument("--reupload-share", type=float, default=0.15, help="Fracción de tickets subidos de nuevo.")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        templates = [synthetic_pdf(rng, rng.randint(1, 3)) for _ in range(options["templates"])]
+        uploaded = []
+
+        location = tempfile.mkdtemp(prefix="pdf-storage-")
+        try:
+            storage = ContentAddressedStorage(location=location)
+            started = time.perf_counter()
+            logical = 0
+            for index in range(options["documents"]):
+                draw = rng.random()
+                if draw < options["template_share"]:
+                    content = rng.choice(templates)
+                elif uploaded and draw < options["template_share"] + options["reupload_share"]:
+                    content = rng.choice(uploaded)
+                else:
+                    content = synthetic_pdf(rng, rng.randint(1, 4))
+                    uploaded.append(content)
+                logical += len(content)
+                storage.save(f"honorarios/documento-{index}.pdf", ContentFile(content))
+            elapsed = time.perf_counter() - started
+
+            blobs = [
+                os.path.join(directory, filename)
+                for directory, _, filenames in os.walk(os.path.join(location, BLOB_DIR))
+                for filename in filenames
+            ]
+            stored = sum(os.path.getsize(path) for path in blobs)
+            self.stdout.write(
+                f"{options['documents']} PDFs ({elapsed:.2f}s, {options['documents'] / elapsed:.0f}/s) -> {len(blobs)} blobs"
+            )
+            self.stdout.write(f"  un archivo por subida {megabytes(logical)}")
+            self.stdout.write(
+                f"  por contenido         {megabytes(stored)}  ahorro {megabytes(logical - stored)} "
+                f"({(logical - stored) / logical:.1%})"
+            )
+
+            command = optimizer_command()
+            if command is None:
+                self.stdout.write("  (sin qpdf: no se mide la recompresión)")
+                return
+            optimized = 0
+            started = time.perf_counter()
+            for path in blobs:
+                target = path + ".optimized"
+                size = os.path.getsize(path)
+                if optimize_file(command, path, target) and os.path.getsize(target) <= size * OPTIMIZE_MAX_GROWTH:
+                    size = os.path.getsize(target)
+                optimized += size
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"  + qpdf ({elapsed:.1f}s)       {megabytes(optimized)}  ahorro {megabytes(logical - optimized)} "
+                f"({(logical - optimized) / logical:.1%})"
+            )
+        finally:
+            shutil.rmtree(location, ignore_errors=True)
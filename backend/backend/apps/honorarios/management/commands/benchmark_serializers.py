@@ -0,0 +1,80 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.honorarios.models import Honorario, Payment
+from apps.honorarios.serializers import (
+    HonorarioListSerializer,
+    HonorarioSerializer,
+    PaymentListSerializer,
+    PaymentSerializer,
+)
+from apps.users.models import User
+from apps.users.serializers import UserListSerializer, UserSerializer
+
+# (endpoint, serializer, queryset, query string); el primero de cada endpoint es
+# el serializer completo que usaba el listado antes de los serializers compactos
+CASES = (
+    ("honorario", HonorarioSerializer, Honorario.objects.all(), ""),
+    ("honorario", HonorarioListSerializer, Honorario.objects.all(), ""),
+    ("honorario", HonorarioListSerializer, Honorario.objects.all(), "fields=id,title,amount,status"),
+    ("payment", PaymentSerializer, Payment.objects.all(), ""),
+    ("payment", PaymentListSerializer, Payment.objects.all(), ""),
+    ("payment", PaymentListSerializer, Payment.objects.all(), "fields=id,payment_date,payment_amount"),
+    ("clients", UserSerializer, User.objects.filter(role="client"), ""),
+    ("clients", UserListSerializer, User.objects.filter(role="client"), ""),
+    ("clients", UserListSerializer, User.objects.filter(role="client"), "fields=id,razon_social,cuit"),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de los serializers de listado: por cada endpoint compara el serializer "
+        "completo, el compacto y un `?fields=` y reporta, cada 1000 filas, el tiempo de la "
+        "consulta (con el `only()` que arma la vista), el de serializar y los KB de JSON. "
+        "Usa los datos de `seed_honorarios`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=5, help="Se reporta la mediana de N corridas.")
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        factory = APIRequestFactory()
+        self.stdout.write(f"{'endpoint':<10} {'serializer':<24} {'query string':<38} consulta  serializar    JSON")
+        for endpoint, serializer_class, queryset, query_string in CASES:
+            request = Request(factory.get(f"/api/v1/{endpoint}/", {} if not query_string else dict(
+                [query_string.split("=", 1)]
+            )))
+            context = {"request": request}
+            fields = serializer_class(context=context).fields
+            # los serializers de usuarios no hacían eager loading antes de los listados compactos
+            if serializer_class is not UserSerializer:
+                queryset = serializer_class.setup_eager_loading(queryset, fields=fields)
+            queryset = queryset.order_by("pk")[:rows]
+
+            query_times, serialize_times = [], []
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                objects = list(queryset.all())
+                fetched = time.perf_counter()
+                data = serializer_class(objects, many=True, context=context).data
+                content = JSONRenderer().render(data)
+                finished = time.perf_counter()
+                query_times.append(fetched - started)
+                serialize_times.append(finished - fetched)
+            if not objects:
+                raise CommandError(f"There are no rows for {endpoint}, run seed_honorarios first.")
+
+            scale = 1000 / len(objects)
+            self.stdout.write(
+                f"{endpoint:<10} {serializer_class.__name__:<24} {query_string or '-':<38} "
+                f"{statistics.median(query_times) * scale * 1000:6.1f} ms  "
+                f"{statistics.median(serialize_times) * scale * 1000:7.1f} ms  "
+                f"{len(content) * scale / 1024:6.1f} KB"
+            )
@@ -0,0 +1,96 @@
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from apps.users.models import User
+from core.jwt import CustomTokenObtainPairSerializer
+
+# sin la caché de respuestas: se mide la consulta y no un hit
+NO_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+TOTALS = ("total", "paid", "pending", "overdue")
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de `summary/` contra lo que hacía el dashboard antes: recorrer el "
+        "listado de a `--page-size` filas y sumar los montos en el cliente. Ejecuta los "
+        "dos en proceso (sin red ni caché de respuestas) con el scoping del usuario dado, "
+        "reporta requests, consultas, KB y tiempo, y verifica que los totales coincidan. "
+        "Usa los datos de `seed_honorarios`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", required=True, help="Usuario con el que se firma el token.")
+        parser.add_argument("--page-size", type=int, default=50)
+        parser.add_argument("--repeat", type=int, default=3, help="Se reporta la mediana de N corridas.")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"User {options['username']!r} does not exist.")
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {CustomTokenObtainPairSerializer.get_token(user).access_token}")
+
+        with override_settings(CACHES=NO_CACHE):
+            results = [
+                ("summary/", self.measure(lambda: self.summary(client), options["repeat"])),
+                (
+                    f"listado de a {options['page_size']} + suma",
+                    self.measure(lambda: self.page_and_sum(client, options["page_size"]), options["repeat"]),
+                ),
+            ]
+
+        self.stdout.write(f"{'':<26} requests  consultas       KB     tiempo")
+        for label, (totals, requests, queries, size, elapsed) in results:
+            self.stdout.write(
+                f"{label:<26} {requests:>8} {queries:>10} {size / 1024:>8.1f} {elapsed * 1000:>8.1f} ms"
+            )
+        (summary_totals, *_, summary_time), (paged_totals, *_, paged_time) = (result for _, result in results)
+        if summary_totals != paged_totals:
+            raise CommandError(f"Totals differ: summary {summary_totals}, paged {paged_totals}.")
+        self.stdout.write(self.style.SUCCESS(
+            f"Totales iguales ({', '.join(f'{key} {value}' for key, value in summary_totals.items())}); "
+            f"summary/ es {paged_time / summary_time:.0f}x más rápido."
+        ))
+
+    def measure(self, run, repeat):
+        """`(totales, requests, consultas, bytes, mediana del tiempo)` de `run`."""
+        times = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                totals, requests, size = run()
+                times.append(time.perf_counter() - started)
+        return totals, requests, len(queries), size, statistics.median(times)
+
+    def summary(self, client):
+        response = client.get("/api/v1/honorario/summary/")
+        if response.status_code != 200:
+            raise CommandError(f"summary/ returned HTTP {response.status_code}.")
+        totals = response.data["totals"]
+        return {key: Decimal(totals[key]) for key in TOTALS}, 1, len(response.content)
+
+    def page_and_sum(self, client, page_size):
+        totals = dict.fromkeys(TOTALS, Decimal("0"))
+        requests = size = 0
+        url = f"/api/v1/honorario/?page_size={page_size}"
+        while url:
+            response = client.get(url)
+            if response.status_code != 200:
+                raise CommandError(f"{url} returned HTTP {response.status_code}.")
+            requests += 1
+            size += len(response.content)
+            for row in response.data["results"]:
+                amount, paid = Decimal(row["amount"]), Decimal(row["paid_amount"])
+                totals["total"] += amount
+                totals["paid"] += paid
+                totals["pending"] += amount - paid
+                if row["status"] == "vencido":
+                    totals["overdue"] += amount - paid
+            url = response.data["next"]
+        return totals, requests, size
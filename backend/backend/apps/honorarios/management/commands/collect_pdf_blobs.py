@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.honorarios.blobs import collect_garbage, recount_references, storage_stats
+
+
+def megabytes(value):
+    return f"{value / 1024 / 1024:.1f} MB"
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra los PDFs guardados por contenido que quedaron sin referencias (y las "
+        "subidas terminadas que nadie usó) pasado el período de gracia, y reporta el "
+        "espacio ahorrado. Pensado para cron, ej. `30 3 * * * python manage.py collect_pdf_blobs`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours", type=float, default=settings.PDF_BLOB_GC_GRACE_HOURS,
+            help="Horas sin uso antes de borrar un blob.",
+        )
+        parser.add_argument("--recount", action="store_true", help="Recalcula los refcount antes de recolectar.")
+        parser.add_argument("--dry-run", action="store_true", help="Sólo cuenta, no borra nada.")
+
+    def handle(self, *args, **options):
+        if options["recount"]:
+            self.stdout.write(f"{recount_references()} blobs con refcount corregido.")
+        files, freed = collect_garbage(timedelta(hours=options["grace_hours"]), dry_run=options["dry_run"])
+        verb = "se borrarían" if options["dry_run"] else "borrados"
+        self.stdout.write(self.style.SUCCESS(f"{files} archivos {verb} ({megabytes(freed)})."))
+
+        stats = storage_stats()
+        self.stdout.write(
+            f"{stats['references']} referencias a {stats['blobs_in_use']} blobs en uso ({stats['blobs']} en total): "
+            f"{megabytes(stats['logical_bytes'])} con un archivo por fila, {megabytes(stats['stored_bytes'])} en disco. "
+            f"Ahorro {megabytes(stats['saved_bytes'])} ({megabytes(stats['deduplicated_bytes'])} por deduplicación)."
+        )
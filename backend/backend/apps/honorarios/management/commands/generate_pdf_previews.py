@@ -0,0 +1,85 @@
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.honorarios.blobs import BLOB_FIELDS
+from apps.honorarios.previews import PREVIEW_SIZES, missing_previews, preview_name, rasterizer_command, render_previews
+from core.storage import pdf_storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera en paralelo las vistas previas (miniatura y primera página) de los PDFs "
+        "ya guardados de honorarios y tickets que no las tienen. Los PDFs nuevos las "
+        "reciben de los workers (jobs `pdf_previews`); esto es para el backfill."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count(),
+            help="Procesos de pdftoppm en paralelo.",
+        )
+        parser.add_argument("--force", action="store_true", help="Regenera también las que ya existen.")
+
+    def handle(self, *args, **options):
+        try:
+            command = rasterizer_command()
+        except FileNotFoundError as exc:
+            raise CommandError(str(exc))
+        storage = pdf_storage()
+
+        # cada PDF una vez aunque lo usen varias filas (los blobs se comparten)
+        names = dict.fromkeys(
+            name
+            for model, field in BLOB_FIELDS.items()
+            for name in model.objects.exclude(**{field: ""}).exclude(**{f"{field}__isnull": True})
+            .values_list(field, flat=True).distinct().iterator(chunk_size=5000)
+        )
+        pending = [name for name in names if options["force"] or missing_previews(name, storage)]
+        self.stdout.write(f"{len(names)} PDFs, {len(pending)} sin vistas previas.")
+
+        def render(name):
+            try:
+                return render_previews(name, force=options["force"], command=command), None
+            except (OSError, subprocess.SubprocessError) as exc:
+                return 0, f"{name}: {exc}"
+
+        started = time.monotonic()
+        images = 0
+        errors = []
+        # cada tarea espera a un proceso de pdftoppm: los threads alcanzan para paralelizar
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            for written, error in executor.map(render, pending):
+                images += written
+                if error:
+                    errors.append(error)
+        elapsed = time.monotonic() - started
+
+        for error in errors[:20]:
+            self.stderr.write(error)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{images} imágenes de {len(pending) - len(errors)} PDFs en {elapsed:.1f}s "
+                f"({len(pending) / elapsed if elapsed else 0:.1f} PDFs/s), {len(errors)} con error."
+            )
+        )
+        self.report_sizes(storage, pending)
+
+    def report_sizes(self, storage, names):
+        """Tamaño promedio del PDF contra el de sus vistas previas (lo que baja una lista)."""
+        totals = dict.fromkeys(("pdf", *PREVIEW_SIZES), 0)
+        count = 0
+        for name in names:
+            paths = {"pdf": storage.path(name), **{size: storage.path(preview_name(name, size)) for size in PREVIEW_SIZES}}
+            if not all(os.path.exists(path) for path in paths.values()):
+                continue
+            count += 1
+            for key, path in paths.items():
+                totals[key] += os.path.getsize(path)
+        if count:
+            self.stdout.write(
+                "Promedio: " + ", ".join(f"{key} {total / count / 1024:.1f} KB" for key, total in totals.items())
+            )
@@ -0,0 +1,34 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from apps.honorarios.services import mark_overdue_honorarios
+
+
+class Command(BaseCommand):
+    help = (
+        "Marca como 'vencido' los honorarios pendientes con due_date anterior a hoy "
+        "y notifica a cada cliente afectado. Pensado para correr desde cron, ej. "
+        "`5 0 * * * python manage.py mark_overdue`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--date", type=date.fromisoformat, help="Fecha de corte (YYYY-MM-DD), por defecto hoy.")
+        parser.add_argument("--dry-run", action="store_true", help="Sólo cuenta, no modifica nada.")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        counts = mark_overdue_honorarios(
+            today=options["date"], batch_size=options["batch_size"], dry_run=options["dry_run"]
+        )
+        elapsed = time.monotonic() - started
+        total = sum(counts.values())
+        verb = "vencerían" if options["dry_run"] else "vencidos"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total} honorarios {verb} de {len(counts)} clientes en {elapsed:.2f}s "
+                f"({total / elapsed if elapsed else 0:.0f} filas/s)."
+            )
+        )
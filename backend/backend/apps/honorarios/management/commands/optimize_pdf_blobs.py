@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from apps.honorarios.blobs import optimize_blobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomprime y linealiza con qpdf (`PDF_OPTIMIZER`) los PDFs en uso que todavía "
+        "no se procesaron, para que el visor muestre la primera página sin bajar todo "
+        "el archivo. Es opcional: sin qpdf los PDFs se sirven como se subieron. Corre "
+        "desde cron o como servicio con `--watch`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--watch", type=float, metavar="SECONDS",
+            help="No termina: procesa los blobs nuevos cada SECONDS segundos.",
+        )
+
+    def handle(self, *args, **options):
+        total = saved = 0
+        while True:
+            close_old_connections()
+            try:
+                processed, batch_saved = optimize_blobs(limit=options["batch_size"])
+            except FileNotFoundError as exc:
+                raise CommandError(str(exc))
+            total += processed
+            saved += batch_saved
+            if processed == options["batch_size"]:
+                continue
+            if not options["watch"]:
+                break
+            time.sleep(options["watch"])
+        self.stdout.write(
+            self.style.SUCCESS(f"{total} PDFs optimizados, {saved / 1024 / 1024:.1f} MB ahorrados.")
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.honorarios.services import rebuild_client_balances
+
+
+class Command(BaseCommand):
+    help = "Reconstruye la tabla ClientBalance a partir de los honorarios y pagos de cada cliente."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_client_balances(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{rebuilt} saldos de clientes reconstruidos."))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.honorarios.services import reconcile_paid_amounts
+
+
+class Command(BaseCommand):
+    help = "Recalcula paid_amount y status de los honorarios a partir de la suma de sus pagos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Sólo informa cuántos honorarios tienen el saldo desincronizado.",
+        )
+
+    def handle(self, *args, **options):
+        mismatched = reconcile_paid_amounts(
+            batch_size=options["batch_size"], dry_run=options["dry_run"]
+        )
+        if options["dry_run"]:
+            self.stdout.write(f"{mismatched} honorarios con paid_amount desincronizado.")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{mismatched} honorarios reconciliados."))
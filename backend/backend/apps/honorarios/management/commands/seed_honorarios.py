@@ -0,0 +1,136 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.honorarios.models import Honorario, Payment
+from apps.search.services import rebuild_index
+from apps.users.models import User
+
+# Vocabulario para títulos y razones sociales con la variedad de datos reales (benchmark de búsqueda)
+SERVICES = (
+    "Liquidación de sueldos", "Asesoramiento impositivo", "Balance anual", "Declaración jurada de Ganancias",
+    "Recategorización Monotributo", "Ingresos Brutos convenio multilateral", "Auditoría externa",
+    "Constitución de sociedad", "Certificación de ingresos", "Presentación de IVA", "Bienes Personales",
+    "Alta en AFIP", "Inscripción en IIBB", "Informe de gestión", "Asamblea de accionistas",
+)
+MONTHS = (
+    "enero", "febrero", "marzo", "abril", "mayo", "junio",
+    "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre",
+)
+SURNAMES = (
+    "González", "Rodríguez", "Gómez", "Fernández", "López", "Díaz", "Martínez", "Pérez", "García", "Sánchez",
+    "Romero", "Sosa", "Álvarez", "Torres", "Ruiz", "Ramírez", "Flores", "Acosta", "Benítez", "Medina",
+)
+ACTIVITIES = (
+    "Construcciones", "Agropecuaria", "Transportes", "Distribuidora", "Consultores", "Inversiones",
+    "Logística", "Servicios", "Comercial", "Metalúrgica", "Textil", "Alimentos",
+)
+COMPANY_TYPES = ("S.A.", "S.R.L.", "S.A.S.", "Hnos.")
+
+
+class Command(BaseCommand):
+    help = "Genera clientes, honorarios y pagos sintéticos para pruebas de carga y planes de consulta."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=1000)
+        parser.add_argument("--honorarios", type=int, default=100000)
+        parser.add_argument("--payments", type=int, default=50000)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        batch_size = options["batch_size"]
+        prefix = f"seed{options['seed']}"
+
+        with transaction.atomic():
+            User.objects.bulk_create(
+                [
+                    User(
+                        username=f"{prefix}-client-{i}",
+                        email=f"{prefix}-client-{i}@example.com",
+                        role="client",
+                        razon_social=(
+                            f"{rng.choice(SURNAMES)} {rng.choice(ACTIVITIES)} {rng.choice(COMPANY_TYPES)} {prefix}-{i}"
+                        ),
+                        # único por (seed, i) con el formato XX-XXXXXXXX-X
+                        cuit=f"{rng.choice(('20', '27', '30', '33'))}-{options['seed'] % 100:02d}{i:06d}-{i % 10}",
+                    )
+                    for i in range(options["clients"])
+                ],
+                batch_size=batch_size,
+                ignore_conflicts=True,
+            )
+        client_ids = list(
+            User.objects.filter(username__startswith=f"{prefix}-client-").values_list("id", flat=True)
+        )
+
+        last_honorario = Honorario.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+        today = date.today()
+        statuses = [choice for choice, _ in Honorario.STATUS_CHOICES]
+        created = 0
+        while created < options["honorarios"]:
+            size = min(batch_size, options["honorarios"] - created)
+            Honorario.objects.bulk_create(
+                [
+                    Honorario(
+                        title=(
+                            f"{rng.choice(SERVICES)} {rng.choice(MONTHS)} {rng.randint(2019, 2025)} #{created + i}"
+                        ),
+                        amount=Decimal(rng.randint(1000, 500000)) / 100,
+                        status=rng.choice(statuses),
+                        user_id=rng.choice(client_ids),
+                    )
+                    for i in range(size)
+                ]
+            )
+            created += size
+        # `date` es auto_now_add: se reparte en los últimos años con un UPDATE por lote de días
+        # (el vencimiento queda a 30 días de la emisión)
+        honorario_ids = list(Honorario.objects.filter(user_id__in=client_ids).values_list("id", flat=True))
+        self._spread_dates(Honorario, "date", honorario_ids, today, rng, due_field="due_date")
+
+        methods = [choice for choice, _ in Payment.PAYMENT_METHOD_CHOICES]
+        owners = dict(Honorario.objects.filter(user_id__in=client_ids).values_list("id", "user_id"))
+        created = 0
+        while created < options["payments"]:
+            size = min(batch_size, options["payments"] - created)
+            payments = []
+            for _ in range(size):
+                honorario_id = rng.choice(honorario_ids)
+                payments.append(
+                    Payment(
+                        honorario_id=honorario_id,
+                        user_id=owners[honorario_id],
+                        payment_amount=Decimal(rng.randint(100, 100000)) / 100,
+                        payment_method=rng.choice(methods),
+                    )
+                )
+            Payment.objects.bulk_create(payments)
+            created += size
+        payment_ids = list(Payment.objects.filter(user_id__in=client_ids).values_list("id", flat=True))
+        self._spread_dates(Payment, "payment_date", payment_ids, today, rng)
+
+        # bulk_create no dispara los signals que mantienen el índice de búsqueda
+        rebuild_index("client", User.objects.filter(username__startswith=f"{prefix}-client-"))
+        rebuild_index("honorario", Honorario.objects.filter(pk__gt=last_honorario))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(client_ids)} clientes, {len(honorario_ids)} honorarios, {len(payment_ids)} pagos."
+            )
+        )
+
+    def _spread_dates(self, model, field, ids, today, rng, days=1095, due_field=None, due_days=30):
+        buckets = {}
+        for pk in ids:
+            buckets.setdefault(rng.randrange(days), []).append(pk)
+        for offset, pks in buckets.items():
+            values = {field: today - timedelta(days=offset)}
+            if due_field:
+                values[due_field] = values[field] + timedelta(days=due_days)
+            for start in range(0, len(pks), 5000):
+                model.objects.filter(pk__in=pks[start:start + 5000]).update(**values)
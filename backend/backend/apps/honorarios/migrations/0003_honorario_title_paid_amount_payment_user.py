@@ -0,0 +1,54 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_payment_user(apps, schema_editor):
+    # Los pagos existentes pertenecen al cliente del honorario
+    Payment = apps.get_model('honorarios', 'Payment')
+    Honorario = apps.get_model('honorarios', 'Honorario')
+    Payment.objects.filter(user__isnull=True).update(
+        user=models.Subquery(
+            Honorario.objects.filter(pk=models.OuterRef('honorario_id')).values('user_id')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('honorarios', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='honorario',
+            name='paid_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='honorario',
+            name='title',
+            field=models.TextField(default='', max_length=200),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='honorario',
+            name='status',
+            field=models.CharField(choices=[('pendiente', 'Pendiente'), ('pagado', 'Pagado'), ('vencido', 'Vencido')], default='pendiente', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='user',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(fill_payment_user, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='payment',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('honorarios', '0004_honorario_date_id_idx_payment_date_id_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='honorario',
+            index=models.Index(fields=['status', 'date', 'id'], name='honorario_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='honorario',
+            index=models.Index(fields=['user', 'date', 'id'], name='honorario_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['payment_method', 'payment_date', 'id'], name='payment_method_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['honorario', 'payment_date', 'id'], name='payment_honorario_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['user', 'payment_date', 'id'], name='payment_user_date_idx'),
+        ),
+    ]
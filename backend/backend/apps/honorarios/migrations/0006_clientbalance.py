@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('honorarios', '0005_filter_indexes'),
+        ('users', '0004_alter_user_razon_social'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientBalance',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='balance', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_billed', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_paid', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('outstanding', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('pending_count', models.PositiveIntegerField(default=0)),
+                ('last_payment_date', models.DateField(null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['outstanding'], name='clientbalance_outstanding_idx')],
+            },
+        ),
+    ]
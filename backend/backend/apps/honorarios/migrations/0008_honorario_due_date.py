@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('honorarios', '0007_pdfupload'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='honorario',
+            name='due_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='honorario',
+            index=models.Index(fields=['status', 'due_date', 'id'], name='honorario_status_due_idx'),
+        ),
+    ]
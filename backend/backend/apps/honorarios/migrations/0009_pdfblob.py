@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:50
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('honorarios', '0008_honorario_due_date'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='honorario',
+            name='honorario',
+            field=models.FileField(null=True, storage=core.storage.pdf_storage, upload_to='honorarios/'),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='ticket_pdf',
+            field=models.FileField(null=True, storage=core.storage.pdf_storage, upload_to='tickets/'),
+        ),
+        migrations.CreateModel(
+            name='PdfBlob',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField()),
+                ('original_size', models.PositiveBigIntegerField()),
+                ('refcount', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('released_at', models.DateTimeField(null=True)),
+                ('optimized_at', models.DateTimeField(null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['refcount', 'released_at'], name='pdfblob_gc_idx'), models.Index(fields=['optimized_at', 'refcount'], name='pdfblob_optimize_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('honorarios', '0009_pdfblob'),
+        ('users', '0005_user_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clientbalance',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='honorario',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='honorario',
+            index=models.Index(fields=['updated_at'], name='honorario_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='honorario',
+            index=models.Index(fields=['user', 'updated_at'], name='honorario_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['updated_at'], name='payment_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,150 @@
+import uuid
+
+from django.db import models
+from apps.users.models import User
+from core.storage import pdf_storage
+
+# Modelo para gestionar honorarios y pagos asociados
+class Honorario(models.Model):
+    STATUS_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('pagado', 'Pagado'),
+        ('vencido', 'Vencido'),
+    ]
+
+    id = models.AutoField(primary_key=True, auto_created=True)
+    date = models.DateField(auto_now_add=True)
+    # vencimiento; `manage.py mark_overdue` pasa a 'vencido' los pendientes con fecha anterior a hoy
+    due_date = models.DateField(null=True, blank=True)
+    title = models.TextField(max_length=200)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    paid_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pendiente')
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    honorario = models.FileField(upload_to='honorarios/', storage=pdf_storage, null=True)
+    # última modificación (ETag/Last-Modified de la API); los `update()` masivos la fijan a mano
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # clave compuesta para la paginación por cursor
+            models.Index(fields=['date', 'id'], name='honorario_date_id_idx'),
+            # filtros de HonorarioViewSet (status, user) + ordenamiento por fecha
+            models.Index(fields=['status', 'date', 'id'], name='honorario_status_date_idx'),
+            models.Index(fields=['user', 'date', 'id'], name='honorario_user_date_idx'),
+            # barrido de vencidos (status='pendiente' AND due_date < hoy)
+            models.Index(fields=['status', 'due_date', 'id'], name='honorario_status_due_idx'),
+            # COUNT/MAX(updated_at) de los validadores del listado (staff y por cliente)
+            models.Index(fields=['updated_at'], name='honorario_updated_idx'),
+            models.Index(fields=['user', 'updated_at'], name='honorario_user_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f'Honorario {self.id} - {self.status} - {self.amount}'
+    
+class Payment(models.Model):
+    PAYMENT_METHOD_CHOICES = [
+        ('efectivo', 'Efectivo'),
+        ('transferencia', 'Transferencia'),
+        ('cheque', 'Cheque'),
+    ]
+
+    id = models.AutoField(primary_key=True, auto_created=True)
+    honorario = models.ForeignKey(Honorario, on_delete=models.CASCADE)
+    payment_date = models.DateField(auto_now_add=True)
+    payment_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    payment_method = models.CharField(max_length=15, choices=PAYMENT_METHOD_CHOICES)
+    ticket_pdf = models.FileField(upload_to='tickets/', storage=pdf_storage, null=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['payment_date', 'id'], name='payment_date_id_idx'),
+            # filtros de PaymentViewSet + ordenamiento por fecha de pago
+            models.Index(fields=['payment_method', 'payment_date', 'id'], name='payment_method_date_idx'),
+            models.Index(fields=['honorario', 'payment_date', 'id'], name='payment_honorario_date_idx'),
+            models.Index(fields=['user', 'payment_date', 'id'], name='payment_user_date_idx'),
+            models.Index(fields=['updated_at'], name='payment_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f'Payment {self.id} for Honorario {self.honorario_id} - {self.payment_amount}'
+
+# Saldo desnormalizado por cliente, mantenido en las mismas transacciones que
+# escriben honorarios y pagos (ver services.apply_balance_delta)
+class ClientBalance(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='balance')
+    total_billed = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    outstanding = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    pending_count = models.PositiveIntegerField(default=0)
+    last_payment_date = models.DateField(null=True)
+    # validador (ETag/Last-Modified) del listado de clientes, que depende del
+    # saldo (`conditional_list_related` en ClientViewSet)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # el listado de clientes se filtra y ordena por saldo (ver ClientViewSet)
+            models.Index(fields=['outstanding'], name='clientbalance_outstanding_idx'),
+        ]
+
+    def __str__(self):
+        return f'Balance {self.user_id} - {self.outstanding}'
+
+
+# Subida de PDFs por partes (reanudable). Las partes se escriben en
+# honorarios/ o tickets/ y al completarse el archivo pasa a su blob (ver
+# PdfBlob); luego un honorario o pago la referencia por id.
+class PdfUpload(models.Model):
+    KIND_CHOICES = [
+        ('honorario', 'Honorario'),
+        ('ticket', 'Ticket'),
+    ]
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('writing', 'Writing'),
+        ('complete', 'Complete'),
+        ('rejected', 'Rejected'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='uploading')
+    # cuándo una request tomó la parte en curso (status `writing`)
+    claimed_at = models.DateTimeField(null=True)
+    file = models.FileField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'Upload {self.id} - {self.status} - {self.offset}/{self.size}'
+
+
+# Un PDF guardado por contenido (core.storage.ContentAddressedStorage). El mismo
+# archivo adjunto a varios honorarios/pagos se guarda una vez; `refcount` cuenta
+# las filas que lo usan y lo mantienen los signals (ver blobs.py).
+class PdfBlob(models.Model):
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    name = models.CharField(max_length=255, unique=True)
+    # tamaño en disco (cambia si `optimize_pdf_blobs` lo recomprime) y el subido
+    size = models.PositiveBigIntegerField()
+    original_size = models.PositiveBigIntegerField()
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # cuándo quedó sin referencias; `collect_pdf_blobs` lo borra pasado el período de gracia
+    released_at = models.DateTimeField(null=True)
+    optimized_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['refcount', 'released_at'], name='pdfblob_gc_idx'),
+            models.Index(fields=['optimized_at', 'refcount'], name='pdfblob_optimize_idx'),
+        ]
+
+    def __str__(self):
+        return f'Blob {self.sha256[:12]} - {self.refcount} refs - {self.size}'
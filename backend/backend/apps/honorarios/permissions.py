@@ -0,0 +1,68 @@
+
+from rest_framework import permissions
+
+from core.request_cache import get_cached_object
+
+from .models import Honorario
+
+
+class IsAdminOrEmployee(permissions.BasePermission):
+	"""Permite acceso sólo a usuarios con role 'admin' o 'employee'."""
+
+	def has_permission(self, request, view):
+		return bool(request.user and request.user.is_authenticated and getattr(request.user, "role", None) in ("admin", "employee"))
+
+
+class HonorarioPermission(permissions.BasePermission):
+	"""Permisos para `Honorario`.
+
+	- Lectura: `admin`/`employee` ven todo; `client` ve sólo sus propios honorarios.
+	- Escritura (create/update/delete): sólo `admin` y `employee`.
+	"""
+
+	def has_permission(self, request, view):
+		return bool(request.user and request.user.is_authenticated)
+
+	def has_object_permission(self, request, view, obj):
+		if request.method in permissions.SAFE_METHODS:
+			if getattr(request.user, "role", None) in ("admin", "employee"):
+				return True
+			return obj.user_id == request.user.id
+
+		# Métodos que modifican/eliminen: sólo staff (admin/employee)
+		return getattr(request.user, "role", None) in ("admin", "employee")
+
+
+class PaymentPermission(permissions.BasePermission):
+	"""Permisos para `Payment`.
+
+	- Lectura: `admin`/`employee` ven todo; `client` puede ver pagos relacionados a sus honorarios.
+	- Creación: `client` sólo puede crear pagos para honorarios que le pertenezcan.
+	"""
+
+	def has_permission(self, request, view):
+		user = request.user
+		if not (user and user.is_authenticated):
+			return False
+
+		# Para POST, si es cliente comprobamos que el honorario pertenece al cliente
+		if request.method == "POST" and getattr(user, "role", None) == "client":
+			honorario_id = request.data.get("honorario")
+			if not honorario_id:
+				return False
+			# Queda en la caché del request para el serializer y perform_create
+			try:
+				honorario = get_cached_object(request, Honorario.objects.select_related("user"), honorario_id)
+			except Exception:
+				return False
+			return honorario.user_id == user.id
+
+		return True
+
+	def has_object_permission(self, request, view, obj):
+		# obj es un Payment
+		if getattr(request.user, "role", None) in ("admin", "employee"):
+			return True
+		# PaymentViewSet hace select_related("honorario") en las rutas de detalle
+		return obj.honorario.user_id == request.user.id
+
@@ -0,0 +1,108 @@
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+
+from django.conf import settings
+from django.db.models.fields.files import FieldFile
+from rest_framework.exceptions import NotFound, ValidationError
+
+from apps.notifications.services import enqueue
+from core.storage import pdf_storage
+from core.utils import serve_protected_file
+
+logger = logging.getLogger(__name__)
+
+# Vistas previas de la primera página: lado mayor en píxeles de cada tamaño
+PREVIEW_SIZES = {'thumb': 240, 'page': 1200}
+PREVIEW_QUALITY = 80
+
+
+def preview_name(name, size):
+    """`blobs/ab/cd/abcd….pdf` -> `blobs/ab/cd/abcd….thumb.jpg`: al lado del PDF."""
+    return f'{os.path.splitext(name)[0]}.{size}.jpg'
+
+
+def preview_source(name):
+    """Nombre del PDF de una vista previa, o `None` si `name` no es una vista previa."""
+    for size in PREVIEW_SIZES:
+        suffix = f'.{size}.jpg'
+        if name.endswith(suffix):
+            return name[:-len(suffix)] + '.pdf'
+    return None
+
+
+def missing_previews(name, storage=None):
+    storage = storage or pdf_storage()
+    return [size for size in PREVIEW_SIZES if not storage.exists(preview_name(name, size))]
+
+
+def rasterizer_command():
+    binary = shutil.which(settings.PDF_RASTERIZER)
+    if binary is None:
+        raise FileNotFoundError(f'PDF rasterizer {settings.PDF_RASTERIZER!r} not found.')
+    return [binary, '-f', '1', '-l', '1', '-singlefile', '-jpeg', '-jpegopt', f'quality={PREVIEW_QUALITY}']
+
+
+def render_previews(name, force=False, command=None, timeout=60):
+    """Genera las vistas previas que le faltan al PDF `name`; devuelve cuántas escribió.
+
+    Cada imagen se escribe en un temporal y se mueve con `os.replace`: quien
+    la pide mientras tanto recibe 404 o la imagen completa, nunca una a medias.
+    Si el PDF no existe lanza `FileNotFoundError`.
+    """
+    storage = pdf_storage()
+    command = command or rasterizer_command()
+    source = storage.path(name)
+    if not os.path.exists(source):
+        raise FileNotFoundError(source)
+    sizes = list(PREVIEW_SIZES) if force else missing_previews(name, storage)
+    for size in sizes:
+        # sin raíz de salida pdftoppm escribe la imagen en stdout
+        result = subprocess.run(
+            [*command, '-scale-to', str(PREVIEW_SIZES[size]), source],
+            check=True, capture_output=True, timeout=timeout,
+        )
+        target = storage.path(preview_name(name, size))
+        handle, temporary = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.part')
+        try:
+            with os.fdopen(handle, 'wb') as destination:
+                destination.write(result.stdout)
+            os.chmod(temporary, storage.file_permissions_mode or 0o644)
+            os.replace(temporary, target)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+    return len(sizes)
+
+
+def generate_previews(names):
+    """Handler de los jobs `pdf_previews`: un PDF roto se registra y no reintenta el lote."""
+    command = rasterizer_command()
+    for name in names:
+        try:
+            render_previews(name, command=command)
+        except FileNotFoundError:
+            # el PDF se borró (o lo recolectó collect_pdf_blobs) antes de procesarlo
+            logger.info('Skipping previews of missing PDF %s', name)
+        except (OSError, subprocess.SubprocessError) as exc:
+            logger.warning('Could not render previews of %s: %s', name, exc)
+
+
+def enqueue_previews(name):
+    """Encola las vistas previas de un PDF recién subido (una vez por contenido)."""
+    enqueue('pdf_previews', {'name': name}, idempotency_key=f'pdf_previews:{name}')
+
+
+def preview_response(request, field_file):
+    """Vista previa `?size=thumb|page` (por defecto `page`) de un PDF ya autorizado por la vista."""
+    size = request.query_params.get('size', 'page')
+    if size not in PREVIEW_SIZES:
+        raise ValidationError({'size': f"Must be one of: {', '.join(PREVIEW_SIZES)}."})
+    if not field_file:
+        raise NotFound('There is no file to preview.')
+    preview = FieldFile(field_file.instance, field_file.field, preview_name(field_file.name, size))
+    if not preview.storage.exists(preview.name):
+        raise NotFound('Preview not available yet.')
+    return serve_protected_file(request, preview, filename=f'{size}.jpg')
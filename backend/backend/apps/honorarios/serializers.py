@@ -0,0 +1,138 @@
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+from core.mixins import EagerLoadingSerializerMixin, SparseFieldsetsMixin
+from core.request_cache import RequestCachedPrimaryKeyRelatedField
+from .models import Honorario, Payment, PdfUpload
+
+
+class CompletedUploadField(serializers.PrimaryKeyRelatedField):
+    """Referencia a una subida por partes terminada del mismo usuario."""
+
+    def __init__(self, kind, **kwargs):
+        self.kind = kind
+        kwargs.setdefault('write_only', True)
+        kwargs.setdefault('required', False)
+        super().__init__(**kwargs)
+
+    def get_queryset(self):
+        queryset = PdfUpload.objects.filter(kind=self.kind, status='complete')
+        request = self.context.get('request')
+        if request is not None:
+            queryset = queryset.filter(user_id=request.user.id)
+        return queryset
+
+class PreviewUrlField(serializers.Field):
+    """URL de la vista previa (`thumb` o `page`) del PDF de `file_field`; null si no tiene PDF.
+
+    Las listas muestran la miniatura (unos KB) en lugar de abrir el PDF completo.
+    """
+
+    def __init__(self, file_field, view_name, size, **kwargs):
+        self.file_field = file_field
+        self.view_name = view_name
+        self.size = size
+        # columnas que lee (para `only()`, ver EagerLoadingSerializerMixin); el pk siempre se carga
+        self.source_fields = (file_field,)
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        if not instance.__dict__.get(self.file_field):
+            return None
+        url = reverse(self.view_name, args=[instance.pk], request=self.context.get('request'))
+        return f'{url}?size={self.size}'
+
+# Serializador para el modelo Honorario
+class HonorarioSerializer(SparseFieldsetsMixin, EagerLoadingSerializerMixin, serializers.ModelSerializer):
+    # reutiliza el usuario/honorario que ya cargaron los permisos en este request
+    serializer_related_field = RequestCachedPrimaryKeyRelatedField
+    razon_social = serializers.CharField(source='user.razon_social', read_only=True)
+    # id de una subida por partes terminada, alternativa a enviar el PDF en el request
+    upload = CompletedUploadField(kind='honorario')
+    # vistas previas de la primera página (ver HonorarioViewSet.preview)
+    thumbnail_url = PreviewUrlField('honorario', 'honorario-preview', 'thumb')
+    preview_url = PreviewUrlField('honorario', 'honorario-preview', 'page')
+    class Meta:
+        model = Honorario
+        # incluimos razon_social como campo adicional de solo lectura
+        fields = '__all__'
+        # relaciones que se cargan con JOIN para evitar N+1 al listar
+        select_related = ('user',)
+
+    def validate(self, attrs):
+        upload = attrs.pop('upload', None)
+        if upload is not None:
+            attrs['honorario'] = upload.file
+        return attrs
+
+# Serializador para el modelo Payment
+class PaymentSerializer(SparseFieldsetsMixin, EagerLoadingSerializerMixin, serializers.ModelSerializer):
+    serializer_related_field = RequestCachedPrimaryKeyRelatedField
+    razon_social = serializers.CharField(source='user.razon_social', read_only=True)
+    upload = CompletedUploadField(kind='ticket')
+    thumbnail_url = PreviewUrlField('ticket_pdf', 'payment-preview', 'thumb')
+    preview_url = PreviewUrlField('ticket_pdf', 'payment-preview', 'page')
+    class Meta:
+        model = Payment
+        fields = '__all__'
+        select_related = ('user',)
+
+    def validate(self, attrs):
+        upload = attrs.pop('upload', None)
+        if upload is not None:
+            attrs['ticket_pdf'] = upload.file
+        return attrs
+
+# Listados: sólo las columnas que muestran las tablas (HonorariosList, PaymentList)
+class HonorarioListSerializer(SparseFieldsetsMixin, EagerLoadingSerializerMixin, serializers.ModelSerializer):
+    serializer_related_field = RequestCachedPrimaryKeyRelatedField
+    razon_social = serializers.CharField(source='user.razon_social', read_only=True)
+    thumbnail_url = PreviewUrlField('honorario', 'honorario-preview', 'thumb')
+    class Meta:
+        model = Honorario
+        fields = ('id', 'date', 'due_date', 'title', 'amount', 'paid_amount', 'status', 'user', 'razon_social',
+                  'honorario', 'thumbnail_url')
+        read_only_fields = fields
+        select_related = ('user',)
+
+
+class PaymentListSerializer(SparseFieldsetsMixin, EagerLoadingSerializerMixin, serializers.ModelSerializer):
+    serializer_related_field = RequestCachedPrimaryKeyRelatedField
+    razon_social = serializers.CharField(source='user.razon_social', read_only=True)
+    thumbnail_url = PreviewUrlField('ticket_pdf', 'payment-preview', 'thumb')
+    class Meta:
+        model = Payment
+        fields = ('id', 'payment_date', 'payment_amount', 'payment_method', 'honorario', 'user', 'razon_social',
+                  'ticket_pdf', 'thumbnail_url')
+        read_only_fields = fields
+        select_related = ('user',)
+
+# Fila de la emisión masiva: `user` es el id del cliente y se resuelve en lote
+class HonorarioBulkRowSerializer(HonorarioSerializer):
+    razon_social = None
+    upload = None
+    thumbnail_url = None
+    preview_url = None
+    user = serializers.IntegerField(min_value=1)
+    class Meta(HonorarioSerializer.Meta):
+        fields = ('title', 'amount', 'paid_amount', 'status', 'due_date', 'user')
+
+
+# Serializador para iniciar una subida por partes
+class PdfUploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PdfUpload
+        fields = ('id', 'kind', 'filename', 'size', 'offset', 'status', 'created_at')
+        read_only_fields = ('offset', 'status', 'created_at')
+
+    def validate_filename(self, value):
+        if not value.lower().endswith('.pdf'):
+            raise serializers.ValidationError('File must be a PDF.')
+        return value
+
+    def validate_size(self, value):
+        if value > settings.PDF_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f'File exceeds {settings.PDF_UPLOAD_MAX_SIZE} bytes.')
+        return value
@@ -0,0 +1,506 @@
+from collections import Counter
+from decimal import Decimal
+
+from django.db import transaction
+from django.db import connection
+from rest_framework.exceptions import ValidationError
+from django.db.models import Count, DecimalField, F, Max, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+
+from apps.users.models import User
+from apps.notifications.services import (
+    notify_honorarios_issued,
+    notify_honorarios_overdue,
+    notify_payment_recorded,
+)
+from apps.search.services import rebuild_index
+from core.cache import invalidate
+from core.pagination import keyset_filter
+
+from .models import ClientBalance, Honorario, Payment
+from .serializers import HonorarioBulkRowSerializer
+
+
+def record_payment(serializer):
+    """Registra un pago y actualiza el saldo del honorario en una sola transacción.
+
+    La fila del honorario se bloquea con `select_for_update` antes de sumar el
+    pago, así dos pagos concurrentes sobre el mismo honorario se serializan y no
+    se pierden actualizaciones. Sólo se escriben `paid_amount`, `status` y `updated_at`.
+    """
+    honorario_id = serializer.validated_data["honorario"].pk
+    with transaction.atomic():
+        honorario = (
+            Honorario.objects.select_for_update()
+            .only("id", "amount", "paid_amount", "status", "user")
+            .get(pk=honorario_id)
+        )
+        payment = serializer.save(honorario=honorario)
+        apply_payment_delta(honorario, payment.payment_amount, last_payment_date=payment.payment_date)
+        notify_payment_recorded(payment)
+    return payment
+
+
+def update_payment(serializer):
+    """Edita un pago y corrige `paid_amount`, estado y saldos en la misma transacción.
+
+    Bloquea los honorarios afectados (el del pago y, si se lo mueve, el nuevo)
+    y el pago como `record_payment`: la diferencia de monto se descuenta de uno
+    y se suma al otro sobre filas bloqueadas.
+    """
+    target = serializer.validated_data.get("honorario")
+    with transaction.atomic():
+        payment, honorarios = lock_payment(serializer.instance.pk, target.pk if target else None)
+        previous = honorarios[payment.honorario_id]
+        previous_amount = payment.payment_amount
+        serializer.instance = payment
+        payment = serializer.save(honorario=honorarios[target.pk] if target else previous)
+
+        deltas = {previous.pk: -previous_amount}
+        deltas[payment.honorario_id] = deltas.get(payment.honorario_id, 0) + payment.payment_amount
+        for honorario_id, delta in deltas.items():
+            if delta:
+                apply_payment_delta(honorarios[honorario_id], delta)
+        if previous.user_id != payment.honorario.user_id:
+            # el pago se fue a otro cliente: la última fecha de pago de ambos puede cambiar
+            refresh_last_payment_dates([previous.user_id, payment.honorario.user_id])
+            invalidate("payments", previous.user_id)
+    return payment
+
+
+def delete_payment(payment):
+    """Borra un pago y descuenta su monto del honorario y del saldo del cliente."""
+    with transaction.atomic():
+        payment, honorarios = lock_payment(payment.pk)
+        honorario = honorarios[payment.honorario_id]
+        payment.delete()
+        apply_payment_delta(honorario, -payment.payment_amount)
+        refresh_last_payment_dates([honorario.user_id])
+
+
+def delete_honorario(honorario):
+    """Borra un honorario (y sus pagos, en cascada) y lo descuenta del saldo del cliente.
+
+    La fila se relee bloqueada: un pago confirmado en el medio no queda fuera del saldo.
+    """
+    with transaction.atomic():
+        honorario = Honorario.objects.select_for_update().get(pk=honorario.pk)
+        before = (honorario.user_id, honorario_contribution(honorario))
+        honorario.delete()
+        apply_honorario_change(before, None)
+        refresh_last_payment_dates([honorario.user_id])
+
+
+def lock_payment(payment_id, honorario_id=None):
+    """Bloquea el honorario del pago (y `honorario_id`) y después el pago.
+
+    Los honorarios se toman primero y por pk, el mismo orden que `record_payment`
+    y que el borrado en cascada de un honorario. Devuelve `(pago, {pk: honorario})`.
+    """
+    while True:
+        current = Payment.objects.values_list("honorario", flat=True).get(pk=payment_id)
+        honorarios = {
+            honorario.pk: honorario
+            for honorario in Honorario.objects.select_for_update()
+            .only("id", "amount", "paid_amount", "status", "user")
+            .filter(pk__in={current, honorario_id} - {None})
+            .order_by("pk")
+        }
+        payment = Payment.objects.select_for_update().get(pk=payment_id)
+        if payment.honorario_id == current:
+            payment.honorario = honorarios[current]
+            return payment, honorarios
+        # otro request lo movió de honorario entre las dos lecturas
+
+
+def apply_payment_delta(honorario, amount, last_payment_date=None):
+    """Suma `amount` al `paid_amount` del honorario bloqueado y ajusta su estado y el saldo del cliente."""
+    pending = 0 if honorario.status == "pagado" else 1
+    honorario.paid_amount += amount
+    update_fields = ["paid_amount", "updated_at"]
+    status = settled_status(honorario)
+    if status != honorario.status:
+        honorario.status = status
+        update_fields.append("status")
+    honorario.save(update_fields=update_fields)
+    apply_balance_delta(
+        honorario.user_id,
+        paid=amount,
+        pending=(0 if status == "pagado" else 1) - pending,
+        last_payment_date=last_payment_date,
+    )
+
+
+def update_honorario(serializer):
+    """Edita un honorario sin pisar los pagos que se confirman mientras tanto.
+
+    La fila se relee con `select_for_update` dentro de la transacción y sólo se
+    guardan los campos enviados: `paid_amount` y `status` los mantienen los
+    pagos (`record_payment`), así que se ignoran aunque vengan en el request
+    (el formulario reenvía el objeto entero). Si cambia el monto, el estado se
+    recalcula con el `paid_amount` bloqueado. Devuelve `(honorario, user_id anterior)`.
+    """
+    data = {name: value for name, value in serializer.validated_data.items() if name not in ("paid_amount", "status")}
+    with transaction.atomic():
+        honorario = Honorario.objects.select_for_update().get(pk=serializer.instance.pk)
+        before = (honorario.user_id, honorario_contribution(honorario))
+        for name, value in data.items():
+            setattr(honorario, name, value)
+        update_fields = [*data, "updated_at"]
+        status = settled_status(honorario)
+        if status != honorario.status:
+            honorario.status = status
+            update_fields.append("status")
+        honorario.save(update_fields=update_fields)
+        apply_honorario_change(before, (honorario.user_id, honorario_contribution(honorario)))
+    serializer.instance = honorario
+    return honorario, before[0]
+
+
+def settled_status(honorario):
+    """Estado según lo pagado: `pagado` si cubre el monto; si dejó de cubrirlo vuelve a `pendiente`."""
+    if honorario.paid_amount >= honorario.amount:
+        return "pagado"
+    if honorario.status == "pagado":
+        return "pendiente"
+    return honorario.status
+
+
+def honorario_contribution(honorario):
+    """Lo que un honorario aporta al `ClientBalance` de su cliente."""
+    return {
+        "billed": honorario.amount,
+        "paid": honorario.paid_amount,
+        "pending": 0 if honorario.status == "pagado" else 1,
+    }
+
+
+def apply_balance_delta(user_id, billed=0, paid=0, pending=0, last_payment_date=None):
+    """Suma un delta al saldo del cliente con un `UPDATE` usando `F()`.
+
+    Debe llamarse dentro de la transacción que escribe el honorario/pago. Si el
+    cliente todavía no tiene fila se reconstruye desde sus honorarios.
+    """
+    values = {
+        "total_billed": F("total_billed") + billed,
+        "total_paid": F("total_paid") + paid,
+        "outstanding": F("outstanding") + billed - paid,
+        "pending_count": F("pending_count") + pending,
+        "updated_at": timezone.now(),
+    }
+    if last_payment_date is not None:
+        values["last_payment_date"] = last_payment_date
+    if not ClientBalance.objects.filter(user_id=user_id).update(**values):
+        rebuild_client_balances(user_ids=[user_id])
+    invalidate("users", user_id)
+
+
+def apply_honorario_change(before, after):
+    """Ajusta los saldos tras crear (`before=None`), editar o borrar (`after=None`) un honorario.
+
+    `before`/`after` son tuplas `(user_id, contribución)`.
+    """
+    if before is not None:
+        user_id, contribution = before
+        apply_balance_delta(user_id, **{key: -value for key, value in contribution.items()})
+    if after is not None:
+        user_id, contribution = after
+        apply_balance_delta(user_id, **contribution)
+
+
+def refresh_last_payment_dates(user_ids):
+    """Recalcula `last_payment_date` de esos clientes después de borrar o mover pagos."""
+    last = (
+        Payment.objects.filter(honorario__user_id=OuterRef("user_id"))
+        .order_by("-payment_date")
+        .values("payment_date")[:1]
+    )
+    ClientBalance.objects.filter(user_id__in=user_ids).update(last_payment_date=Subquery(last))
+    invalidate("users", *user_ids)
+
+
+def rebuild_client_balances(user_ids=None, batch_size=1000):
+    """Recalcula `ClientBalance` desde cero para todos los clientes (o `user_ids`).
+
+    Agrega honorarios y pagos por lotes de clientes e inserta/actualiza con un
+    único `bulk_create(update_conflicts=True)` por lote. Devuelve la cantidad de filas.
+    """
+    clients = User.objects.filter(role="client").order_by("pk")
+    if user_ids is not None:
+        clients = clients.filter(pk__in=user_ids)
+    conflict_target = {}
+    if connection.features.supports_update_conflicts_with_target:
+        conflict_target["unique_fields"] = ["user"]
+
+    rebuilt = 0
+    last_id = 0
+    while True:
+        ids = list(clients.filter(pk__gt=last_id).values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            break
+        last_id = ids[-1]
+
+        totals = {
+            row["user"]: row
+            for row in Honorario.objects.filter(user_id__in=ids)
+            .order_by()
+            .values("user")
+            .annotate(
+                billed=Sum("amount"),
+                paid=Sum("paid_amount"),
+                pending=Count("id", filter=~Q(status="pagado")),
+            )
+        }
+        last_payments = dict(
+            Payment.objects.filter(honorario__user_id__in=ids)
+            .order_by()
+            .values("honorario__user")
+            .annotate(last=Max("payment_date"))
+            .values_list("honorario__user", "last")
+        )
+
+        balances = []
+        for user_id in ids:
+            row = totals.get(user_id, {})
+            billed = row.get("billed") or Decimal("0")
+            paid = row.get("paid") or Decimal("0")
+            balances.append(
+                ClientBalance(
+                    user_id=user_id,
+                    total_billed=billed,
+                    total_paid=paid,
+                    outstanding=billed - paid,
+                    pending_count=row.get("pending", 0),
+                    last_payment_date=last_payments.get(user_id),
+                )
+            )
+        ClientBalance.objects.bulk_create(
+            balances,
+            update_conflicts=True,
+            update_fields=[
+                "total_billed", "total_paid", "outstanding", "pending_count", "last_payment_date", "updated_at",
+            ],
+            **conflict_target,
+        )
+        rebuilt += len(balances)
+    if user_ids is None:
+        invalidate("users")
+    elif user_ids:
+        invalidate("users", *user_ids)
+    return rebuilt
+
+
+def reconcile_paid_amounts(batch_size=1000, dry_run=False):
+    """Recalcula `paid_amount` y `status` a partir de la suma de los `Payment`.
+
+    Trabaja por rangos de id con `UPDATE` masivos (sin `save()` por fila) y en
+    la misma transacción de cada lote reconstruye el `ClientBalance` de los
+    clientes afectados. Devuelve la cantidad de honorarios cuyo saldo no coincidía.
+    """
+    paid_total = Coalesce(
+        Subquery(
+            Payment.objects.filter(honorario=OuterRef("pk"))
+            .order_by()
+            .values("honorario")
+            .annotate(total=Sum("payment_amount"))
+            .values("total")
+        ),
+        Value(Decimal("0")),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+
+    mismatched = 0
+    last_id = 0
+    while True:
+        ids = list(
+            Honorario.objects.filter(pk__gt=last_id)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        last_id = ids[-1]
+
+        with transaction.atomic():
+            batch = Honorario.objects.filter(pk__in=ids).annotate(paid_total=paid_total)
+            stale = batch.exclude(paid_amount=F("paid_total"))
+            if dry_run:
+                mismatched += stale.count()
+                continue
+            stale_rows = list(stale.select_for_update().values_list("pk", "user"))
+            if not stale_rows:
+                continue
+            stale_ids = [pk for pk, _ in stale_rows]
+            mismatched += len(stale_ids)
+            # update() no pasa por auto_now: updated_at se fija a mano (ETag de la API)
+            now = timezone.now()
+            Honorario.objects.filter(pk__in=stale_ids).update(paid_amount=paid_total, updated_at=now)
+            Honorario.objects.filter(pk__in=stale_ids, paid_amount__gte=F("amount")).exclude(
+                status="pagado"
+            ).update(status="pagado")
+            Honorario.objects.filter(
+                pk__in=stale_ids, status="pagado", paid_amount__lt=F("amount")
+            ).update(status="pendiente")
+            rebuild_client_balances(user_ids={user_id for _, user_id in stale_rows})
+    if mismatched and not dry_run:
+        invalidate("honorarios")
+    return mismatched
+
+
+def summarize_honorarios(queryset):
+    """Totales de honorarios agrupados por estado, cliente y mes.
+
+    Ejecuta un único `GROUP BY (status, razon_social, mes)` sobre el queryset
+    (ya filtrado por rol) y arma los demás agrupamientos en memoria a partir de
+    esas filas, que son pocas comparadas con la cantidad de honorarios.
+    """
+    rows = (
+        queryset.order_by()
+        .annotate(month=TruncMonth("date"))
+        .values("status", "user", "user__razon_social", "month")
+        .annotate(count=Count("id"), total=Sum("amount"), paid=Sum("paid_amount"))
+    )
+
+    def empty():
+        return {"count": 0, "total": Decimal("0"), "paid": Decimal("0"), "pending": Decimal("0"), "overdue": Decimal("0")}
+
+    def accumulate(bucket, row):
+        pending = row["total"] - row["paid"]
+        bucket["count"] += row["count"]
+        bucket["total"] += row["total"]
+        bucket["paid"] += row["paid"]
+        bucket["pending"] += pending
+        if row["status"] == "vencido":
+            bucket["overdue"] += pending
+
+    totals = empty()
+    by_status, by_client, by_month = {}, {}, {}
+    for row in rows:
+        month = row["month"].strftime("%Y-%m") if row["month"] else None
+        accumulate(totals, row)
+        accumulate(by_status.setdefault(row["status"], empty()), row)
+        accumulate(by_client.setdefault((row["user"], row["user__razon_social"]), empty()), row)
+        accumulate(by_month.setdefault(month, empty()), row)
+
+    def amounts(bucket):
+        # mismos strings con 2 decimales que devuelven los serializers
+        return {key: value if key == "count" else f"{value:.2f}" for key, value in bucket.items()}
+
+    return {
+        "totals": amounts(totals),
+        "by_status": [{"status": key, **amounts(value)} for key, value in sorted(by_status.items())],
+        "by_client": [
+            {"user": user, "razon_social": razon_social, **amounts(value)}
+            for (user, razon_social), value in sorted(
+                by_client.items(), key=lambda item: item[1]["pending"], reverse=True
+            )
+        ],
+        "by_month": [
+            {"month": key, **amounts(value)}
+            for key, value in sorted(by_month.items(), key=lambda item: item[0] or "")
+        ],
+    }
+
+
+def issue_honorarios(rows, batch_size=500):
+    """Emisión masiva de honorarios (cierre de mes).
+
+    Valida cada fila con `HonorarioBulkRowSerializer` (sin consultas por fila),
+    resuelve los clientes con una sola consulta e inserta las filas válidas con
+    `bulk_create` en lotes. Devuelve `(creados, errores)` donde cada error es
+    `{"row": índice, "errors": {...}}`.
+    """
+    row_serializer = HonorarioBulkRowSerializer()
+    errors = []
+    valid = []
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, row_serializer.run_validation(row)))
+        except ValidationError as exc:
+            errors.append({"row": index, "errors": exc.detail})
+
+    user_ids = {data["user"] for _, data in valid}
+    roles = dict(User.objects.filter(pk__in=user_ids).values_list("pk", "role"))
+
+    honorarios = []
+    for index, data in valid:
+        role = roles.get(data["user"])
+        if role is None:
+            # mismo mensaje que el alta individual (PrimaryKeyRelatedField)
+            errors.append({"row": index, "errors": {"user": [f'Invalid pk "{data["user"]}" - object does not exist.']}})
+            continue
+        if role != "client":
+            errors.append({"row": index, "errors": {"user": ["Honorario must be assigned to a client."]}})
+            continue
+        data["user_id"] = data.pop("user")
+        honorarios.append(Honorario(**data))
+
+    with transaction.atomic():
+        # en MySQL bulk_create no devuelve los ids: los nuevos son los posteriores a este
+        last_pk = Honorario.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+        for start in range(0, len(honorarios), batch_size):
+            Honorario.objects.bulk_create(honorarios[start:start + batch_size])
+        user_ids = {honorario.user_id for honorario in honorarios}
+        rebuild_client_balances(user_ids=user_ids)
+        # bulk_create no dispara signals
+        if user_ids:
+            rebuild_index("honorario", Honorario.objects.filter(pk__gt=last_pk, user_id__in=user_ids))
+            invalidate("honorarios", *user_ids)
+            notify_honorarios_issued(Counter(honorario.user_id for honorario in honorarios))
+
+    errors.sort(key=lambda error: error["row"])
+    return len(honorarios), errors
+
+
+def mark_overdue_honorarios(today=None, batch_size=5000, dry_run=False):
+    """Pasa a 'vencido' los honorarios pendientes con `due_date` anterior a `today`.
+
+    Recorre los candidatos por el índice `(status, due_date, id)` con paginación
+    por `(due_date, id)` y por cada lote ejecuta un único `UPDATE` dentro de su
+    propia transacción. Las filas se bloquean con `skip_locked`: un honorario
+    que un pago tiene tomado se saltea (el `UPDATE` vuelve a exigir
+    `status='pendiente'`) y lo levanta la próxima corrida si sigue impago.
+    Al final encola una notificación por cliente afectado.
+    Devuelve un `Counter` `{user_id: honorarios vencidos}`.
+    """
+    # el día en TIME_ZONE, no el del reloj del servidor
+    today = today or timezone.localdate()
+    candidates = Honorario.objects.filter(status="pendiente", due_date__lt=today).order_by("due_date", "pk")
+
+    counts = Counter()
+    cursor = None
+    while True:
+        batch = candidates
+        if cursor is not None:
+            batch = keyset_filter(batch, "due_date", *cursor)
+        rows = list(batch.values_list("due_date", "pk", "user")[:batch_size])
+        if not rows:
+            break
+        cursor = rows[-1][:2]
+        if dry_run:
+            counts.update(user_id for _, _, user_id in rows)
+            continue
+
+        # el rango de due_date del lote acota el plan aunque el motor elija el índice de status
+        in_batch = Q(status="pendiente", due_date__range=(rows[0][0], rows[-1][0]))
+        with transaction.atomic():
+            locked = list(
+                Honorario.objects.select_for_update(skip_locked=True)
+                .filter(in_batch, pk__in=[pk for _, pk, _ in rows])
+                .values_list("pk", "user")
+            )
+            if not locked:
+                continue
+            Honorario.objects.filter(in_batch, pk__in=[pk for pk, _ in locked]).update(
+                status="vencido", updated_at=timezone.now()
+            )
+            batch_counts = Counter(user_id for _, user_id in locked)
+            # update() no dispara signals; 'vencido' sigue contando como pendiente en ClientBalance
+            invalidate("honorarios", *batch_counts)
+        counts.update(batch_counts)
+
+    if counts and not dry_run:
+        with transaction.atomic():
+            notify_honorarios_overdue(counts, today)
+    return counts
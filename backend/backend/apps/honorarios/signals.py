@@ -0,0 +1,52 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core.cache import invalidate
+from .blobs import BLOB_FIELDS, release, retain, stored_name
+from .models import Honorario, Payment
+from .previews import enqueue_previews
+
+
+@receiver([post_save, post_delete], sender=Honorario)
+def invalidate_honorario_cache(sender, instance, **kwargs):
+    invalidate('honorarios', instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Payment)
+def invalidate_payment_cache(sender, instance, **kwargs):
+    # los clientes ven los pagos de sus honorarios
+    invalidate('payments', instance.user_id, instance.honorario.user_id)
+
+
+# Referencias a los PDFs guardados por contenido (PdfBlob.refcount). Se recuerda
+# el blob con el que se cargó la fila para saber cuál soltar al cambiarlo.
+
+@receiver(post_init, sender=Honorario)
+@receiver(post_init, sender=Payment)
+def remember_blob(sender, instance, **kwargs):
+    # sin tocar el descriptor del FileField (crearía un FieldFile por fila)
+    instance._stored_blob = stored_name(instance.__dict__.get(BLOB_FIELDS[sender]))
+
+
+@receiver(post_save, sender=Honorario)
+@receiver(post_save, sender=Payment)
+def update_blob_references(sender, instance, created=False, update_fields=None, **kwargs):
+    field = BLOB_FIELDS[sender]
+    if field not in instance.__dict__ or (update_fields is not None and field not in update_fields):
+        return
+    name = stored_name(instance.__dict__[field])
+    # una fila nueva no soltaba nada aunque se haya creado con un blob
+    previous = None if created else instance._stored_blob
+    if name != previous:
+        retain(name)
+        release(previous)
+        if name:
+            # miniatura y primera página las genera un worker (run_workers)
+            enqueue_previews(name)
+    instance._stored_blob = name
+
+
+@receiver(post_delete, sender=Honorario)
+@receiver(post_delete, sender=Payment)
+def release_blob(sender, instance, **kwargs):
+    release(instance._stored_blob)
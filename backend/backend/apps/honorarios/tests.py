@@ -0,0 +1,1147 @@
+import base64
+import contextvars
+import csv
+import io
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+import zipfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+from xml.etree import ElementTree
+
+from asgiref.sync import iscoroutinefunction
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import viewsets
+from rest_framework.test import APIClient
+
+from apps.notifications.models import Job
+from apps.notifications.tasks import work
+from apps.users.models import User
+from apps.users.views import ClientViewSet, EmployeeViewSet
+from core.async_views import AsyncViewSetMixin
+from core.batch import run_batch
+from core.cache import CachedResponseMixin, invalidate
+from core.conditional import ConditionalGetMixin
+from core.db_router import ReadReplicaMixin
+from core.mixins import ActionSerializerMixin, EagerLoadingViewSetMixin
+from core.jwt import CustomTokenObtainPairSerializer
+from core.utils import serve_protected_file
+
+from .blobs import collect_garbage, upload_digest
+from .models import ClientBalance, Honorario, Payment, PdfBlob, PdfUpload
+from .previews import PREVIEW_SIZES, preview_name
+from .services import mark_overdue_honorarios, rebuild_client_balances, reconcile_paid_amounts
+from .views import HonorarioViewSet, PaymentViewSet, PdfUploadViewSet
+
+
+def api_client(user):
+    """Cliente con un access token real: la autenticación es la de producción (sin consultas)."""
+    client = APIClient()
+    token = CustomTokenObtainPairSerializer.get_token(user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+def create_client(index):
+    return User.objects.create(
+        username=f"client{index}", email=f"client{index}@example.com", role="client",
+        razon_social=f"Cliente {index}", cuit=f"20-{index:08d}-1",
+    )
+
+
+class ListQueryCountTests(TestCase):
+    """Los listados ejecutan las mismas consultas con 1 o 50 filas por página (sin N+1)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username="admin", email="admin@example.com", role="admin")
+        for index in range(50):
+            client = create_client(index)
+            honorario = Honorario.objects.create(title=f"Honorario {index}", amount=100, user=client)
+            Payment.objects.create(honorario=honorario, payment_amount=10, payment_method="efectivo", user=client)
+
+    def setUp(self):
+        # la caché de respuestas no se invalida entre tests (TestCase no ejecuta on_commit)
+        cache.clear()
+        self.api = api_client(self.admin)
+
+    def assertListQueries(self, url, queries, **params):
+        for page_size in (1, 50):
+            with self.subTest(page_size=page_size), self.assertNumQueries(queries):
+                response = self.api.get(url, {**params, "page_size": page_size})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data["results"]), page_size)
+
+    def test_honorario_list(self):
+        # validador del ETag, COUNT de la página y la página con JOIN al cliente
+        self.assertListQueries("/api/v1/honorario/", 3)
+
+    def test_payment_list(self):
+        self.assertListQueries("/api/v1/payment/", 3)
+
+    def test_honorario_cursor_list(self):
+        # en modo cursor no hay COUNT
+        self.assertListQueries("/api/v1/honorario/", 2, pagination="cursor")
+
+
+def encode_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+
+class PaymentPermissionQueryTests(TestCase):
+    """Como cliente, el honorario de un pago se lee una sola vez por request aunque lo
+    necesiten `PaymentPermission`, el serializer y `perform_create` (core.request_cache)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client_user = create_client(1)
+        cls.honorario = Honorario.objects.create(title="Honorario", amount=1000, user=cls.client_user)
+        cls.other_honorario = Honorario.objects.create(title="Ajeno", amount=1000, user=create_client(2))
+        cls.payment = Payment.objects.create(
+            honorario=cls.honorario, payment_amount=10, payment_method="efectivo", user=cls.client_user,
+        )
+        rebuild_client_balances()
+
+    def setUp(self):
+        cache.clear()
+        self.api = api_client(self.client_user)
+
+    def post_payment(self, honorario):
+        return self.api.post(
+            "/api/v1/payment/",
+            {"honorario": honorario.pk, "payment_amount": "10.00", "payment_method": "efectivo", "user": self.client_user.pk},
+            format="json",
+        )
+
+    def test_create(self):
+        # el honorario con su usuario (permiso; el serializer reusa los dos), el lock de
+        # record_payment, INSERT del pago, UPDATE del honorario y del saldo, el job de la
+        # notificación y los savepoints
+        with CaptureQueriesContext(connection) as queries, self.assertNumQueries(10):
+            response = self.post_payment(self.honorario)
+        self.assertEqual(response.status_code, 201)
+        honorario_reads = [query["sql"] for query in queries if query["sql"].startswith('SELECT "honorarios_honorario"')]
+        self.assertEqual(len(honorario_reads), 2)
+        self.assertFalse([query for query in queries if query["sql"].startswith('SELECT "users_user"')])
+
+    def test_create_for_someone_elses_honorario(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.post_payment(self.other_honorario).status_code, 403)
+
+    def test_retrieve(self):
+        # el pago con su honorario: has_object_permission no consulta de nuevo
+        with self.assertNumQueries(1):
+            self.assertEqual(self.api.get(f"/api/v1/payment/{self.payment.pk}/").status_code, 200)
+
+    def test_list(self):
+        # validadores de la respuesta condicional, COUNT y la página
+        with self.assertNumQueries(3):
+            self.assertEqual(self.api.get("/api/v1/payment/").status_code, 200)
+
+
+class CursorPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username="admin", email="admin@example.com", role="admin")
+        client = create_client(1)
+        Honorario.objects.bulk_create(Honorario(title=f"Honorario {index}", amount=100, user=client) for index in range(7))
+
+    def setUp(self):
+        cache.clear()
+        self.api = api_client(self.admin)
+
+    def test_follows_next_links(self):
+        # todas las filas tienen la misma fecha: cada página corta en medio del empate
+        for ordering, descending in (("date", False), ("-date", True)):
+            ids = []
+            url = f"/api/v1/honorario/?pagination=cursor&page_size=3&ordering={ordering}"
+            while url:
+                response = self.api.get(url)
+                self.assertEqual(response.status_code, 200)
+                ids += [row["id"] for row in response.data["results"]]
+                url = response.data["next"]
+            with self.subTest(ordering=ordering):
+                self.assertEqual(ids, sorted(Honorario.objects.values_list("pk", flat=True), reverse=descending))
+
+    def test_follows_next_links_with_search(self):
+        # `search_rank` es una anotación: el token exacto rankea más alto que el prefijo
+        client = create_client(2)
+        for title in ("Alquiler", "Alquileres", "Alquiler", "Alquileres", "Alquiler"):
+            Honorario.objects.create(title=title, amount=100, user=client)
+        expected = [row["id"] for row in self.api.get("/api/v1/honorario/", {"search": "alquiler"}).data["results"]]
+        self.assertEqual(len(expected), 5)
+
+        ids = []
+        url = "/api/v1/honorario/?search=alquiler&pagination=cursor&page_size=2"
+        while url:
+            response = self.api.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [row["id"] for row in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(ids, expected)
+
+    def test_invalid_cursor_is_not_found(self):
+        for cursor in (
+            "not-base64!", encode_cursor(["notadate", 1]), encode_cursor({"a": 1, "b": 2}),
+            encode_cursor([None, "x"]), encode_cursor(["2026-01-01", "x"]), encode_cursor(["2026-01-01"]),
+        ):
+            with self.subTest(cursor=cursor):
+                response = self.api.get("/api/v1/honorario/", {"cursor": cursor})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(str(response.data["detail"]), "Invalid cursor")
+
+    def test_invalid_cursor_in_batch(self):
+        path = f"/api/v1/payment/?cursor={encode_cursor(['notadate', 1])}"
+        response = self.api.post("/api/batch/", {"requests": [{"path": path}, {"path": "/api/profile/"}]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["status"] for item in response.data["responses"]], [404, 200])
+
+
+@unittest.skipUnless(connection.vendor in ("mysql", "sqlite"), "Plans are only parsed for MySQL and SQLite.")
+class FilterIndexTests(TestCase):
+    """Cada filtro de los listados, con su ordenamiento por fecha, usa su índice compuesto."""
+
+    # (viewset, filtro, índice); `user__razon_social` filtra por la tabla de usuarios
+    cases = (
+        (HonorarioViewSet, "status", "honorario_status_date_idx"),
+        (HonorarioViewSet, "user", "honorario_user_date_idx"),
+        (PaymentViewSet, "payment_method", "payment_method_date_idx"),
+        (PaymentViewSet, "payment_date", "payment_date_id_idx"),
+        (PaymentViewSet, "honorario", "payment_honorario_date_idx"),
+        (PaymentViewSet, "user", "payment_user_date_idx"),
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        # con tablas casi vacías MySQL prefiere recorrerlas: se cargan filas suficientes
+        clients = [create_client(index) for index in range(20)]
+        statuses = ("pendiente", "pagado", "vencido")
+        Honorario.objects.bulk_create(
+            Honorario(title=f"Honorario {index}", amount=100, user=clients[index % 20], status=statuses[index % 3])
+            for index in range(2000)
+        )
+        honorarios = list(Honorario.objects.order_by("pk")[:200])
+        methods = ("efectivo", "transferencia", "cheque")
+        Payment.objects.bulk_create(
+            Payment(
+                honorario=honorarios[index % 200], user=honorarios[index % 200].user,
+                payment_amount=10, payment_method=methods[index % 3],
+            )
+            for index in range(2000)
+        )
+        if connection.vendor == "mysql":
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE TABLE {Honorario._meta.db_table}, {Payment._meta.db_table}")
+
+    def used_indexes(self, queryset):
+        table = queryset.model._meta.db_table
+        if connection.vendor == "mysql":
+            keys = []
+
+            def walk(node):
+                if isinstance(node, dict):
+                    if node.get("table_name") == table and node.get("access_type") not in ("ALL", "index"):
+                        keys.append(node.get("key"))
+                    for value in node.values():
+                        walk(value)
+                elif isinstance(node, list):
+                    for value in node:
+                        walk(value)
+
+            walk(json.loads(queryset.explain(format="json")))
+            return keys
+        # SQLite: "SEARCH <tabla> USING [COVERING ]INDEX <índice> (...)"
+        return [
+            line.split(" INDEX ")[1].split()[0]
+            for line in queryset.explain().splitlines()
+            if f"SEARCH {table} " in line and " INDEX " in line
+        ]
+
+    def test_filters_use_composite_indexes(self):
+        for viewset, field, index in self.cases:
+            model = viewset.queryset.model
+            value = model.objects.values_list(field, flat=True).order_by().first()
+            queryset = model.objects.filter(**{field: value}).order_by(*viewset.ordering, "id")[:10]
+            with self.subTest(model=model.__name__, filter=field):
+                self.assertIn(index, self.used_indexes(queryset))
+
+
+class MarkOverdueTests(TestCase):
+    def test_walks_due_date_ties_across_batches(self):
+        client = create_client(1)
+        Honorario.objects.bulk_create(
+            [
+                # tres por día: los lotes de 2 cortan en medio de un empate de due_date
+                *(Honorario(title=f"Vencido {index}", amount=100, user=client, due_date=date(2026, 5, 1 + index // 3))
+                  for index in range(7)),
+                Honorario(title="Vence hoy", amount=100, user=client, due_date=date(2026, 6, 1)),
+                Honorario(title="Pagado", amount=100, user=client, due_date=date(2026, 5, 1), status="pagado"),
+            ]
+        )
+        self.assertEqual(mark_overdue_honorarios(today=date(2026, 6, 1), batch_size=2), {client.pk: 7})
+        self.assertEqual(
+            set(Honorario.objects.filter(status="vencido").values_list("title", flat=True)),
+            {f"Vencido {index}" for index in range(7)},
+        )
+
+    @override_settings(TIME_ZONE="America/Argentina/Buenos_Aires")
+    def test_today_is_the_local_date(self):
+        client = create_client(1)
+        for due_date in (date(2026, 5, 31), date(2026, 6, 1)):
+            Honorario.objects.create(title=f"Vence {due_date}", amount=100, user=client, due_date=due_date)
+        # en UTC ya es 2 de junio; en Buenos Aires todavía es 1
+        now = datetime(2026, 6, 2, 1, 0, tzinfo=dt_timezone.utc)
+        with mock.patch("django.utils.timezone.now", return_value=now):
+            self.assertEqual(mark_overdue_honorarios(), {client.pk: 1})
+        self.assertEqual(Honorario.objects.get(status="vencido").title, "Vence 2026-05-31")
+
+
+class SummaryTests(TestCase):
+    """`summary/`: totales y agrupamientos por estado, cliente y mes, con el scoping por rol."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username="admin", email="admin@example.com", role="admin")
+        cls.clients = [create_client(index) for index in range(2)]
+        rows = (
+            (0, 1000, 400, "pendiente", date(2026, 1, 10)),
+            (0, 500, 500, "pagado", date(2026, 1, 20)),
+            (0, 300, 0, "vencido", date(2026, 2, 5)),
+            (1, 200, 0, "pendiente", date(2026, 2, 10)),
+        )
+        for client, amount, paid_amount, status, day in rows:
+            honorario = Honorario.objects.create(
+                title="Honorario", amount=amount, paid_amount=paid_amount, status=status, user=cls.clients[client]
+            )
+            # `date` es auto_now_add
+            Honorario.objects.filter(pk=honorario.pk).update(date=day)
+
+    def setUp(self):
+        cache.clear()
+
+    def summary(self, user, **params):
+        response = api_client(user).get("/api/v1/honorario/summary/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def amounts(self, count, total, paid, pending, overdue):
+        return {"count": count, "total": total, "paid": paid, "pending": pending, "overdue": overdue}
+
+    def test_groupings(self):
+        data = self.summary(self.admin)
+        self.assertEqual(data["totals"], self.amounts(4, "2000.00", "900.00", "1100.00", "300.00"))
+        self.assertEqual(data["by_status"], [
+            {"status": "pagado", **self.amounts(1, "500.00", "500.00", "0.00", "0.00")},
+            {"status": "pendiente", **self.amounts(2, "1200.00", "400.00", "800.00", "0.00")},
+            {"status": "vencido", **self.amounts(1, "300.00", "0.00", "300.00", "300.00")},
+        ])
+        # los clientes con más saldo pendiente primero
+        self.assertEqual(data["by_client"], [
+            {"user": self.clients[0].pk, "razon_social": "Cliente 0", **self.amounts(3, "1800.00", "900.00", "900.00", "300.00")},
+            {"user": self.clients[1].pk, "razon_social": "Cliente 1", **self.amounts(1, "200.00", "0.00", "200.00", "0.00")},
+        ])
+        self.assertEqual(data["by_month"], [
+            {"month": "2026-01", **self.amounts(2, "1500.00", "900.00", "600.00", "0.00")},
+            {"month": "2026-02", **self.amounts(2, "500.00", "0.00", "500.00", "300.00")},
+        ])
+
+    def test_client_only_sees_its_honorarios(self):
+        data = self.summary(self.clients[1])
+        self.assertEqual(data["totals"], self.amounts(1, "200.00", "0.00", "200.00", "0.00"))
+        self.assertEqual([row["user"] for row in data["by_client"]], [self.clients[1].pk])
+
+    def test_uses_the_list_filters(self):
+        data = self.summary(self.admin, status="pendiente")
+        self.assertEqual(data["totals"], self.amounts(2, "1200.00", "400.00", "800.00", "0.00"))
+        self.assertEqual([row["status"] for row in data["by_status"]], ["pendiente"])
+
+
+class BulkIssueTests(TestCase):
+    """`bulk/` inserta las filas válidas de un lote mixto y reporta los errores por fila."""
+
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create(username="employee", email="employee@example.com", role="employee")
+        self.clients = [create_client(index) for index in range(2)]
+
+    def test_mixed_batch(self):
+        rows = [
+            {"title": "Enero", "amount": "100.00", "user": self.clients[0].pk},
+            {"title": "Sin monto", "user": self.clients[0].pk},
+            {"title": "Sin cliente", "amount": "10.00", "user": 99999},
+            {"title": "Al empleado", "amount": "10.00", "user": self.staff.pk},
+            {"title": "Febrero", "amount": "250.00", "paid_amount": "50.00", "user": self.clients[1].pk},
+            {"title": "Marzo", "amount": "300.00", "user": self.clients[0].pk},
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = api_client(self.staff).post("/api/v1/honorario/bulk/", rows, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 3)
+        errors = {error["row"]: error["errors"] for error in response.data["errors"]}
+        self.assertEqual(sorted(errors), [1, 2, 3])
+        self.assertIn("amount", errors[1])
+        self.assertEqual(errors[2]["user"], ['Invalid pk "99999" - object does not exist.'])
+        self.assertEqual(errors[3]["user"], ["Honorario must be assigned to a client."])
+        self.assertEqual(
+            sorted(Honorario.objects.values_list("title", flat=True)), ["Enero", "Febrero", "Marzo"]
+        )
+
+        balances = {
+            balance.user_id: (balance.total_billed, balance.total_paid, balance.outstanding, balance.pending_count)
+            for balance in ClientBalance.objects.all()
+        }
+        self.assertEqual(balances, {
+            self.clients[0].pk: (Decimal("400"), Decimal("0"), Decimal("400"), 2),
+            self.clients[1].pk: (Decimal("250"), Decimal("50"), Decimal("200"), 1),
+        })
+
+    def test_batch_without_valid_rows(self):
+        response = api_client(self.staff).post("/api/v1/honorario/bulk/", [{"title": "x", "amount": "1", "user": 99999}], format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual((response.data["created"], [error["row"] for error in response.data["errors"]]), (0, [0]))
+
+
+class SparseFieldsetsTests(TestCase):
+    """`?fields=`/`?omit=` recortan la respuesta y también las columnas que se leen."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username="admin", email="admin@example.com", role="admin")
+        cls.honorario = Honorario.objects.create(title="Honorario", amount=100, user=create_client(1))
+
+    def setUp(self):
+        cache.clear()
+        self.api = api_client(self.admin)
+
+    def row_keys(self, **params):
+        response = self.api.get("/api/v1/honorario/", params)
+        self.assertEqual(response.status_code, 200)
+        return set(response.data["results"][0])
+
+    def test_fields_and_omit(self):
+        every = self.row_keys()
+        self.assertEqual(self.row_keys(fields="id,title"), {"id", "title"})
+        # los nombres desconocidos se ignoran
+        self.assertEqual(self.row_keys(fields="id, amount ,nope"), {"id", "amount"})
+        self.assertEqual(self.row_keys(omit="razon_social,thumbnail_url"), every - {"razon_social", "thumbnail_url"})
+        self.assertEqual(self.row_keys(fields="id,title", omit="title"), {"id"})
+        detail = self.api.get(f"/api/v1/honorario/{self.honorario.pk}/", {"fields": "id,status"})
+        self.assertEqual(set(detail.data), {"id", "status"})
+
+    def test_writes_return_every_field(self):
+        response = self.api.patch(f"/api/v1/honorario/{self.honorario.pk}/?fields=id", {"title": "Editado"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("title", response.data)
+        self.assertIn("razon_social", response.data)
+
+    def test_only_reads_the_requested_columns(self):
+        def select(**params):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.api.get("/api/v1/honorario/", params).status_code, 200)
+            # la consulta de la página (las otras son el COUNT y los validadores)
+            [sql] = [query["sql"] for query in queries if query["sql"].startswith('SELECT "honorarios_honorario"."id"')]
+            return sql.split("FROM")[0], sql
+
+        columns, sql = select(fields="id,title")
+        self.assertIn('"honorarios_honorario"."title"', columns)
+        self.assertNotIn('"honorarios_honorario"."amount"', columns)
+        self.assertNotIn('"honorarios_honorario"."honorario"', columns)
+        self.assertNotIn("JOIN", sql)
+
+        # `razon_social` lee el cliente con un JOIN
+        columns, sql = select(fields="id,razon_social")
+        self.assertIn('"users_user"."razon_social"', columns)
+        self.assertNotIn('"honorarios_honorario"."title"', columns)
+
+
+class ExportTests(TestCase):
+    """`export/` y `export/xlsx/` traen todas las filas del scoping en lotes, con los filtros del listado."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.clients = [create_client(index) for index in range(2)]
+        Honorario.objects.bulk_create(
+            Honorario(
+                title=f"Honorario <{index}> & co", amount=100, user=cls.clients[index % 2],
+                status=("pendiente", "pagado")[index % 3 == 0],
+            )
+            for index in range(9)
+        )
+
+    def setUp(self):
+        self.api = api_client(self.clients[0])
+
+    def expected(self, **filters):
+        return list(
+            Honorario.objects.filter(user=self.clients[0], **filters).order_by("pk").values_list("pk", "title")
+        )
+
+    def test_csv(self):
+        with mock.patch.object(HonorarioViewSet, "export_chunk_size", 2):
+            response = self.api.get("/api/v1/honorario/export/", {"status": "pendiente"})
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="honorarios.csv"')
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], list(HonorarioViewSet.export_fields))
+        self.assertEqual([(int(row[0]), row[2]) for row in rows[1:]], self.expected(status="pendiente"))
+
+    def test_queryset_is_built_before_streaming(self):
+        # ReadReplicaMixin fija la base en filter_queryset y la suelta antes de que se envíe el cuerpo
+        for path in ("/api/v1/honorario/export/", "/api/v1/honorario/export/xlsx/"):
+            with self.subTest(path=path), mock.patch.object(
+                HonorarioViewSet, "filter_queryset", side_effect=lambda queryset: queryset
+            ) as filter_queryset:
+                response = self.api.get(path)
+                filter_queryset.assert_called_once()
+                b"".join(response.streaming_content)
+
+    def test_xlsx(self):
+        with mock.patch.object(HonorarioViewSet, "export_chunk_size", 2):
+            response = self.api.get("/api/v1/honorario/export/xlsx/")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="honorarios.xlsx"')
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+        namespace = {"s": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+        sheet = ElementTree.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+        rows = [
+            ["".join(cell.itertext()) for cell in row.findall("s:c", namespace)]
+            for row in sheet.iterfind("s:sheetData/s:row", namespace)
+        ]
+        self.assertEqual(rows[0], list(HonorarioViewSet.export_fields))
+        self.assertEqual([(int(row[0]), row[2]) for row in rows[1:]], self.expected())
+        # los montos son celdas numéricas
+        self.assertEqual(rows[1][3], "100.00")
+
+
+class HonorarioUpdateTests(TestCase):
+    """Editar un honorario no pisa `paid_amount`/`status`, que llevan los pagos."""
+
+    def test_update_keeps_paid_amount(self):
+        staff = User.objects.create(username="employee", email="employee@example.com", role="employee")
+        client = create_client(1)
+        api = api_client(staff)
+        honorario = api.post("/api/v1/honorario/", {"title": "Honorario", "amount": "100.00", "user": client.pk}, format="json").data
+        response = api.post(
+            "/api/v1/payment/",
+            {"honorario": honorario["id"], "payment_amount": "60.00", "payment_method": "efectivo", "user": client.pk},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+
+        # el formulario reenvía el objeto que leyó antes del pago
+        response = api.put(f"/api/v1/honorario/{honorario['id']}/", {**honorario, "title": "Editado"}, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual((response.data["title"], response.data["paid_amount"]), ("Editado", "60.00"))
+
+        # bajar el monto por debajo de lo pagado lo salda
+        response = api.patch(f"/api/v1/honorario/{honorario['id']}/", {"amount": "50.00", "status": "pendiente"}, format="json")
+        self.assertEqual(response.data["status"], "pagado")
+        client.balance.refresh_from_db()
+        self.assertEqual(
+            (client.balance.total_billed, client.balance.total_paid, client.balance.pending_count),
+            (Decimal("50.00"), Decimal("60.00"), 0),
+        )
+
+
+class PaymentLedgerTests(TestCase):
+    """Editar, mover o borrar pagos y honorarios deja `paid_amount` y `ClientBalance` como un recálculo."""
+
+    balance_fields = ("total_billed", "total_paid", "outstanding", "pending_count", "last_payment_date")
+
+    def setUp(self):
+        self.api = api_client(User.objects.create(username="employee", email="employee@example.com", role="employee"))
+        self.clients = [create_client(index) for index in range(2)]
+
+    def create(self, url, data):
+        response = self.api.post(url, data, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.data["id"]
+
+    def pay(self, honorario_id, amount):
+        return self.create(
+            "/api/v1/payment/",
+            {"honorario": honorario_id, "payment_amount": amount, "payment_method": "efectivo", "user": self.clients[0].pk},
+        )
+
+    def assertHonorario(self, pk, paid_amount, status):
+        honorario = Honorario.objects.get(pk=pk)
+        self.assertEqual((honorario.paid_amount, honorario.status), (Decimal(paid_amount), status))
+
+    def assertLedgerConsistent(self):
+        self.assertEqual(reconcile_paid_amounts(dry_run=True), 0)
+        balances = {row[0]: row[1:] for row in ClientBalance.objects.values_list("user", *self.balance_fields)}
+        rebuild_client_balances(user_ids=list(balances))
+        self.assertEqual(
+            balances, {row[0]: row[1:] for row in ClientBalance.objects.values_list("user", *self.balance_fields)}
+        )
+
+    def test_payment_changes_go_through_the_ledger(self):
+        first, second = (
+            self.create("/api/v1/honorario/", {"title": f"Honorario {index}", "amount": "100.00", "user": self.clients[0].pk})
+            for index in range(2)
+        )
+        other = self.create("/api/v1/honorario/", {"title": "Otro", "amount": "100.00", "user": self.clients[1].pk})
+        kept, edited = self.pay(first, "60.00"), self.pay(first, "50.00")
+        self.assertHonorario(first, "110.00", "pagado")
+        self.assertLedgerConsistent()
+
+        response = self.api.patch(f"/api/v1/payment/{edited}/", {"payment_amount": "20.00"}, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertHonorario(first, "80.00", "pendiente")
+        self.assertLedgerConsistent()
+
+        self.api.patch(f"/api/v1/payment/{edited}/", {"honorario": second}, format="json")
+        self.assertHonorario(first, "60.00", "pendiente")
+        self.assertHonorario(second, "20.00", "pendiente")
+        self.assertLedgerConsistent()
+
+        # a otro cliente
+        self.api.patch(f"/api/v1/payment/{edited}/", {"honorario": other, "payment_amount": "100.00"}, format="json")
+        self.assertHonorario(second, "0.00", "pendiente")
+        self.assertHonorario(other, "100.00", "pagado")
+        self.assertLedgerConsistent()
+
+        self.assertEqual(self.api.delete(f"/api/v1/payment/{kept}/").status_code, 204)
+        self.assertHonorario(first, "0.00", "pendiente")
+        self.assertLedgerConsistent()
+        self.assertIsNone(ClientBalance.objects.get(user=self.clients[0]).last_payment_date)
+
+        self.assertEqual(self.api.delete(f"/api/v1/honorario/{other}/").status_code, 204)
+        self.assertLedgerConsistent()
+        self.assertEqual(ClientBalance.objects.get(user=self.clients[1]).total_paid, 0)
+
+    def test_reconcile_rebuilds_balances(self):
+        honorario = self.create("/api/v1/honorario/", {"title": "Honorario", "amount": "100.00", "user": self.clients[0].pk})
+        # un pago cargado por fuera de los servicios (admin, import) no toca paid_amount ni el saldo
+        Payment.objects.create(
+            honorario_id=honorario, payment_amount=100, payment_method="efectivo", user=self.clients[0]
+        )
+
+        self.assertEqual(reconcile_paid_amounts(), 1)
+        self.assertHonorario(honorario, "100.00", "pagado")
+        balance = ClientBalance.objects.get(user=self.clients[0])
+        self.assertEqual((balance.total_paid, balance.pending_count), (Decimal("100.00"), 0))
+        self.assertLedgerConsistent()
+
+
+class AsyncViewTests(SimpleTestCase):
+    """Las rutas de `AsyncViewSetMixin` sólo son corrutinas bajo ASGI y para list/retrieve/create."""
+
+    routes = {
+        "collection": ({"get": "list", "post": "create"}, True),
+        "detail": ({"get": "retrieve", "put": "update", "patch": "partial_update", "delete": "destroy"}, True),
+        "summary": ({"get": "summary"}, False),
+    }
+
+    def assertRoutes(self, server_mode):
+        with override_settings(SERVER_MODE=server_mode):
+            for name, (actions, is_async) in self.routes.items():
+                with self.subTest(server_mode=server_mode, route=name):
+                    view = HonorarioViewSet.as_view(actions)
+                    self.assertEqual(iscoroutinefunction(view), server_mode == "asgi" and is_async)
+
+    def test_wsgi_gets_the_sync_view(self):
+        self.assertRoutes("wsgi")
+
+    def test_asgi_gets_coroutines(self):
+        self.assertRoutes("asgi")
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRoutingTests(TestCase):
+    """Lo recién invalidado se lee de `default`: la réplica atrasada no vuelve a llenar la caché."""
+
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create(username="employee", email="employee@example.com", role="employee")
+        self.clients = [create_client(index) for index in range(2)]
+
+    def read_database(self, user):
+        return HonorarioViewSet(action="list").get_read_database(SimpleNamespace(method="GET", user=user))
+
+    def test_invalidated_scopes_read_from_default(self):
+        self.assertEqual(self.read_database(self.staff), "replica")
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate("honorarios", self.clients[0].pk)
+        self.assertIsNone(self.read_database(self.staff))
+        self.assertIsNone(self.read_database(self.clients[0]))
+        # otro cliente no ve ese cambio: sigue en la réplica
+        self.assertEqual(self.read_database(self.clients[1]), "replica")
+
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate("honorarios")
+        self.assertIsNone(self.read_database(self.clients[1]))
+
+
+class ReadPathViewSetTests(TestCase):
+    """El orden de los mixins de `ReadPathModelViewSet` es parte del comportamiento."""
+
+    order = (
+        ReadReplicaMixin, ConditionalGetMixin, CachedResponseMixin, ActionSerializerMixin,
+        EagerLoadingViewSetMixin, AsyncViewSetMixin, viewsets.ModelViewSet,
+    )
+
+    def test_mixin_order(self):
+        for viewset in (HonorarioViewSet, PaymentViewSet, EmployeeViewSet, ClientViewSet):
+            with self.subTest(viewset=viewset.__name__):
+                self.assertEqual(tuple(cls for cls in viewset.__mro__ if cls in self.order), self.order)
+
+    def test_not_modified_is_answered_before_the_response_cache(self):
+        cache.clear()
+        admin = User.objects.create(username="admin", email="admin@example.com", role="admin")
+        Honorario.objects.create(title="Honorario", amount=100, user=create_client(1))
+        api = api_client(admin)
+
+        api.get("/api/v1/honorario/")
+        hit = api.get("/api/v1/honorario/")
+        self.assertEqual(hit["X-Cache"], "HIT")
+        # los HIT también llevan validadores
+        self.assertIn("ETag", hit)
+
+        not_modified = api.get("/api/v1/honorario/", HTTP_IF_NONE_MATCH=hit["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertNotIn("X-Cache", not_modified)
+
+
+class CacheInvalidationTests(TestCase):
+    """Escribir un pago o un honorario invalida los listados cacheados que lo muestran."""
+
+    lists = {
+        "honorarios": "/api/v1/honorario/",
+        "payments": "/api/v1/payment/",
+        "clients": "/api/v1/clients/",
+    }
+
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create(username="employee", email="employee@example.com", role="employee")
+        self.api = api_client(self.staff)
+        client = create_client(1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.honorario = self.api.post(
+                "/api/v1/honorario/", {"title": "Honorario", "amount": "100.00", "user": client.pk}, format="json"
+            ).data
+            self.payment = self.api.post(
+                "/api/v1/payment/",
+                {"honorario": self.honorario["id"], "payment_amount": "10.00", "payment_method": "efectivo", "user": client.pk},
+                format="json",
+            ).data
+
+    def cache_status(self):
+        return {name: self.api.get(url)["X-Cache"] for name, url in self.lists.items()}
+
+    def assertInvalidates(self, write, expected):
+        self.cache_status()
+        self.assertEqual(self.cache_status(), dict.fromkeys(self.lists, "HIT"))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = write()
+        self.assertLess(response.status_code, 300)
+        self.assertEqual(self.cache_status(), expected)
+
+    def test_payment_write(self):
+        # el pago cambia `paid_amount` del honorario y el saldo del cliente
+        self.assertInvalidates(
+            lambda: self.api.patch(f"/api/v1/payment/{self.payment['id']}/", {"payment_amount": "20.00"}, format="json"),
+            dict.fromkeys(self.lists, "MISS"),
+        )
+
+    def test_honorario_write(self):
+        # cambia el saldo del cliente (namespace `users`, del que dependen los tres)
+        self.assertInvalidates(
+            lambda: self.api.patch(f"/api/v1/honorario/{self.honorario['id']}/", {"amount": "150.00"}, format="json"),
+            dict.fromkeys(self.lists, "MISS"),
+        )
+
+    def test_honorario_delete(self):
+        # sus pagos se borran en cascada
+        self.assertInvalidates(
+            lambda: self.api.delete(f"/api/v1/honorario/{self.honorario['id']}/"),
+            dict.fromkeys(self.lists, "MISS"),
+        )
+
+
+class BatchTests(TestCase):
+    """`api/batch/`: cada sub-request tiene su status y sólo se aceptan las acciones de `batch_actions`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client_user = create_client(1)
+        cls.honorario = Honorario.objects.create(title="Honorario", amount=100, user=cls.client_user)
+        cls.other = Honorario.objects.create(title="Ajeno", amount=100, user=create_client(2))
+
+    def setUp(self):
+        cache.clear()
+        self.api = api_client(self.client_user)
+
+    def post(self, *paths):
+        requests = [{"id": str(index), "path": path} for index, path in enumerate(paths)]
+        return self.api.post("/api/batch/", {"requests": requests}, format="json")
+
+    def test_item_errors_do_not_stop_the_batch(self):
+        response = self.post(
+            f"/api/v1/honorario/{self.honorario.pk}/",
+            "/api/v1/honorario/99999/",
+            f"/api/v1/honorario/{self.other.pk}/",
+            "/api/v1/employees/",
+        )
+        self.assertEqual(response.status_code, 200)
+        responses = response.data["responses"]
+        self.assertEqual([item["id"] for item in responses], ["0", "1", "2", "3"])
+        # un cliente no ve honorarios ajenos ni empleados
+        self.assertEqual([item["status"] for item in responses], [200, 404, 404, 403])
+        self.assertEqual(responses[0]["body"]["title"], "Honorario")
+
+    def test_rejects_paths_that_cannot_be_batched(self):
+        for path, message in (
+            (f"/api/v1/honorario/{self.honorario.pk}/download/", "cannot be batched"),
+            ("/api/v1/nope/", "Unknown path"),
+            ("https://example.com/api/v1/honorario/", "Must be an absolute path"),
+        ):
+            with self.subTest(path=path):
+                response = self.post("/api/v1/honorario/", path)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(message, str(response.data["requests"][1]["path"][0]))
+
+    def test_requires_authentication(self):
+        response = APIClient().post("/api/batch/", {"requests": [{"path": "/api/v1/honorario/"}]}, format="json")
+        self.assertEqual(response.status_code, 401)
+
+
+class BatchContextTests(SimpleTestCase):
+    """En el pool, cada sub-request corre en una copia del contexto del request."""
+
+    def test_subrequests_run_in_a_copy_of_the_context(self):
+        variable = contextvars.ContextVar("variable", default=None)
+        variable.set("request")
+        barrier = threading.Barrier(2, timeout=5)
+
+        def run_subrequest(request, item, in_thread=False):
+            seen = variable.get()
+            variable.set(item["id"])
+            # los dos corren a la vez en threads distintos del pool
+            barrier.wait()
+            return {"id": item["id"], "seen": seen, "set": variable.get()}
+
+        with override_settings(BATCH_MAX_WORKERS=2), mock.patch("core.batch.run_subrequest", run_subrequest):
+            responses = run_batch(None, [{"id": "a"}, {"id": "b"}])
+        self.assertEqual(responses, [
+            {"id": "a", "seen": "request", "set": "a"},
+            {"id": "b", "seen": "request", "set": "b"},
+        ])
+        self.assertEqual(variable.get(), "request")
+
+
+class ConcurrentPaymentTests(TransactionTestCase):
+    """Pagos simultáneos sobre un mismo honorario: ninguno se pierde (`record_payment` bloquea la fila)."""
+
+    threads = 8
+    payments_per_thread = 5
+
+    def test_concurrent_payments(self):
+        staff = User.objects.create(username="employee", email="employee@example.com", role="employee")
+        client = create_client(1)
+        honorario = Honorario.objects.create(title="Honorario", amount=1000, user=client)
+        errors = []
+        start = threading.Barrier(self.threads)
+
+        def pay():
+            api = api_client(staff)
+            try:
+                start.wait()
+                for _ in range(self.payments_per_thread):
+                    response = api.post(
+                        "/api/v1/payment/",
+                        {"honorario": honorario.pk, "payment_amount": "10.00", "payment_method": "efectivo", "user": client.pk},
+                        format="json",
+                    )
+                    if response.status_code != 201:
+                        errors.append(response.content)
+            except Exception as exc:
+                errors.append(repr(exc))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=pay) for _ in range(self.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        honorario.refresh_from_db()
+        payments = self.threads * self.payments_per_thread
+        self.assertEqual(Payment.objects.filter(honorario=honorario).count(), payments)
+        self.assertEqual(honorario.paid_amount, Decimal("10.00") * payments)
+        self.assertEqual(client.balance.total_paid, Decimal("10.00") * payments)
+
+
+class PdfUploadChunkTests(TransactionTestCase):
+    """`uploads/{id}/chunk/`: el cuerpo se escribe fuera de toda transacción y la parte
+    en curso queda reclamada (`writing`) hasta que se avanza el offset."""
+
+    body = b"%PDF-1.4\n" + b"x" * 1000
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.staff = User.objects.create(username="employee", email="employee@example.com", role="employee")
+        self.api = api_client(self.staff)
+        response = self.api.post(
+            "/api/v1/uploads/", {"kind": "honorario", "filename": "big.pdf", "size": len(self.body)}, format="json"
+        )
+        self.upload_id = response.json()["id"]
+
+    def put(self, start, end, data=None):
+        return self.api.put(
+            f"/api/v1/uploads/{self.upload_id}/chunk/",
+            self.body[start:end + 1] if data is None else data,
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes {start}-{end}/{len(self.body)}",
+        )
+
+    def test_chunks_are_written_outside_transactions(self):
+        write_chunk = PdfUploadViewSet.write_chunk
+        seen = []
+
+        def spy(view, upload, *args):
+            seen.append((connection.in_atomic_block, PdfUpload.objects.get(pk=upload.pk).status))
+            return write_chunk(view, upload, *args)
+
+        def digest_spy(upload):
+            seen.append((connection.in_atomic_block, "digest"))
+            return upload_digest(upload)
+
+        with mock.patch.object(PdfUploadViewSet, "write_chunk", spy):
+            with mock.patch("apps.honorarios.views.upload_digest", digest_spy):
+                self.assertEqual(self.put(0, 499).json()["offset"], 500)
+                response = self.put(500, len(self.body) - 1)
+
+        # el último chunk hashea el archivo completo también fuera del lock
+        self.assertEqual(seen, [(False, "writing"), (False, "writing"), (False, "digest")])
+        self.assertEqual(response.json()["status"], "complete")
+        upload = PdfUpload.objects.get(pk=self.upload_id)
+        self.assertEqual(upload.offset, len(self.body))
+        with upload.file.open("rb") as stored:
+            self.assertEqual(stored.read(), self.body)
+
+    def test_chunk_in_progress_conflicts_until_its_claim_expires(self):
+        PdfUpload.objects.filter(pk=self.upload_id).update(status="writing", claimed_at=timezone.now())
+        self.assertEqual(self.put(0, 499).status_code, 409)
+
+        stale = timezone.now() - PdfUploadViewSet.claim_timeout - timedelta(seconds=1)
+        PdfUpload.objects.filter(pk=self.upload_id).update(claimed_at=stale)
+        response = self.put(0, 499)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()["offset"], response.json()["status"]), (500, "uploading"))
+
+    def test_failed_chunk_releases_the_claim(self):
+        with mock.patch.object(PdfUploadViewSet, "write_chunk", side_effect=OSError("connection reset")):
+            with self.assertRaises(OSError):
+                self.put(0, 499)
+        upload = PdfUpload.objects.get(pk=self.upload_id)
+        self.assertEqual((upload.status, upload.offset), ("uploading", 0))
+        self.assertEqual(self.put(0, 499).json()["offset"], 500)
+
+    def test_non_pdf_is_rejected(self):
+        response = self.put(0, 9, data=b"NOTPDF0000")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(PdfUpload.objects.get(pk=self.upload_id).status, "rejected")
+
+
+class ProtectedFileTests(SimpleTestCase):
+    """`serve_protected_file`: rangos, validadores y delegación al proxy."""
+
+    body = bytes(range(256)) * 4
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = f"{directory}/abcd.pdf"
+        with open(path, "wb") as handle:
+            handle.write(self.body)
+        self.field_file = SimpleNamespace(name="blobs/ab/cd/abcd.pdf", path=path)
+        self.factory = RequestFactory()
+
+    def get(self, **headers):
+        response = serve_protected_file(self.factory.get("/", headers=headers), self.field_file, filename="ticket.pdf")
+        self.addCleanup(response.close)
+        return response
+
+    def content(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_range(self):
+        size = len(self.body)
+        for header, start, end in (("bytes=10-19", 10, 19), ("bytes=1000-", 1000, size - 1), ("bytes=-24", size - 24, size - 1)):
+            with self.subTest(header=header):
+                response = self.get(Range=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response["Content-Range"], f"bytes {start}-{end}/{size}")
+                self.assertEqual(response["Content-Length"], str(end - start + 1))
+                self.assertEqual(self.content(response), self.body[start:end + 1])
+
+    def test_unsatisfiable_range(self):
+        for header in (f"bytes={len(self.body)}-", "bytes=-0"):
+            with self.subTest(header=header):
+                response = self.get(Range=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response["Content-Range"], f"bytes */{len(self.body)}")
+
+    def test_invalid_or_stale_range_returns_the_whole_file(self):
+        etag = self.get()["ETag"]
+        for headers in ({"Range": "bytes=20-10"}, {"Range": "bytes=-"}, {"Range": "bytes=0-9", "If-Range": '"stale"'}):
+            with self.subTest(headers=headers):
+                response = self.get(**headers)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(self.content(response), self.body)
+        self.assertEqual(self.get(Range="bytes=0-9", **{"If-Range": etag}).status_code, 206)
+
+    def test_not_modified(self):
+        response = self.get()
+        self.assertEqual(response["Content-Disposition"], "inline; filename*=UTF-8''ticket.pdf")
+        self.assertEqual(self.get(**{"If-None-Match": response["ETag"]}).status_code, 304)
+        self.assertEqual(self.get(**{"If-Modified-Since": response["Last-Modified"]}).status_code, 304)
+        self.assertEqual(self.get(**{"If-None-Match": '"other"'}).status_code, 200)
+
+    def test_proxy_headers(self):
+        with override_settings(PROTECTED_MEDIA_SERVER="nginx", PROTECTED_MEDIA_INTERNAL_URL="/protected-media/"):
+            response = self.get(Range="bytes=0-9")
+            self.assertEqual(response["X-Accel-Redirect"], "/protected-media/blobs/ab/cd/abcd.pdf")
+        with override_settings(PROTECTED_MEDIA_SERVER="apache"):
+            response = self.get()
+            self.assertEqual(response["X-Sendfile"], self.field_file.path)
+        # el rango y los validadores los resuelve el proxy
+        self.assertEqual((response.status_code, response.content), (200, b""))
+        self.assertEqual(response["Content-Type"], "application/pdf")
+
+
+class BlobReferenceTests(TestCase):
+    """PDFs guardados por contenido: un archivo por contenido, `refcount` por fila
+    y recolección pasado el período de gracia."""
+
+    pdf = b"%PDF-1.4\n" + b"y" * 100
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client_user = create_client(1)
+
+    def create(self, content=None):
+        return Honorario.objects.create(
+            title="Honorario", amount=100, user=self.client_user, honorario=SimpleUploadedFile("h.pdf", content or self.pdf)
+        )
+
+    def test_same_content_is_stored_once(self):
+        first, second = self.create(), self.create()
+        self.assertEqual(first.honorario.name, second.honorario.name)
+        self.assertEqual(os.listdir(os.path.dirname(first.honorario.path)), [os.path.basename(first.honorario.name)])
+        blob = PdfBlob.objects.get()
+        self.assertEqual((blob.name, blob.refcount, blob.size), (first.honorario.name, 2, len(self.pdf)))
+
+    def test_refcount_follows_the_rows(self):
+        first, second = self.create(), self.create()
+        shared = first.honorario.name
+        first.delete()
+        self.assertEqual(PdfBlob.objects.get(name=shared).refcount, 1)
+
+        second.honorario = SimpleUploadedFile("h.pdf", self.pdf + b"z")
+        second.save()
+        blobs = {blob.name: (blob.refcount, blob.released_at is not None) for blob in PdfBlob.objects.all()}
+        self.assertEqual(blobs, {shared: (0, True), second.honorario.name: (1, False)})
+
+    def test_garbage_is_collected_after_the_grace_period(self):
+        honorario = self.create()
+        path = honorario.honorario.path
+        honorario.delete()
+        grace = timedelta(hours=1)
+        self.assertEqual(collect_garbage(grace), (0, 0))
+        self.assertTrue(os.path.exists(path))
+
+        # la fila sin referencias y el archivo quedan fuera del período de gracia
+        PdfBlob.objects.update(released_at=timezone.now() - 2 * grace)
+        self.assertEqual(collect_garbage(grace), (0, 0))
+        expired = time.time() - 2 * grace.total_seconds()
+        os.utime(path, (expired, expired))
+        self.assertEqual(collect_garbage(grace, dry_run=True), (1, len(self.pdf)))
+        self.assertTrue(PdfBlob.objects.exists())
+        self.assertEqual(collect_garbage(grace), (1, len(self.pdf)))
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(PdfBlob.objects.exists())
+
+
+class PreviewTests(TestCase):
+    """Vistas previas de la primera página: las genera el job `pdf_previews` con `pdftoppm`."""
+
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client_user = create_client(1)
+        self.api = api_client(self.client_user)
+        self.honorario = Honorario.objects.create(
+            title="Honorario", amount=100, user=self.client_user, honorario=SimpleUploadedFile("h.pdf", b"%PDF-1.4\n")
+        )
+
+    def rasterize(self, command, **kwargs):
+        # pdftoppm sin raíz de salida escribe el JPEG en stdout
+        return subprocess.CompletedProcess(command, 0, stdout=f"jpeg {command[command.index('-scale-to') + 1]}".encode())
+
+    def test_previews_are_rendered_by_the_job(self):
+        with mock.patch("apps.honorarios.previews.shutil.which", return_value="/usr/bin/pdftoppm"), \
+                mock.patch("apps.honorarios.previews.subprocess.run", side_effect=self.rasterize) as run:
+            self.assertEqual(work("test"), 1)
+        self.assertEqual(run.call_count, len(PREVIEW_SIZES))
+        self.assertEqual(Job.objects.get().status, "done")
+
+        for size, pixels in PREVIEW_SIZES.items():
+            with self.subTest(size=size):
+                response = self.api.get(f"/api/v1/honorario/{self.honorario.pk}/preview/", {"size": size})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response["Content-Type"], "image/jpeg")
+                self.assertEqual(b"".join(response.streaming_content), f"jpeg {pixels}".encode())
+
+        url = f"http://testserver/api/v1/honorario/{self.honorario.pk}/preview/"
+        self.assertEqual(self.api.get("/api/v1/honorario/").data["results"][0]["thumbnail_url"], f"{url}?size=thumb")
+        self.assertEqual(self.api.get(f"/api/v1/honorario/{self.honorario.pk}/").data["preview_url"], f"{url}?size=page")
+
+    def test_missing_rasterizer(self):
+        with mock.patch("apps.honorarios.previews.shutil.which", return_value=None):
+            with self.assertLogs("apps.notifications.tasks", "ERROR"):
+                work("test")
+        # el job se reintenta (ej. cuando se instale poppler) y la vista previa todavía no existe
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), ("pending", 1))
+        self.assertIn("PDF rasterizer 'pdftoppm' not found.", job.last_error)
+        pdf = self.honorario.honorario
+        self.assertFalse(pdf.storage.exists(preview_name(pdf.name, "thumb")))
+        response = self.api.get(f"/api/v1/honorario/{self.honorario.pk}/preview/", {"size": "thumb"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_without_pdf(self):
+        honorario = Honorario.objects.create(title="Sin PDF", amount=100, user=self.client_user)
+        self.assertIsNone(self.api.get(f"/api/v1/honorario/{honorario.pk}/").data["thumbnail_url"])
+        self.assertEqual(self.api.get(f"/api/v1/honorario/{honorario.pk}/preview/").status_code, 404)
+        self.assertEqual(self.api.get(f"/api/v1/honorario/{self.honorario.pk}/preview/", {"size": "huge"}).status_code, 400)
@@ -0,0 +1,10 @@
+from rest_framework.routers import DefaultRouter
+from . import views
+from django.urls import path, include
+
+router = DefaultRouter()
+router.register(r'v1/honorario', views.HonorarioViewSet, basename='honorario')
+router.register(r'v1/payment', views.PaymentViewSet, basename='payment')
+router.register(r'v1/uploads', views.PdfUploadViewSet, basename='upload')
+
+urlpatterns = router.urls
\ No newline at end of file
@@ -0,0 +1,405 @@
+import csv
+import io
+import os
+import re
+from datetime import timedelta
+
+from rest_framework import mixins, viewsets, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from rest_framework.filters import OrderingFilter
+from django_filters.rest_framework import DjangoFilterBackend
+from django.db import transaction
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, NotFound, ValidationError
+from drf_spectacular.utils import extend_schema
+
+from .blobs import ingest_upload, upload_digest
+from .models import Honorario, Payment, PdfUpload
+from .previews import preview_response
+from .serializers import (
+	HonorarioListSerializer,
+	HonorarioSerializer,
+	PaymentListSerializer,
+	PaymentSerializer,
+	PdfUploadSerializer,
+)
+from .permissions import HonorarioPermission, PaymentPermission
+from .services import (
+	apply_honorario_change,
+	delete_honorario,
+	delete_payment,
+	honorario_contribution,
+	issue_honorarios,
+	record_payment,
+	summarize_honorarios,
+	update_honorario,
+	update_payment,
+)
+from apps.notifications.services import notify_honorario_created
+from apps.search.filters import IndexedSearchFilter
+from core.cache import invalidate
+from core.mixins import ExportMixin
+from core.pagination import OptionalCursorPagination
+from core.parsers import ChunkParser
+from core.utils import serve_protected_file
+from core.viewsets import ReadPathModelViewSet
+
+@extend_schema(tags=["Honorarios"])
+class HonorarioViewSet(ExportMixin, ReadPathModelViewSet):
+	"""CRUD para Honorario.
+
+	- `admin` y `employee` pueden listar/crear/actualizar/eliminar honorarios.
+	- `client` sólo puede ver sus propios honorarios.
+	- El campo `honorario` acepta subida (PDF) usando multipart/form-data.
+	- `summary/`, `bulk/`, `export/`, `{id}/download/` y `{id}/preview/` (ver cada acción).
+	"""
+	queryset = Honorario.objects.all()
+	serializer_class = HonorarioSerializer
+	action_serializer_classes = {"list": HonorarioListSerializer}
+	permission_classes = (IsAuthenticated, HonorarioPermission)
+	parser_classes = (MultiPartParser, FormParser, JSONParser)
+	filter_backends = (DjangoFilterBackend, OrderingFilter, IndexedSearchFilter)
+	filterset_fields = ("status", "user", "user__razon_social")
+	search_kind = "honorario"
+	ordering_fields = ("date",)
+	ordering = ("date",)
+	pagination_class = OptionalCursorPagination
+	bulk_max_rows = 20000
+	cache_namespaces = ("honorarios", "users")
+	export_fields = ("id", "date", "title", "amount", "paid_amount", "status", "user", "user__razon_social")
+	export_filename = "honorarios"
+	replica_actions = ("list", "retrieve", "summary", "export", "export_xlsx")
+	batch_actions = ("list", "retrieve", "summary")
+
+	def get_queryset(self):
+		user = self.request.user
+		if user.role in ("admin", "employee"):
+			return Honorario.objects.all()
+		return Honorario.objects.filter(user_id=user.id)
+
+	def perform_create(self, serializer):
+		user = self.request.user
+		if user.role not in ("admin", "employee"):
+			raise PermissionDenied("Only admin or employee can create honorarios.")
+
+		target_user = serializer.validated_data.get("user")
+		if target_user and getattr(target_user, "role", None) != "client":
+			raise PermissionDenied("Honorario must be assigned to a client.")
+
+		honorario_file = serializer.validated_data.get("honorario")
+		if honorario_file and not honorario_file.name.lower().endswith(".pdf"):
+			raise PermissionDenied("Honorario file must be a PDF.")
+
+		with transaction.atomic():
+			honorario = serializer.save()
+			apply_honorario_change(None, (honorario.user_id, honorario_contribution(honorario)))
+			# la notificación al cliente la entrega un worker (run_workers)
+			notify_honorario_created(honorario)
+
+	def perform_update(self, serializer):
+		user = self.request.user
+		if user.role not in ("admin", "employee"):
+			raise PermissionDenied("Only admin or employee can update honorarios.")
+
+		honorario_file = serializer.validated_data.get("honorario")
+		if honorario_file and not honorario_file.name.lower().endswith(".pdf"):
+			raise PermissionDenied("Honorario file must be a PDF.")
+
+		# relee la fila bloqueada y guarda sólo los campos enviados (ver update_honorario)
+		honorario, previous_user_id = update_honorario(serializer)
+		if previous_user_id != honorario.user_id:
+			# el cliente anterior no debe seguir viendo el honorario ni sus pagos cacheados
+			invalidate("honorarios", previous_user_id)
+			invalidate("payments", previous_user_id)
+
+	def destroy(self, request, *args, **kwargs):
+		user = request.user
+		if user.role not in ("admin", "employee"):
+			raise PermissionDenied("Only admin or employee can delete honorarios.")
+		return super().destroy(request, *args, **kwargs)
+
+	def perform_destroy(self, instance):
+		# relee la fila bloqueada antes de descontarla del saldo (ver delete_honorario)
+		delete_honorario(instance)
+
+	@action(detail=False, methods=["get"])
+	def summary(self, request):
+		"""Totales, pagado, pendiente y vencido por estado, cliente y mes.
+
+		Respeta el scoping por rol de `get_queryset` y los mismos filtros del listado.
+		"""
+		queryset = self.filter_queryset(self.get_queryset())
+		return Response(summarize_honorarios(queryset))
+
+	@action(detail=False, methods=["post"])
+	def bulk(self, request):
+		"""Emisión masiva de honorarios.
+
+		Acepta una lista JSON (o `{"honorarios": [...]}`) o un CSV en el campo
+		`file` con columnas `title,amount,user[,paid_amount,status,due_date]`. Inserta las
+		filas válidas y devuelve un reporte de errores por fila.
+		"""
+		if request.user.role not in ("admin", "employee"):
+			raise PermissionDenied("Only admin or employee can create honorarios.")
+
+		upload = request.FILES.get("file")
+		if upload is not None:
+			content = upload.read().decode("utf-8-sig")
+			rows = [{key: value for key, value in row.items() if value != ""} for row in csv.DictReader(io.StringIO(content))]
+		elif isinstance(request.data, list):
+			rows = request.data
+		else:
+			rows = request.data.get("honorarios")
+		if not isinstance(rows, list) or not rows:
+			raise ValidationError("Expected a non-empty list of honorarios or a CSV file.")
+		if len(rows) > self.bulk_max_rows:
+			raise ValidationError(f"At most {self.bulk_max_rows} honorarios per request.")
+
+		created, errors = issue_honorarios(rows)
+		response_status = status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+		return Response({"created": created, "errors": errors}, status=response_status)
+
+	@action(detail=True, methods=["get"])
+	def download(self, request, pk=None):
+		"""PDF del honorario; `get_object` aplica `HonorarioPermission`."""
+		honorario = self.get_object()
+		if not honorario.honorario:
+			raise NotFound("Honorario has no file.")
+		return serve_protected_file(
+			request,
+			honorario.honorario,
+			as_attachment="attachment" in request.query_params,
+			filename=f"honorario-{honorario.pk}.pdf",
+		)
+
+	@action(detail=True, methods=["get"])
+	def preview(self, request, pk=None):
+		"""Primera página del PDF en JPEG: `?size=thumb` (miniatura) o `?size=page`."""
+		return preview_response(request, self.get_object().honorario)
+
+@extend_schema(tags=["Payments"])
+class PaymentViewSet(ExportMixin, ReadPathModelViewSet):
+	"""Endpoints para pagos.
+
+	- `client` puede crear pagos sólo para sus honorarios.
+	- `admin` y `employee` pueden ver todos los pagos.
+	- Al crear un pago, si el total pagado >= monto del honorario se marca como `pagado`.
+	- Soporta subida de `ticket_pdf` (PDF) vía multipart/form-data.
+	- `export/`, `{id}/download/` y `{id}/preview/` (ver cada acción).
+	"""
+	queryset = Payment.objects.all()
+	serializer_class = PaymentSerializer
+	action_serializer_classes = {"list": PaymentListSerializer}
+	permission_classes = (IsAuthenticated, PaymentPermission)
+	parser_classes = (MultiPartParser, FormParser, JSONParser)
+	filter_backends = (DjangoFilterBackend, OrderingFilter)
+	# permitir filtrar por método de pago, fecha, honorario, user (id) y razon_social del user
+	filterset_fields = ("payment_method", "payment_date", "honorario", "user", "user__razon_social")
+	ordering_fields = ("payment_date",)
+	ordering = ("payment_date",)
+	pagination_class = OptionalCursorPagination
+	export_fields = ("id", "payment_date", "payment_amount", "payment_method", "honorario", "user", "user__razon_social")
+	# PaymentPermission.has_object_permission lee obj.honorario.user_id
+	object_select_related = ("honorario",)
+	cache_namespaces = ("payments", "users")
+	export_filename = "pagos"
+	replica_actions = ("list", "retrieve", "export", "export_xlsx")
+	batch_actions = ("list", "retrieve")
+
+	def get_queryset(self):
+		user = self.request.user
+		if user.role in ("admin", "employee"):
+			return Payment.objects.all()
+		return Payment.objects.filter(honorario__user_id=user.id)
+
+	def perform_create(self, serializer):
+		user = self.request.user
+		honorario = serializer.validated_data.get("honorario")
+		if not honorario:
+			raise NotFound("Honorario is required for a payment.")
+
+		# Clients can only pay their own honorarios
+		if user.role == "client" and honorario.user_id != user.id:
+			raise PermissionDenied("Clients can only pay their own honorarios.")
+
+		ticket = serializer.validated_data.get("ticket_pdf")
+		if ticket and not ticket.name.lower().endswith(".pdf"):
+			raise PermissionDenied("Ticket must be a PDF.")
+
+		# Inserta el pago, actualiza el saldo y encola la notificación de forma atómica
+		payment = record_payment(serializer)
+
+		return payment
+
+	def perform_update(self, serializer):
+		user = self.request.user
+		honorario = serializer.validated_data.get("honorario")
+		if honorario and user.role == "client" and honorario.user_id != user.id:
+			raise PermissionDenied("Clients can only pay their own honorarios.")
+
+		ticket = serializer.validated_data.get("ticket_pdf")
+		if ticket and not ticket.name.lower().endswith(".pdf"):
+			raise PermissionDenied("Ticket must be a PDF.")
+
+		# corrige paid_amount, estado y saldo sobre las filas bloqueadas (ver update_payment)
+		update_payment(serializer)
+
+	def perform_destroy(self, instance):
+		delete_payment(instance)
+
+	@action(detail=True, methods=["get"])
+	def download(self, request, pk=None):
+		"""Ticket del pago; `get_object` aplica `PaymentPermission`."""
+		payment = self.get_object()
+		if not payment.ticket_pdf:
+			raise NotFound("Payment has no ticket.")
+		return serve_protected_file(
+			request,
+			payment.ticket_pdf,
+			as_attachment="attachment" in request.query_params,
+			filename=f"ticket-{payment.pk}.pdf",
+		)
+
+	@action(detail=True, methods=["get"])
+	def preview(self, request, pk=None):
+		"""Primera página del ticket en JPEG: `?size=thumb` (miniatura) o `?size=page`."""
+		return preview_response(request, self.get_object().ticket_pdf)
+
+
+
+@extend_schema(tags=["Uploads"])
+class PdfUploadViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+	"""Subida de PDFs por partes y reanudable.
+
+	1. `POST uploads/` con `kind` (`honorario`/`ticket`), `filename` y `size`.
+	2. `PUT uploads/{id}/chunk/` con el cuerpo crudo (`application/octet-stream`)
+	   y `Content-Range: bytes inicio-fin/total`. Cada parte se escribe
+	   directamente en la ruta final del archivo. Mientras se escribe la
+	   subida queda en `writing` y otra parte recibe 409; el lock de la fila
+	   solo se toma para reclamar la parte y para avanzar el offset, no
+	   mientras llega el cuerpo.
+	3. Si se corta la conexión, `GET uploads/{id}/` devuelve el `offset` desde
+	   donde seguir.
+	4. Terminada la subida, el archivo pasa a su blob por contenido (si ya
+	   existía se descarta la copia) y el honorario o pago la referencia con
+	   `upload=<id>`.
+
+	La firma `%PDF-` se valida en la primera parte, antes de escribir nada.
+	"""
+	serializer_class = PdfUploadSerializer
+	permission_classes = (IsAuthenticated,)
+	copy_block_size = 64 * 1024
+	# una parte en `writing` más vieja que esto se considera abandonada (worker caído)
+	claim_timeout = timedelta(minutes=5)
+	content_range_re = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+	upload_dirs = {
+		"honorario": Honorario._meta.get_field("honorario").upload_to,
+		"ticket": Payment._meta.get_field("ticket_pdf").upload_to,
+	}
+
+	def get_queryset(self):
+		return PdfUpload.objects.filter(user_id=self.request.user.id)
+
+	def perform_create(self, serializer):
+		kind = serializer.validated_data["kind"]
+		if kind == "honorario" and self.request.user.role not in ("admin", "employee"):
+			raise PermissionDenied("Only admin or employee can upload honorarios.")
+
+		filename = os.path.basename(serializer.validated_data["filename"])
+		name = default_storage.get_available_name(os.path.join(self.upload_dirs[kind], filename))
+		path = default_storage.path(name)
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		open(path, "wb").close()
+		serializer.save(user_id=self.request.user.id, file=name)
+
+	@action(detail=True, methods=["put"], parser_classes=(ChunkParser,))
+	def chunk(self, request, pk=None):
+		match = self.content_range_re.match(request.headers.get("Content-Range", ""))
+		if not match:
+			raise ValidationError("Content-Range header must be 'bytes start-end/total'.")
+		start, end, total = (int(value) for value in match.groups())
+
+		# 1. se toma la parte con el lock y se confirma enseguida
+		with transaction.atomic():
+			upload = self.get_queryset().select_for_update().filter(pk=pk).first()
+			if upload is None:
+				raise NotFound("Upload not found.")
+			if not self.claimable(upload) or start != upload.offset:
+				return Response(
+					{"detail": "Unexpected offset.", "offset": upload.offset, "status": upload.status},
+					status=status.HTTP_409_CONFLICT,
+				)
+			if total != upload.size or end < start or end >= upload.size:
+				raise ValidationError("Content-Range does not match the upload size.")
+			upload.status = "writing"
+			upload.claimed_at = timezone.now()
+			upload.save(update_fields=["status", "claimed_at"])
+
+		# 2. el cuerpo se escribe sin transacción ni lock abiertos; la última
+		# parte también hashea el archivo completo acá
+		try:
+			written = self.write_chunk(upload, request.stream, start, end)
+			complete = written is not None and start + written == upload.size
+			digest = upload_digest(upload) if complete else None
+		except BaseException:
+			self.release(upload, "uploading")
+			raise
+		if written is None:
+			if self.release(upload, "rejected"):
+				upload.file.delete(save=False)
+			return Response({"detail": "File is not a PDF."}, status=status.HTTP_400_BAD_REQUEST)
+
+		# 3. otra transacción corta avanza el offset y cierra la subida (sólo renombra el archivo)
+		with transaction.atomic():
+			current = PdfUpload.objects.select_for_update().get(pk=upload.pk)
+			if current.status != "writing" or current.claimed_at != upload.claimed_at:
+				# otra request tomó la parte por vencida; su escritura es la que vale
+				return Response(
+					{"detail": "Chunk was claimed by another request.", "offset": current.offset, "status": current.status},
+					status=status.HTTP_409_CONFLICT,
+				)
+			current.offset = start + written
+			current.status = "uploading"
+			if current.offset == current.size:
+				current.status = "complete"
+				ingest_upload(current, digest)
+			current.save(update_fields=["offset", "status", "file"])
+
+		return Response(PdfUploadSerializer(current).data)
+
+	def claimable(self, upload):
+		"""Una parte se puede tomar si no hay otra en curso o si la que había quedó colgada."""
+		if upload.status == "uploading":
+			return True
+		return upload.status == "writing" and upload.claimed_at < timezone.now() - self.claim_timeout
+
+	def release(self, upload, new_status):
+		"""Suelta la parte sin avanzar el offset; False si otra request ya la había tomado."""
+		return bool(
+			PdfUpload.objects.filter(pk=upload.pk, status="writing", claimed_at=upload.claimed_at)
+			.update(status=new_status, claimed_at=None)
+		)
+
+	def write_chunk(self, upload, stream, start, end):
+		"""Escribe el cuerpo desde `start`; devuelve los bytes escritos o None si la subida no es un PDF."""
+		first_block = stream.read(self.copy_block_size) if stream is not None else b""
+		if start == 0 and not first_block.startswith(b"%PDF-"):
+			return None
+
+		written = 0
+		with open(upload.file.path, "r+b") as destination:
+			destination.seek(start)
+			block = first_block
+			while block:
+				if start + written + len(block) > end + 1:
+					destination.truncate(start)
+					raise ValidationError("Chunk is larger than its Content-Range.")
+				destination.write(block)
+				written += len(block)
+				block = stream.read(self.copy_block_size)
+			destination.truncate(start + written)
+		return written
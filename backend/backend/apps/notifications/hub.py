@@ -0,0 +1,140 @@
+import asyncio
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+from .models import Notification
+from .serializers import NotificationSerializer
+
+logger = logging.getLogger(__name__)
+
+# Marca que se encola cuando un cliente no consume a tiempo (ver Subscription.push)
+OVERFLOW = object()
+
+
+def format_event(notification):
+    """Evento SSE de una notificación; se arma una sola vez y se reparte a todas las conexiones."""
+    data = json.dumps(NotificationSerializer(notification).data, default=str)
+    return f'id: {notification.pk}\nevent: notification\ndata: {data}\n\n'
+
+
+class Subscription:
+    """Una conexión abierta. La cola es acotada: un cliente lento no acumula memoria."""
+
+    def __init__(self, user_id, maxsize):
+        self.user_id = user_id
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def push(self, event):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # se descartan los eventos pendientes y se corta el stream; el
+            # cliente vuelve a pedir la lista al reconectarse
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+
+
+class InProcessHub:
+    """Pub/sub en memoria de las conexiones SSE de este proceso.
+
+    Las notificaciones las crean los workers (`run_workers`) en otro proceso,
+    así que una única tarea por proceso consulta las filas nuevas cada
+    `NOTIFICATIONS_POLL_INTERVAL` segundos y las reparte a los suscriptores:
+    el costo en la base no depende de la cantidad de conexiones abiertas.
+    Para usar un broker (ej. Redis pub/sub) se reemplaza `_feed` en una
+    subclase y se configura en `NOTIFICATIONS_HUB`.
+    """
+
+    def __init__(self, queue_size=100, poll_interval=1.0, lookback=100):
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.lookback = lookback
+        self.subscribers = {}
+        self._feeder = None
+        self._loop = None
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id, self.queue_size)
+        self.subscribers.setdefault(user_id, set()).add(subscription)
+        self._ensure_feeder()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscriptions = self.subscribers.get(subscription.user_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self.subscribers[subscription.user_id]
+
+    def publish(self, user_id, event):
+        for subscription in self.subscribers.get(user_id, ()):
+            subscription.push(event)
+
+    def connection_count(self):
+        return sum(len(subscriptions) for subscriptions in self.subscribers.values())
+
+    def _ensure_feeder(self):
+        loop = asyncio.get_running_loop()
+        if self._feeder is None or self._feeder.done() or self._loop is not loop:
+            self._loop = loop
+            self._feeder = loop.create_task(self._feed())
+
+    async def _feed(self):
+        # Los ids se asignan al insertar pero las filas se ven al confirmarse:
+        # una transacción larga puede aparecer después de ids mayores. Cada
+        # vuelta relee los últimos `lookback` ids y `seen` evita repetirlos.
+        last_id = await self._last_id()
+        seen = await self._window(last_id)
+        while self.subscribers:
+            await asyncio.sleep(self.poll_interval)
+            floor = max(last_id - self.lookback, 0)
+            try:
+                rows = Notification.objects.filter(pk__gt=floor).order_by('pk')[:self.lookback + 1000]
+                async for notification in rows:
+                    last_id = max(last_id, notification.pk)
+                    if notification.pk in seen:
+                        continue
+                    seen.add(notification.pk)
+                    if notification.user_id in self.subscribers:
+                        self.publish(notification.user_id, format_event(notification))
+            except Exception:
+                logger.exception('Notification feed failed')
+                # la próxima vuelta reabre la conexión (ej. si MySQL la cerró por inactividad)
+                await sync_to_async(close_old_connections)()
+            floor = last_id - self.lookback
+            seen = {pk for pk in seen if pk > floor}
+
+    async def _last_id(self):
+        last = await Notification.objects.order_by('-pk').values_list('pk', flat=True).afirst()
+        return last or 0
+
+    async def _window(self, last_id):
+        # lo que ya estaba confirmado al arrancar no se reparte
+        rows = Notification.objects.filter(pk__gt=last_id - self.lookback, pk__lte=last_id)
+        return {pk async for pk in rows.values_list('pk', flat=True)}
+
+
+_hub = None
+
+
+def get_hub():
+    global _hub
+    if _hub is None:
+        hub_class = import_string(settings.NOTIFICATIONS_HUB)
+        _hub = hub_class(
+            queue_size=settings.NOTIFICATIONS_STREAM_QUEUE_SIZE,
+            poll_interval=settings.NOTIFICATIONS_POLL_INTERVAL,
+            lookback=settings.NOTIFICATIONS_POLL_LOOKBACK,
+        )
+    return _hub
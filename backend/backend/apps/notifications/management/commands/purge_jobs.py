@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.notifications.tasks import purge_finished_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra los jobs terminados (`done`) hace más de `--days` días para que la cola "
+        "no crezca sin límite. Los `failed` se conservan. Pensado para cron, ej. "
+        "`15 3 * * * python manage.py purge_jobs`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=float, default=settings.JOBS_RETENTION_DAYS,
+            help="Días que se conserva un job terminado.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--dry-run", action="store_true", help="Sólo cuenta, no borra nada.")
+
+    def handle(self, *args, **options):
+        count = purge_finished_jobs(
+            timedelta(days=options["days"]), batch_size=options["batch_size"], dry_run=options["dry_run"]
+        )
+        verb = "se borrarían" if options["dry_run"] else "borrados"
+        self.stdout.write(self.style.SUCCESS(f"{count} jobs {verb}."))
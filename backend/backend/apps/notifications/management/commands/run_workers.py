@@ -0,0 +1,65 @@
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from apps.notifications.tasks import work
+
+
+def worker_loop(index, batch_size, poll_interval, once):
+    worker_id = f'{socket.gethostname()}:{os.getpid()}:{index}'
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *args: stopping.append(True))
+    signal.signal(signal.SIGINT, lambda *args: stopping.append(True))
+    while not stopping:
+        close_old_connections()
+        claimed = work(worker_id, batch_size)
+        if claimed:
+            continue
+        if once:
+            break
+        time.sleep(poll_interval)
+
+
+class Command(BaseCommand):
+    help = "Procesa la cola de jobs (notificaciones) con un pool de procesos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count())
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Segundos de espera con la cola vacía.")
+        parser.add_argument("--once", action="store_true", help="Vacía la cola y termina.")
+
+    def handle(self, *args, **options):
+        worker_args = (options["batch_size"], options["poll_interval"], options["once"])
+        if options["processes"] <= 1:
+            worker_loop(0, *worker_args)
+            return
+
+        # cada proceso abre su propia conexión a la base
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=worker_loop, args=(index, *worker_args), daemon=True)
+            for index in range(options["processes"])
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(f"{len(processes)} workers iniciados.")
+
+        def stop(*args):
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        signal.signal(signal.SIGTERM, stop)
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            stop()
+            for process in processes:
+                process.join()
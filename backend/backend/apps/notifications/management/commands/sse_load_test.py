@@ -0,0 +1,105 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.users.models import User
+from core.jwt import CustomTokenObtainPairSerializer
+
+
+def read_rss_kb(pid):
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Prueba de carga del stream SSE de notificaciones: abre N conexiones ociosas "
+        "contra un servidor ASGI, las mantiene abiertas y reporta conexiones vivas, "
+        "heartbeats recibidos y la memoria (RSS) del proceso del servidor."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000/api/v1/notifications/stream/")
+        parser.add_argument("--connections", type=int, default=1000)
+        parser.add_argument("--duration", type=float, default=60, help="Segundos que se mantienen abiertas.")
+        parser.add_argument("--username", required=True, help="Usuario con el que se firman los tokens.")
+        parser.add_argument("--server-pid", type=int, help="PID del worker ASGI para medir su RSS.")
+        parser.add_argument("--ramp", type=int, default=200, help="Conexiones nuevas por segundo.")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"User {options['username']!r} does not exist.")
+        token = str(CustomTokenObtainPairSerializer.get_token(user).access_token)
+        asyncio.run(self.run(token, options))
+
+    async def run(self, token, options):
+        url = urlsplit(options["url"])
+        request = (
+            f"GET {url.path}?token={token} HTTP/1.1\r\n"
+            f"Host: {url.netloc}\r\nAccept: text/event-stream\r\n\r\n"
+        ).encode()
+        stats = {"open": 0, "failed": 0, "heartbeats": 0, "events": 0}
+        pid = options["server_pid"]
+        rss_before = read_rss_kb(pid) if pid else None
+
+        async def client():
+            try:
+                reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+                writer.write(request)
+                await writer.drain()
+                status_line = await reader.readline()
+                if b" 200 " not in status_line:
+                    stats["failed"] += 1
+                    writer.close()
+                    return
+            except OSError:
+                stats["failed"] += 1
+                return
+            stats["open"] += 1
+            try:
+                while line := await reader.readline():
+                    if line.startswith(b": ping"):
+                        stats["heartbeats"] += 1
+                    elif line.startswith(b"event:"):
+                        stats["events"] += 1
+            except (OSError, asyncio.CancelledError):
+                pass
+            finally:
+                stats["open"] -= 1
+                writer.close()
+
+        tasks = []
+        started = time.monotonic()
+        for index in range(options["connections"]):
+            tasks.append(asyncio.create_task(client()))
+            if (index + 1) % options["ramp"] == 0:
+                await asyncio.sleep(1)
+        self.stdout.write(f"{len(tasks)} conexiones lanzadas en {time.monotonic() - started:.1f}s")
+
+        deadline = time.monotonic() + options["duration"]
+        while time.monotonic() < deadline:
+            await asyncio.sleep(min(5, max(deadline - time.monotonic(), 0)))
+            rss = f", RSS servidor {read_rss_kb(pid) / 1024:.1f} MiB" if pid else ""
+            self.stdout.write(
+                f"abiertas {stats['open']}, fallidas {stats['failed']}, "
+                f"heartbeats {stats['heartbeats']}, eventos {stats['events']}{rss}"
+            )
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if pid:
+            rss_after = read_rss_kb(pid)
+            per_connection = (rss_after - rss_before) / max(options["connections"], 1)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"RSS servidor: {rss_before / 1024:.1f} -> {rss_after / 1024:.1f} MiB "
+                    f"(~{per_connection:.1f} KiB por conexión)"
+                )
+            )
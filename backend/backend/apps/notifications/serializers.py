@@ -0,0 +1,10 @@
+from rest_framework import serializers
+from .models import Notification
+
+
+# Serializador para el modelo Notification
+class NotificationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Notification
+        fields = ('id', 'kind', 'title', 'message', 'data', 'created_at', 'read_at')
+        read_only_fields = fields
@@ -0,0 +1,75 @@
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Job
+
+
+def enqueue(kind, payload, idempotency_key=None, run_at=None, max_attempts=5):
+    """Encola un job en la tabla `Job`.
+
+    Se inserta en la transacción del llamador: si la escritura que lo origina
+    se deshace, el job también. Con `idempotency_key` un mismo evento se encola
+    una sola vez aunque se llame varias veces.
+    """
+    job = Job(
+        kind=kind,
+        payload=payload,
+        idempotency_key=idempotency_key,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts,
+    )
+    if idempotency_key is None:
+        job.save()
+        return job
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        return Job.objects.get(idempotency_key=idempotency_key)
+    return job
+
+
+def enqueue_many(jobs):
+    """Encola varios jobs con un solo `INSERT`; `jobs` son tuplas `(kind, payload, idempotency_key)`."""
+    now = timezone.now()
+    Job.objects.bulk_create(
+        [Job(kind=kind, payload=payload, idempotency_key=key, run_at=now) for kind, payload, key in jobs],
+        ignore_conflicts=True,
+    )
+
+
+def notify_honorario_created(honorario):
+    enqueue(
+        'honorario_created',
+        {'honorario': honorario.pk, 'user': honorario.user_id},
+        idempotency_key=f'honorario_created:{honorario.pk}',
+    )
+
+
+def notify_honorarios_issued(counts_by_user):
+    """Emisión masiva: un job por cliente con la cantidad de honorarios emitidos."""
+    issued_at = timezone.now().isoformat()
+    enqueue_many(
+        ('honorarios_issued', {'user': user_id, 'count': count, 'issued_at': issued_at}, None)
+        for user_id, count in counts_by_user.items()
+    )
+
+
+def notify_honorarios_overdue(counts_by_user, day):
+    """Barrido de vencidos: un job por cliente con la cantidad de honorarios que vencieron."""
+    enqueue_many(
+        (
+            'honorarios_overdue',
+            {'user': user_id, 'count': count, 'date': day.isoformat()},
+            f'honorarios_overdue:{day.isoformat()}:{user_id}',
+        )
+        for user_id, count in counts_by_user.items()
+    )
+
+
+def notify_payment_recorded(payment):
+    enqueue(
+        'payment_recorded',
+        {'payment': payment.pk, 'honorario': payment.honorario_id},
+        idempotency_key=f'payment_recorded:{payment.pk}',
+    )
@@ -0,0 +1,205 @@
+import asyncio
+import json
+import secrets
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+
+from core.authentication import StatelessRoleJWTAuthentication, is_token_revoked
+
+from .hub import OVERFLOW, format_event, get_hub
+from .models import Notification
+
+STREAM_PATH = '/api/v1/notifications/stream/'
+TICKET_KEY = 'notifications:stream-ticket:{ticket}'
+
+
+def bearer_token(header):
+    if header and header.startswith('Bearer '):
+        return header[len('Bearer '):]
+    return None
+
+
+def issue_ticket(raw_token):
+    """Ticket de un solo uso que reemplaza al access token en la URL del stream.
+
+    EventSource no permite headers, así que la credencial tiene que ir en la
+    query string, y la query string queda en los logs de acceso (nginx,
+    gunicorn, proxies). Un access token ahí sirve hasta que vence; el ticket
+    dura `NOTIFICATIONS_STREAM_TICKET_TTL` segundos y se consume al abrir el
+    stream, así lo que queda en los logs ya no sirve.
+    """
+    ticket = secrets.token_urlsafe(32)
+    cache.set(TICKET_KEY.format(ticket=ticket), raw_token, timeout=settings.NOTIFICATIONS_STREAM_TICKET_TTL)
+    return ticket
+
+
+def redeem_ticket(ticket):
+    key = TICKET_KEY.format(ticket=ticket)
+    raw_token = cache.get(key)
+    cache.delete(key)
+    return raw_token
+
+
+def stream_user(ticket, authorization):
+    """Usuario del stream, o `None` si no vino ninguna credencial.
+
+    El navegador abre el stream con `?ticket=` (ver `issue_ticket`); los demás
+    clientes pueden mandar el header `Authorization`.
+    """
+    if ticket:
+        raw_token = redeem_ticket(ticket)
+        if raw_token is None:
+            raise AuthenticationFailed('Stream ticket is invalid or expired.', code='invalid_ticket')
+    else:
+        raw_token = bearer_token(authorization)
+    if not raw_token:
+        return None
+    authentication = StatelessRoleJWTAuthentication()
+    return authentication.get_user(authentication.get_validated_token(raw_token))
+
+
+def token_still_valid(token):
+    """False si el access token venció o fue revocado después de abrir el stream."""
+    try:
+        token.check_exp()
+    except TokenError:
+        return False
+    return not is_token_revoked(token)
+
+
+def auth_error_detail(exc):
+    detail = exc.detail.get('detail') if isinstance(exc.detail, dict) else exc.detail
+    return str(detail)
+
+
+def retry_event():
+    return f'retry: {settings.NOTIFICATIONS_STREAM_RETRY}\n\n'
+
+
+def replay(user_id, last_event_id):
+    """Eventos perdidos mientras el cliente estaba desconectado (header `Last-Event-ID`)."""
+    if not last_event_id.isdigit():
+        return []
+    notifications = Notification.objects.filter(user_id=user_id, pk__gt=int(last_event_id)).order_by('pk')[:100]
+    return [format_event(notification) for notification in notifications]
+
+
+class NotificationStreamMiddleware:
+    """Middleware ASGI que atiende el stream SSE antes de llegar a Django.
+
+    Una conexión SSE queda abierta indefinidamente. Dentro del handler de
+    Django cada request reserva un thread para los middlewares sync mientras
+    dure la respuesta; acá la conexión es sólo una corrutina y una cola del
+    hub, así un worker sostiene miles de conexiones ociosas con memoria
+    acotada. Manda un heartbeat cada `NOTIFICATIONS_STREAM_HEARTBEAT`
+    segundos y, si el cliente no consume a tiempo, un evento `reset` y cierra.
+
+    El token se valida al conectar y de nuevo cada
+    `NOTIFICATIONS_STREAM_HEARTBEAT` segundos: si venció o se revocó (usuario
+    desactivado, cambio de rol o de contraseña) manda un evento `expired` y
+    cierra; el cliente pide otro ticket con un token vigente.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] != STREAM_PATH:
+            return await self.app(scope, receive, send)
+
+        headers = {key.decode('latin-1').lower(): value.decode('latin-1') for key, value in scope['headers']}
+        query = parse_qs(scope['query_string'].decode('latin-1'))
+        cors = self._cors_headers(headers.get('origin'))
+        if scope['method'] == 'OPTIONS':
+            return await self._respond(send, 204, b'', cors)
+
+        try:
+            user = stream_user(query.get('ticket', [None])[0], headers.get('authorization'))
+        except (InvalidToken, AuthenticationFailed) as exc:
+            return await self._error(send, 401, auth_error_detail(exc), cors)
+        if user is None:
+            return await self._error(send, 401, 'Authentication credentials were not provided.', cors)
+
+        last_event_id = headers.get('last-event-id') or query.get('last_event_id', [''])[0]
+        missed = await sync_to_async(replay)(user.id, last_event_id) if last_event_id else []
+        await self._stream(receive, send, user, [retry_event(), *missed], cors)
+
+    async def _stream(self, receive, send, user, initial, cors):
+        hub = get_hub()
+        subscription = hub.subscribe(user.id)
+        disconnected = asyncio.ensure_future(self._wait_disconnect(receive))
+        heartbeat = settings.NOTIFICATIONS_STREAM_HEARTBEAT
+        loop = asyncio.get_running_loop()
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [
+                    (b'content-type', b'text/event-stream'),
+                    (b'cache-control', b'no-cache'),
+                    (b'x-accel-buffering', b'no'),
+                    *cors,
+                ],
+            })
+            await self._send_event(send, ''.join(initial))
+            checked_at = loop.time()
+            while True:
+                get = asyncio.ensure_future(subscription.queue.get())
+                done, _ = await asyncio.wait({get, disconnected}, timeout=heartbeat, return_when=asyncio.FIRST_COMPLETED)
+                if disconnected in done:
+                    get.cancel()
+                    return
+                # con eventos seguidos no hay heartbeat: se revalida por tiempo
+                if loop.time() - checked_at >= heartbeat:
+                    checked_at = loop.time()
+                    if not token_still_valid(user.token):
+                        get.cancel()
+                        await self._send_event(send, 'event: expired\ndata: {}\n\n')
+                        break
+                if get not in done:
+                    get.cancel()
+                    await self._send_event(send, ': ping\n\n')
+                    continue
+                event = get.result()
+                if event is OVERFLOW:
+                    await self._send_event(send, 'event: reset\ndata: {}\n\n')
+                    break
+                await self._send_event(send, event)
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            hub.unsubscribe(subscription)
+            disconnected.cancel()
+
+    async def _wait_disconnect(self, receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    async def _send_event(self, send, text):
+        await send({'type': 'http.response.body', 'body': text.encode(), 'more_body': True})
+
+    async def _error(self, send, status, detail, cors):
+        body = json.dumps({'detail': detail}).encode()
+        await self._respond(send, status, body, [(b'content-type', b'application/json'), *cors])
+
+    async def _respond(self, send, status, body, headers):
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    def _cors_headers(self, origin):
+        # mismas reglas que django-cors-headers para el resto de la API
+        if not origin:
+            return []
+        allowed = getattr(settings, 'CORS_ALLOW_ALL_ORIGINS', False) or origin in getattr(
+            settings, 'CORS_ALLOWED_ORIGINS', ()
+        )
+        if not allowed:
+            return []
+        return [
+            (b'access-control-allow-origin', origin.encode('latin-1')),
+            (b'access-control-allow-headers', b'authorization, last-event-id'),
+            (b'vary', b'Origin'),
+        ]
@@ -0,0 +1,245 @@
+import logging
+import random
+import traceback
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.honorarios.models import Honorario, Payment
+from apps.honorarios.previews import generate_previews
+from apps.users.models import User
+
+from .models import Job, Notification
+
+logger = logging.getLogger(__name__)
+
+# Un job en `running` con el lock más viejo que esto se considera abandonado
+LOCK_TIMEOUT = timedelta(minutes=10)
+BACKOFF_BASE = 30
+BACKOFF_MAX = 60 * 60
+
+
+# Handlers: reciben todos los payloads de un mismo tipo del lote y
+# devuelven las notificaciones a crear. Deben ser idempotentes (source_key).
+
+def handle_honorario_created(payloads):
+    honorarios = Honorario.objects.filter(pk__in=[p['honorario'] for p in payloads]).only(
+        'id', 'title', 'amount', 'user'
+    )
+    return [
+        Notification(
+            user_id=honorario.user_id,
+            kind='honorario_created',
+            title='Nuevo honorario',
+            message=f'{honorario.title} por ${honorario.amount}',
+            data={'honorario': honorario.pk},
+            source_key=f'honorario_created:{honorario.pk}',
+        )
+        for honorario in honorarios
+    ]
+
+
+def handle_honorarios_issued(payloads):
+    return [
+        Notification(
+            user_id=payload['user'],
+            kind='honorarios_issued',
+            title='Nuevos honorarios',
+            message=f"Se emitieron {payload['count']} honorarios.",
+            data={'count': payload['count']},
+            source_key=f"honorarios_issued:{payload['issued_at']}",
+        )
+        for payload in payloads
+    ]
+
+
+def handle_honorarios_overdue(payloads):
+    return [
+        Notification(
+            user_id=payload['user'],
+            kind='honorarios_overdue',
+            title='Honorarios vencidos',
+            message=f"Vencieron {payload['count']} honorarios impagos.",
+            data={'count': payload['count'], 'date': payload['date']},
+            source_key=f"honorarios_overdue:{payload['date']}",
+        )
+        for payload in payloads
+    ]
+
+
+def handle_payment_recorded(payloads):
+    payments = Payment.objects.filter(pk__in=[p['payment'] for p in payloads]).select_related(
+        'honorario__user'
+    )
+    staff_ids = list(User.objects.filter(role__in=('admin', 'employee'), is_active=True).values_list('id', flat=True))
+    notifications = []
+    for payment in payments:
+        honorario = payment.honorario
+        data = {'payment': payment.pk, 'honorario': honorario.pk}
+        key = f'payment_recorded:{payment.pk}'
+        notifications.append(
+            Notification(
+                user_id=honorario.user_id,
+                kind='payment_recorded',
+                title='Pago registrado',
+                message=f'Se registró un pago de ${payment.payment_amount} para {honorario.title}.',
+                data=data,
+                source_key=key,
+            )
+        )
+        # fan-out a todo el staff
+        notifications.extend(
+            Notification(
+                user_id=staff_id,
+                kind='payment_recorded',
+                title='Pago recibido',
+                message=f'{honorario.user.razon_social or honorario.user.username} pagó ${payment.payment_amount}.',
+                data=data,
+                source_key=key,
+            )
+            for staff_id in staff_ids
+        )
+    return notifications
+
+
+def handle_pdf_previews(payloads):
+    # no crea notificaciones: usa la misma cola y el mismo pool de workers
+    generate_previews(dict.fromkeys(payload['name'] for payload in payloads))
+    return []
+
+
+HANDLERS = {
+    'honorario_created': handle_honorario_created,
+    'honorarios_issued': handle_honorarios_issued,
+    'honorarios_overdue': handle_honorarios_overdue,
+    'payment_recorded': handle_payment_recorded,
+    'pdf_previews': handle_pdf_previews,
+}
+
+
+def claim_jobs(worker_id, batch_size):
+    """Toma hasta `batch_size` jobs vencidos y los marca `running`.
+
+    `skip_locked` permite que varios workers tomen lotes distintos en paralelo.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status='pending', run_at__lte=now)
+                | Q(status='running', locked_at__lt=now - LOCK_TIMEOUT)
+            )
+            .order_by('run_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if ids:
+            Job.objects.filter(pk__in=ids).update(status='running', locked_at=now, locked_by=worker_id)
+    return list(Job.objects.filter(pk__in=ids))
+
+
+def backoff_delay(attempts):
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def run_jobs(jobs):
+    """Ejecuta un lote agrupando los jobs por tipo (un handler y un INSERT por tipo).
+
+    Si el handler falla con varios jobs se reintenta cada uno por separado y
+    sólo los que vuelven a fallar pasan a `_retry`.
+
+    El handler corre fuera de toda transacción: puede tardar o tener efectos
+    fuera de la base (`pdf_previews` ejecuta `pdftoppm`) y no debe retener
+    conexiones ni locks mientras tanto. Sólo el estado del job se registra al
+    final; si el proceso muere antes, el job se vuelve a tomar pasado
+    `LOCK_TIMEOUT` y como los handlers son idempotentes no se duplica nada.
+    """
+    by_kind = defaultdict(list)
+    for job in jobs:
+        by_kind[job.kind].append(job)
+
+    for kind, group in by_kind.items():
+        handler = HANDLERS.get(kind)
+        if handler is None:
+            logger.error('No handler for job kind %s', kind)
+            _retry(group, f'No handler for job kind {kind!r}.')
+            continue
+        try:
+            _handle(handler, group)
+        except Exception:
+            if len(group) == 1:
+                logger.exception('Job %s (%s) failed', group[0].pk, kind)
+                _retry(group, traceback.format_exc())
+                continue
+            # un payload malo no reintenta a todo el grupo: se corre de a uno
+            # para aislarlo (los handlers son idempotentes)
+            logger.warning('Job batch %s failed, running its jobs one at a time', kind, exc_info=True)
+            for job in group:
+                try:
+                    _handle(handler, [job])
+                except Exception:
+                    logger.exception('Job %s (%s) failed', job.pk, kind)
+                    _retry([job], traceback.format_exc())
+                else:
+                    _finish([job])
+            continue
+        _finish(group)
+
+
+def _handle(handler, jobs):
+    notifications = handler([job.payload for job in jobs])
+    Notification.objects.bulk_create(notifications, ignore_conflicts=True)
+
+
+def _finish(jobs):
+    Job.objects.filter(pk__in=[job.pk for job in jobs]).update(
+        status='done', finished_at=timezone.now(), last_error=''
+    )
+
+
+def _retry(jobs, error):
+    now = timezone.now()
+    for job in jobs:
+        job.attempts += 1
+        job.last_error = error[-4000:]
+        job.locked_at = None
+        job.locked_by = ''
+        if job.attempts >= job.max_attempts:
+            job.status = 'failed'
+            job.finished_at = now
+        else:
+            job.status = 'pending'
+            job.run_at = now + backoff_delay(job.attempts)
+    Job.objects.bulk_update(
+        jobs, ['attempts', 'last_error', 'locked_at', 'locked_by', 'status', 'finished_at', 'run_at']
+    )
+
+
+def purge_finished_jobs(older_than, batch_size=5000, dry_run=False):
+    """Borra los jobs `done` terminados hace más de `older_than`; devuelve cuántos.
+
+    Los `failed` se conservan para revisarlos. Borra por lotes para no
+    bloquear la tabla que usan los workers. Una `idempotency_key` borrada se
+    puede volver a encolar; las notificaciones igual no se duplican (`source_key`).
+    """
+    finished = Job.objects.filter(status='done', finished_at__lt=timezone.now() - older_than)
+    if dry_run:
+        return finished.count()
+    deleted = 0
+    while True:
+        ids = list(finished.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += Job.objects.filter(pk__in=ids).delete()[0]
+
+
+def work(worker_id, batch_size=100):
+    """Procesa un lote; devuelve cuántos jobs tomó."""
+    jobs = claim_jobs(worker_id, batch_size)
+    if jobs:
+        run_jobs(jobs)
+    return len(jobs)
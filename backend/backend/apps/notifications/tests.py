@@ -1,3 +1,154 @@
-from django.test import TestCase
+import asyncio
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.users.models import User
+from core.authentication import DENYLIST_KEY
+from core.jwt import CustomTokenObtainPairSerializer
+
+from .hub import InProcessHub, Subscription
+from .models import Job, Notification
+from .services import enqueue
+from .stream import STREAM_PATH, NotificationStreamMiddleware
+from .tasks import purge_finished_jobs, work
+
+
+class FakeHub:
+    """Hub sin el feeder que consulta la base."""
+
+    def subscribe(self, user_id):
+        return Subscription(user_id, maxsize=10)
+
+    def unsubscribe(self, subscription):
+        pass
+
+
+class StreamAuthTests(TestCase):
+    """El stream se abre con un ticket de un solo uso y revalida el token mientras está abierto."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(
+            username="client", email="client@example.com", role="client", razon_social="Cliente", cuit="20-00000001-1",
+        )
+        self.token = CustomTokenObtainPairSerializer.get_token(self.user).access_token
+        self.api = APIClient()
+        self.api.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+    def test_ticket_opens_the_stream_once(self):
+        response = self.api.post("/api/v1/notifications/stream_ticket/")
+        self.assertEqual(response.status_code, 200)
+        ticket = response.json()["ticket"]
+        self.assertEqual(self.client.get(STREAM_PATH, {"ticket": ticket}).status_code, 200)
+        self.assertEqual(self.client.get(STREAM_PATH, {"ticket": ticket}).status_code, 401)
+
+    def test_token_in_query_string_is_not_accepted(self):
+        self.assertEqual(self.client.get(STREAM_PATH, {"token": str(self.token)}).status_code, 401)
+
+    @override_settings(NOTIFICATIONS_STREAM_HEARTBEAT=0.05)
+    async def test_stream_closes_when_token_is_revoked(self):
+        sent = []
+
+        async def receive():
+            await asyncio.Event().wait()
+
+        async def send(message):
+            sent.append(message)
+            if message.get("body", b"").startswith(b": ping"):
+                # se revoca después del primer heartbeat, con el stream ya abierto
+                cache.set(DENYLIST_KEY.format(user_id=self.user.pk), self.token["iat"] + 1)
+
+        scope = {
+            "type": "http", "path": STREAM_PATH, "method": "GET", "query_string": b"",
+            "headers": [(b"authorization", f"Bearer {self.token}".encode())],
+        }
+        with mock.patch("apps.notifications.stream.get_hub", return_value=FakeHub()):
+            await asyncio.wait_for(NotificationStreamMiddleware(app=None)(scope, receive, send), timeout=5)
+
+        self.assertEqual(sent[0]["status"], 200)
+        self.assertIn(b"event: expired", b"".join(message.get("body", b"") for message in sent))
+        self.assertIs(sent[-1]["more_body"], False)
+
+
+class HubFeedTests(TestCase):
+    """El feeder reparte las filas confirmadas fuera de orden una sola vez."""
+
+    async def test_late_commit_is_published_once(self):
+        user = await User.objects.acreate(username="client", email="client@example.com", role="client")
+
+        def create(pk):
+            return Notification.objects.acreate(pk=pk, user=user, kind="x", title="x", source_key=str(pk))
+
+        first = await create(None)
+        hub = InProcessHub(poll_interval=0.01, lookback=10)
+        subscription = hub.subscribe(user.pk)
+        events = []
+        try:
+            # el id siguiente se confirma después que uno mayor
+            await asyncio.sleep(0.05)
+            await create(first.pk + 2)
+            events.append(await asyncio.wait_for(subscription.queue.get(), timeout=5))
+            await create(first.pk + 1)
+            events.append(await asyncio.wait_for(subscription.queue.get(), timeout=5))
+            await asyncio.sleep(0.1)
+            self.assertTrue(subscription.queue.empty())
+        finally:
+            hub.unsubscribe(subscription)
+            await hub._feeder
+
+        self.assertEqual([event.split("\n")[0] for event in events], [f"id: {first.pk + 2}", f"id: {first.pk + 1}"])
+
+
+class JobTests(TransactionTestCase):
+    """Los handlers corren fuera de transacciones y los jobs terminados se purgan."""
+
+    def test_handlers_run_outside_transactions(self):
+        calls = []
+
+        def handler(payloads):
+            calls.append((connection.in_atomic_block, Job.objects.get().status))
+            return []
+
+        enqueue("pdf_previews", {"name": "blobs/ab/cd/abcd.pdf"})
+        with mock.patch.dict("apps.notifications.tasks.HANDLERS", {"pdf_previews": handler}):
+            self.assertEqual(work("test"), 1)
+        self.assertEqual(calls, [(False, "running")])
+        self.assertEqual(Job.objects.get().status, "done")
+
+    def test_failed_handler_is_retried(self):
+        enqueue("pdf_previews", {"name": "blobs/ab/cd/abcd.pdf"})
+        with mock.patch.dict("apps.notifications.tasks.HANDLERS", {"pdf_previews": mock.Mock(side_effect=OSError)}):
+            with self.assertLogs("apps.notifications.tasks", "ERROR"):
+                work("test")
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), ("pending", 1))
+
+    def test_bad_payload_only_retries_its_job(self):
+        def handler(payloads):
+            if any(payload["name"] == "bad" for payload in payloads):
+                raise OSError
+            return []
+
+        for name in ("a", "bad", "b"):
+            enqueue("pdf_previews", {"name": name})
+        with mock.patch.dict("apps.notifications.tasks.HANDLERS", {"pdf_previews": handler}):
+            with self.assertLogs("apps.notifications.tasks", "WARNING") as logs:
+                self.assertEqual(work("test"), 3)
+        self.assertEqual([record.levelname for record in logs.records], ["WARNING", "ERROR"])
+        jobs = {job.payload["name"]: (job.status, job.attempts) for job in Job.objects.all()}
+        self.assertEqual(jobs, {"a": ("done", 0), "bad": ("pending", 1), "b": ("done", 0)})
+
+    def test_purge_keeps_recent_and_failed_jobs(self):
+        old = timezone.now() - timedelta(days=30)
+        for status, finished_at in (("done", old), ("done", old), ("done", timezone.now()), ("failed", old), ("pending", None)):
+            Job.objects.create(kind="x", run_at=timezone.now(), status=status, finished_at=finished_at)
+
+        self.assertEqual(purge_finished_jobs(timedelta(days=7), dry_run=True), 2)
+        self.assertEqual(purge_finished_jobs(timedelta(days=7), batch_size=1), 2)
+        self.assertEqual(sorted(Job.objects.values_list("status", flat=True)), ["done", "failed", "pending"])
@@ -0,0 +1,11 @@
+from django.urls import path
+from rest_framework.routers import DefaultRouter
+from . import views
+
+router = DefaultRouter()
+router.register(r'v1/notifications', views.NotificationViewSet, basename='notification')
+
+urlpatterns = [
+    # antes que las rutas del router, que tomarían `stream` como pk
+    path('v1/notifications/stream/', views.notification_stream, name='notification-stream'),
+] + router.urls
@@ -1,3 +1,84 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from drf_spectacular.utils import extend_schema
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
 
-# Create your views here.
+from core.pagination import StandardResultsSetPagination
+from .models import Notification
+from .serializers import NotificationSerializer
+from .stream import auth_error_detail, issue_ticket, replay, retry_event, stream_user
+
+
+@extend_schema(tags=["Notifications"])
+class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
+    """Notificaciones del usuario autenticado.
+
+    - `?unread=true` lista sólo las no leídas.
+    - `unread_count/` devuelve la cantidad de no leídas (para la campana).
+    - `{id}/read/` y `read_all/` las marcan como leídas.
+    - `stream_ticket/` emite el ticket para abrir `stream/` desde EventSource.
+    - Listado y `unread_count/` se pueden pedir en un batch (`POST /api/batch/`).
+    """
+    serializer_class = NotificationSerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = StandardResultsSetPagination
+    batch_actions = ("list", "unread_count")
+
+    def get_queryset(self):
+        queryset = Notification.objects.filter(user_id=self.request.user.id)
+        if self.request.query_params.get("unread") in ("1", "true"):
+            queryset = queryset.filter(read_at__isnull=True)
+        return queryset
+
+    @action(detail=False, methods=["get"])
+    def unread_count(self, request):
+        count = Notification.objects.filter(user_id=request.user.id, read_at__isnull=True).count()
+        return Response({"unread": count})
+
+    @action(detail=True, methods=["post"])
+    def read(self, request, pk=None):
+        notification = self.get_object()
+        if notification.read_at is None:
+            notification.read_at = timezone.now()
+            notification.save(update_fields=["read_at"])
+        return Response(self.get_serializer(notification).data)
+
+    @action(detail=False, methods=["post"])
+    def read_all(self, request):
+        updated = Notification.objects.filter(user_id=request.user.id, read_at__isnull=True).update(
+            read_at=timezone.now()
+        )
+        return Response({"updated": updated})
+
+    @action(detail=False, methods=["post"])
+    def stream_ticket(self, request):
+        ticket = issue_ticket(str(request.auth))
+        return Response({"ticket": ticket, "expires_in": settings.NOTIFICATIONS_STREAM_TICKET_TTL})
+
+
+
+def notification_stream(request):
+    """Stream de Server-Sent Events con las notificaciones del usuario.
+
+    Bajo ASGI esta ruta la atiende `NotificationStreamMiddleware` (ver
+    `config/asgi.py`) y la conexión queda abierta. Esta vista es la versión
+    WSGI (`runserver`): responde lo pendiente desde `Last-Event-ID` y cierra;
+    el `retry` hace que el navegador reconecte.
+    """
+    try:
+        user = stream_user(request.GET.get('ticket'), request.headers.get('Authorization'))
+    except (InvalidToken, AuthenticationFailed) as exc:
+        return JsonResponse({'detail': auth_error_detail(exc)}, status=401)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id', '')
+    events = [retry_event(), *replay(user.id, last_event_id)]
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    return response
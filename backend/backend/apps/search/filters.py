@@ -0,0 +1,64 @@
+from django.db.models import Case, IntegerField, Value, When
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+from core.request_cache import get_request_cache
+
+from .services import search
+
+
+class IndexedSearchFilter(BaseFilterBackend):
+    """`?search=` sobre el índice invertido de apps.search, con resultados rankeados.
+
+    La vista declara `search_kind` (ver `services.DOCUMENTS`). Cada término se
+    busca como prefijo y tienen que aparecer todos. Sin `?ordering=` los
+    resultados salen por relevancia (`search_rank`); va después de
+    `OrderingFilter` en `filter_backends`. Un cliente busca sólo entre sus
+    propios documentos.
+    """
+
+    search_param = 'search'
+
+    def get_search_query(self, request):
+        return request.query_params.get(self.search_param, '').strip()
+
+    def filter_queryset(self, request, queryset, view):
+        query = self.get_search_query(request)
+        if not query:
+            return queryset
+        user = request.user
+        owner_id = user.id if getattr(user, 'role', None) == 'client' else None
+        # el listado filtra dos veces por request (validadores de ConditionalGetMixin y página)
+        key = ('search', view.search_kind, query, owner_id)
+        cache = get_request_cache(request)
+        if key not in cache:
+            cache[key] = search(view.search_kind, query, owner_id=owner_id)
+        hits = cache[key]
+        if not hits:
+            return queryset.none()
+
+        # un WHEN por valor de rank (son pocos) en lugar de uno por fila
+        by_rank = {}
+        for object_id, rank in hits:
+            by_rank.setdefault(rank, []).append(object_id)
+        queryset = queryset.filter(pk__in=[object_id for object_id, _ in hits]).annotate(
+            search_rank=Case(
+                *(When(pk__in=object_ids, then=Value(rank)) for rank, object_ids in by_rank.items()),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        )
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            return queryset
+        return queryset.order_by('-search_rank', '-pk')
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.search_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Search terms (prefix match, all terms required, ranked by relevance).',
+                'schema': {'type': 'string'},
+            },
+        ]
@@ -0,0 +1,80 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.search.models import SearchToken
+from apps.search.services import document_queryset, search
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark del índice de búsqueda: arma consultas a partir de documentos al azar "
+        "(palabra completa, prefijo, dos palabras y CUIT parcial) y reporta la latencia "
+        "p50/p95/p99 de `search()` más la lectura de la primera página de 20 resultados. "
+        "Los datos se generan con `seed_honorarios` (ej. --clients 100000 --honorarios 1000000)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queries", type=int, default=200, help="Consultas por tipo.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--page-size", type=int, default=20)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        for kind in ("client", "honorario"):
+            object_ids = SearchToken.objects.filter(kind=kind).values_list("object_id", flat=True)
+            first = object_ids.order_by("object_id").first()
+            if first is None:
+                raise CommandError(f"The {kind} index is empty, run seed_honorarios or rebuild_search_index first.")
+            last = object_ids.order_by("-object_id").first()
+            queries = self.build_queries(kind, rng, first, last, options["queries"])
+            for name, texts in queries.items():
+                self.run(kind, name, texts, options["page_size"])
+
+    def build_queries(self, kind, rng, first, last, count):
+        queries = {"palabra": [], "prefijo": [], "dos palabras": []}
+        if kind == "client":
+            queries["cuit parcial"] = []
+        while len(queries["palabra"]) < count:
+            object_id = rng.randint(first, last)
+            # tokens del primer documento a partir de un id al azar
+            rows = list(
+                SearchToken.objects.filter(kind=kind, object_id__gte=object_id)
+                .order_by("object_id")
+                .values_list("object_id", "token")[:20]
+            )
+            tokens = [token for pk, token in rows if pk == rows[0][0]] if rows else []
+            words = [token for token in tokens if not token.isdigit()]
+            if not words:
+                continue
+            word = rng.choice(words)
+            queries["palabra"].append(word)
+            queries["prefijo"].append(word[: rng.randint(3, 5)])
+            queries["dos palabras"].append(" ".join(rng.sample(words, 2)) if len(words) > 1 else word)
+            if kind == "client":
+                numbers = [token for token in tokens if token.isdigit() and len(token) == 11]
+                if numbers:
+                    queries["cuit parcial"].append(numbers[0][: rng.randint(6, 9)])
+        return queries
+
+    def run(self, kind, name, texts, page_size):
+        if not texts:
+            return
+        queryset = document_queryset(kind)
+        latencies = []
+        hits = 0
+        for text in texts:
+            started = time.perf_counter()
+            results = search(kind, text)
+            page = [object_id for object_id, _ in results[:page_size]]
+            list(queryset.filter(pk__in=page))
+            latencies.append(time.perf_counter() - started)
+            hits += len(results)
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        self.stdout.write(
+            f"{kind:>9} {name:<13} {len(texts):>5} consultas  p50 {quantiles[49] * 1000:6.1f} ms  "
+            f"p95 {quantiles[94] * 1000:6.1f} ms  p99 {quantiles[98] * 1000:6.1f} ms  "
+            f"resultados/consulta {hits / len(texts):7.1f}"
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.search.services import DOCUMENTS, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el índice de búsqueda (SearchToken) de honorarios y clientes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kind", choices=sorted(DOCUMENTS), action="append", help="Por defecto, todos.")
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        for kind in options["kind"] or sorted(DOCUMENTS):
+            documents, tokens = rebuild_index(kind, batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"{kind}: {documents} documentos, {tokens} tokens."))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('honorario', 'Honorario'), ('client', 'Client')], max_length=10)),
+                ('token', models.CharField(max_length=40)),
+                ('object_id', models.BigIntegerField()),
+                ('owner_id', models.BigIntegerField(null=True)),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'token', 'object_id', 'weight'], name='search_token_idx'), models.Index(fields=['kind', 'object_id', 'token'], name='search_object_idx'), models.Index(fields=['kind', 'owner_id', 'token'], name='search_owner_token_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import models
+
+
+# Índice invertido de búsqueda: una fila por (documento, token). Lo mantienen
+# los signals de apps/search/signals.py y `manage.py rebuild_search_index`.
+class SearchToken(models.Model):
+    KIND_CHOICES = [
+        ('honorario', 'Honorario'),
+        ('client', 'Client'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    token = models.CharField(max_length=40)
+    object_id = models.BigIntegerField()
+    # cliente dueño del documento: un cliente busca sólo entre sus honorarios
+    owner_id = models.BigIntegerField(null=True)
+    # peso del campo de donde salió el token (ver services.DOCUMENTS)
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            # búsqueda por prefijo: WHERE kind = ? AND token >= ? AND token < ?
+            # (con `weight` la consulta se resuelve sólo con el índice)
+            models.Index(fields=['kind', 'token', 'object_id', 'weight'], name='search_token_idx'),
+            # tokens de un documento (reindexar y confirmar los demás términos)
+            models.Index(fields=['kind', 'object_id', 'token'], name='search_object_idx'),
+            models.Index(fields=['kind', 'owner_id', 'token'], name='search_owner_token_idx'),
+        ]
+
+    def __str__(self):
+        return f'SearchToken {self.kind}:{self.object_id} - {self.token}'
@@ -0,0 +1,206 @@
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from apps.honorarios.models import Honorario
+from apps.users.models import User
+
+from .models import SearchToken
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+# CUIT, teléfonos y similares: también se indexan como un único token de dígitos
+NUMBER_RE = re.compile(r'[\d\s.\-/]+')
+MIN_TOKEN_LENGTH = 2
+MAX_TOKEN_LENGTH = 40
+MAX_QUERY_TERMS = 5
+# Orden de los caracteres que puede tener un token (ver `prefix_filter`)
+ALPHABET = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+# Documentos indexados: queryset, peso de cada campo y campo del cliente dueño
+DOCUMENTS = {
+    'honorario': {
+        'model': Honorario,
+        'filter': {},
+        'fields': {'title': 1},
+        'owner': 'user_id',
+    },
+    'client': {
+        'model': User,
+        'filter': {'role': 'client'},
+        'fields': {'razon_social': 3, 'cuit': 3, 'username': 2, 'email': 1},
+        'owner': 'pk',
+    },
+}
+
+
+def document_queryset(kind, queryset=None):
+    """Documentos de `kind` (o los de `queryset`) con sólo las columnas que se indexan."""
+    document = DOCUMENTS[kind]
+    if queryset is None:
+        queryset = document['model'].objects.all()
+    owner = 'id' if document['owner'] == 'pk' else document['owner']
+    return queryset.filter(**document['filter']).only(owner, *document['fields'])
+
+
+def normalize(text):
+    """Minúsculas y sin acentos: 'Pérez' y 'perez' son el mismo token."""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text):
+    tokens = TOKEN_RE.findall(normalize(text or ''))
+    return [token[:MAX_TOKEN_LENGTH] for token in tokens if len(token) >= MIN_TOKEN_LENGTH]
+
+
+def number_token(text):
+    """'30-71234567-9' -> '30712345679'; `None` si el texto no es un número con separadores."""
+    if not text or not NUMBER_RE.fullmatch(text):
+        return None
+    digits = re.sub(r'\D', '', text)[:MAX_TOKEN_LENGTH]
+    return digits if len(digits) >= MIN_TOKEN_LENGTH else None
+
+
+def document_tokens(kind, obj):
+    """`{token: peso}` de un documento; si un token aparece en varios campos vale el mayor peso."""
+    tokens = {}
+    for field, weight in DOCUMENTS[kind]['fields'].items():
+        value = getattr(obj, field) or ''
+        values = tokenize(value)
+        number = number_token(value)
+        if number:
+            values.append(number)
+        for token in values:
+            tokens[token] = max(tokens.get(token, 0), weight)
+    return tokens
+
+
+def _rows(kind, obj):
+    owner_id = getattr(obj, DOCUMENTS[kind]['owner'])
+    return [
+        SearchToken(kind=kind, token=token, object_id=obj.pk, owner_id=owner_id, weight=weight)
+        for token, weight in document_tokens(kind, obj).items()
+    ]
+
+
+def index_documents(kind, objects, batch_size=5000):
+    """(Re)indexa `objects`: borra sus tokens e inserta los nuevos con `bulk_create`."""
+    objects = list(objects)
+    rows = [row for obj in objects for row in _rows(kind, obj)]
+    with transaction.atomic():
+        SearchToken.objects.filter(kind=kind, object_id__in=[obj.pk for obj in objects]).delete()
+        SearchToken.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def sync_document(kind, obj):
+    """Reindexa un documento sólo si cambiaron sus tokens (lo usan los signals)."""
+    # ej. un usuario que deja de ser cliente sale del índice
+    if any(getattr(obj, field) != value for field, value in DOCUMENTS[kind]['filter'].items()):
+        return remove_document(kind, obj.pk)
+    rows = _rows(kind, obj)
+    current = set(SearchToken.objects.filter(kind=kind, object_id=obj.pk).values_list('token', 'weight', 'owner_id'))
+    if current != {(row.token, row.weight, row.owner_id) for row in rows}:
+        index_documents(kind, [obj])
+
+
+def remove_document(kind, pk):
+    SearchToken.objects.filter(kind=kind, object_id=pk).delete()
+
+
+def rebuild_index(kind, queryset=None, batch_size=2000):
+    """Reindexa todos los documentos de `kind` (o los de `queryset`) en lotes por pk.
+
+    Sin `queryset` también borra los tokens de documentos que ya no existen.
+    Devuelve `(documentos, tokens)`.
+    """
+    if queryset is None:
+        SearchToken.objects.filter(kind=kind).delete()
+    queryset = document_queryset(kind, queryset)
+    documents = tokens = 0
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk).order_by('pk')[:batch_size])
+        if not batch:
+            return documents, tokens
+        last_pk = batch[-1].pk
+        documents += len(batch)
+        tokens += index_documents(kind, batch)
+
+
+def query_terms(query):
+    number = number_token(query.strip())
+    if number:
+        return [number]
+    return list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+
+
+def prefix_filter(term):
+    """Tokens que empiezan con `term` como rango: `token >= 'gar' AND token < 'gas'`.
+
+    Un rango usa el índice en cualquier collation; `LIKE BINARY 'gar%'` (el
+    `startswith` de Django en MySQL) no siempre.
+    """
+    for index in range(len(term) - 1, -1, -1):
+        position = ALPHABET.find(term[index])
+        if position < len(ALPHABET) - 1:
+            return Q(token__gte=term, token__lt=term[:index] + ALPHABET[position + 1])
+    return Q(token__gte=term)
+
+
+def search(kind, query, owner_id=None, limit=None):
+    """Documentos de `kind` que contienen todos los términos de `query` (como prefijo).
+
+    Devuelve `[(object_id, rank), ...]` ordenado por relevancia y, a igual
+    relevancia, los más nuevos primero. Se recorren
+    los tokens del término con menos coincidencias y cada documento se
+    confirma con los demás términos por índice, hasta juntar `limit`
+    (`SEARCH_MAX_RESULTS`) coincidencias: el costo depende de ese límite y
+    de la frecuencia del término más selectivo, no del tamaño de la tabla.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+    limit = limit or settings.SEARCH_MAX_RESULTS
+
+    postings = SearchToken.objects.filter(kind=kind)
+    if owner_id is not None:
+        postings = postings.filter(owner_id=owner_id)
+
+    sizes = {term: postings.filter(prefix_filter(term))[:limit].count() for term in terms}
+    driver = min(terms, key=sizes.get)
+    if not sizes[driver]:
+        return []
+
+    # Los tokens del término más selectivo, sólo de documentos que tienen los
+    # demás términos; cada término extra es una búsqueda por (kind, object_id, token)
+    candidates = postings.filter(prefix_filter(driver))
+    others = [term for term in terms if term != driver]
+    for term in others:
+        matches = SearchToken.objects.filter(kind=kind, object_id=OuterRef('object_id')).filter(prefix_filter(term))
+        candidates = candidates.filter(Exists(matches))
+
+    # Primero el token exacto (rankea más alto) y en cada grupo los documentos
+    # más nuevos; los dos recorridos siguen el índice (kind, token, object_id)
+    fields = ('object_id', 'token', 'weight')
+    rows = list(candidates.filter(token=driver).order_by('-object_id').values_list(*fields)[:limit])
+    if len(rows) < limit:
+        prefixed = candidates.exclude(token=driver).order_by('-token', '-object_id')
+        rows += prefixed.values_list(*fields)[:limit - len(rows)]
+
+    # un token exacto vale el doble del peso de su campo; un prefijo, el peso
+    scores = {}
+    for object_id, token, weight in rows:
+        score = weight * (2 if token == driver else 1)
+        if score > scores.get(object_id, 0):
+            scores[object_id] = score
+    # los demás términos suman 1, o el doble del peso si coinciden exactos
+    for term in others:
+        exact = dict(postings.filter(token=term, object_id__in=list(scores)).values_list('object_id', 'weight'))
+        for object_id in scores:
+            scores[object_id] += exact[object_id] * 2 if object_id in exact else 1
+
+    return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
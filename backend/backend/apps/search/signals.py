@@ -0,0 +1,42 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.honorarios.models import Honorario
+from apps.users.models import User
+
+from .services import remove_document, sync_document
+
+# Campos que cambian los tokens de cada documento (los indexados y el dueño)
+INDEXED_FIELDS = {
+    'honorario': {'title', 'user', 'user_id'},
+    'client': {'razon_social', 'cuit', 'username', 'email', 'role'},
+}
+
+
+def _changes_index(kind, update_fields):
+    # `save(update_fields=...)` que no toca campos indexados (ej. status y paid_amount al pagar)
+    return update_fields is None or bool(INDEXED_FIELDS[kind] & set(update_fields))
+
+
+@receiver(post_save, sender=Honorario)
+def index_honorario(sender, instance, update_fields=None, **kwargs):
+    if _changes_index('honorario', update_fields):
+        sync_document('honorario', instance)
+
+
+@receiver(post_save, sender=User)
+def index_client(sender, instance, created=False, update_fields=None, **kwargs):
+    if created and instance.role != 'client':
+        return
+    if _changes_index('client', update_fields):
+        sync_document('client', instance)
+
+
+@receiver(post_delete, sender=Honorario)
+def unindex_honorario(sender, instance, **kwargs):
+    remove_document('honorario', instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def unindex_client(sender, instance, **kwargs):
+    remove_document('client', instance.pk)
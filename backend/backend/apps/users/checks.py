@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.caches, Tags.security)
+def check_shared_token_denylist(app_configs, **kwargs):
+    """La denylist de tokens (ver `core.authentication`) tiene que verse desde todos los workers.
+
+    Con LocMemCache cada proceso tiene la suya: un token revocado en un worker
+    sigue valiendo en los demás hasta que vence.
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    if settings.WEB_CONCURRENCY > 1 and backend.endswith('.LocMemCache'):
+        return [
+            Error(
+                f'The token denylist uses a per-process cache ({backend}) '
+                f'but WEB_CONCURRENCY is {settings.WEB_CONCURRENCY}.',
+                hint="Set CACHE_BACKEND to 'redis' (or 'file' on a single host) so every worker sees revoked tokens.",
+                id='users.E001',
+            )
+        ]
+    return []
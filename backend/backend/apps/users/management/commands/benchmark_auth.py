@@ -0,0 +1,69 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from apps.users.models import User
+from core.authentication import StatelessRoleJWTAuthentication
+from core.jwt import CustomTokenObtainPairSerializer
+
+BACKENDS = {
+    # lo que hacía la API antes: cada request lee la fila del usuario
+    "JWTAuthentication": JWTAuthentication,
+    "StatelessRoleJWTAuthentication": StatelessRoleJWTAuthentication,
+}
+
+
+class RoleView(APIView):
+    """Vista mínima que lee `request.user.role`, como las clases de permisos."""
+
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request):
+        return Response({"role": request.user.role})
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de la autenticación: el mismo request autenticado a una vista mínima "
+        "que lee `request.user.role`, con el `JWTAuthentication` de simplejwt (consulta el "
+        "usuario) y con `StatelessRoleJWTAuthentication` (claims del token y denylist en "
+        "caché). Reporta p50/p95 y consultas por request. Con la base en MySQL la "
+        "diferencia incluye el viaje de red que se ahorra."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", required=True, help="Usuario con el que se firma el token.")
+        parser.add_argument("--requests", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"User {options['username']!r} does not exist.")
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        factory = APIRequestFactory()
+
+        self.stdout.write(f"{'':<32} {'p50':>9} {'p95':>9} {'consultas/req':>14}")
+        for label, backend in BACKENDS.items():
+            view = RoleView.as_view(authentication_classes=(backend,))
+            times = []
+            with CaptureQueriesContext(connection) as queries:
+                for _ in range(options["requests"]):
+                    request = factory.get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+                    started = time.perf_counter()
+                    response = view(request)
+                    times.append(time.perf_counter() - started)
+                    if response.status_code != 200:
+                        raise CommandError(f"{label} returned HTTP {response.status_code}.")
+            percentiles = statistics.quantiles(times, n=20)
+            self.stdout.write(
+                f"{label:<32} {statistics.median(times) * 1e6:>7.0f}µs {percentiles[-1] * 1e6:>7.0f}µs "
+                f"{len(queries) / options['requests']:>14.1f}"
+            )
@@ -14,4 +14,6 @@ class User(AbstractUser):
     razon_social = models.CharField(max_length=100, null=True, unique=True)
     celular = models.CharField(max_length=20, null=True)
     cuit = models.CharField(max_length=20, null=True, unique=True)
+    # última modificación (ETag/Last-Modified de la API)
+    updated_at = models.DateTimeField(auto_now=True)
 
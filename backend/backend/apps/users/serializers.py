@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from core.mixins import EagerLoadingSerializerMixin, SparseFieldsetsMixin
 from .models import User
 
 # User serializer.
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetsMixin, EagerLoadingSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 
@@ -24,4 +25,12 @@ class UserSerializer(serializers.ModelSerializer):
         if password:
             user.set_password(password)
             user.save()
-        return user
\ No newline at end of file
+        return user
+
+# Listados de clientes y empleados (ListClient, ListEmployee): el rol lo fija el endpoint
+class UserListSerializer(SparseFieldsetsMixin, EagerLoadingSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'email', 'first_name', 'last_name',
+                  'razon_social', 'celular', 'cuit', 'is_active']
+        read_only_fields = fields
@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.authentication import revoke_user_tokens
+from core.cache import invalidate
+from .models import User
+
+# Campos que viajan en el token o que deben cortar las sesiones abiertas
+TOKEN_FIELDS = ('role', 'username', 'is_active', 'password')
+
+
+@receiver(pre_save, sender=User)
+def revoke_tokens_on_change(sender, instance, **kwargs):
+    if instance.pk is None:
+        return
+    previous = User.objects.filter(pk=instance.pk).values(*TOKEN_FIELDS).first()
+    if previous and any(previous[field] != getattr(instance, field) for field in TOKEN_FIELDS):
+        revoke_user_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def revoke_tokens_on_delete(sender, instance, **kwargs):
+    revoke_user_tokens(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    # razon_social aparece en los listados de honorarios y pagos
+    for namespace in ('users', 'honorarios', 'payments'):
+        invalidate(namespace, instance.pk)
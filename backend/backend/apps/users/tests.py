@@ -1,3 +1,120 @@
-from django.test import TestCase
+import warnings
+from datetime import date
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.checks import run_checks
+from django.core.paginator import UnorderedObjectListWarning
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.honorarios.models import ClientBalance
+from core.jwt import CustomTokenObtainPairSerializer
+
+from .models import User
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+REDIS = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost'}}
+
+
+class TokenDenylistCheckTests(SimpleTestCase):
+    def errors(self):
+        return [error.id for error in run_checks(tags=['caches'])]
+
+    def test_locmem_with_several_workers_fails(self):
+        with override_settings(CACHES=LOCMEM, WEB_CONCURRENCY=5):
+            self.assertIn('users.E001', self.errors())
+
+    def test_single_worker_or_shared_cache_passes(self):
+        for caches, workers in ((LOCMEM, 1), (REDIS, 5)):
+            with self.subTest(workers=workers), override_settings(CACHES=caches, WEB_CONCURRENCY=workers):
+                self.assertNotIn('users.E001', self.errors())
+
+
+class ProfileQueryTests(TestCase):
+    """`api/profile/` lee el usuario una sola vez por request aunque lo pidan la vista,
+    los validadores del serializer y la respuesta (core.request_cache)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            username="client", email="client@example.com", role="client", razon_social="Cliente", cuit="20-00000001-1",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+        self.api.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {CustomTokenObtainPairSerializer.get_token(self.user).access_token}"
+        )
+
+    def test_retrieve(self):
+        # sólo las columnas del serializer
+        with self.assertNumQueries(1):
+            self.assertEqual(self.api.get("/api/profile/").status_code, 200)
+
+    def test_update(self):
+        # el usuario, el validador de razon_social única, los valores previos que compara
+        # la denylist (signal), el UPDATE y la resincronización del índice de búsqueda
+        with CaptureQueriesContext(connection) as queries, self.assertNumQueries(9):
+            response = self.api.patch("/api/profile/", {"razon_social": "Cliente SA"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        user_reads = [query["sql"] for query in queries if query["sql"].startswith('SELECT "users_user"."id"')]
+        self.assertEqual(len(user_reads), 1)
+
+
+class ClientListTests(TestCase):
+    """`v1/clients/` filtra y ordena por saldo con un orden estable entre páginas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username="admin", email="admin@example.com", role="admin")
+        cls.clients = []
+        balances = (("100", 2, date(2026, 3, 1)), ("100", 1, None), ("50", 1, date(2026, 1, 15)), ("0", 0, None))
+        for index, (outstanding, pending_count, last_payment_date) in enumerate(balances):
+            client = User.objects.create(
+                username=f"client{index}", email=f"client{index}@example.com", role="client",
+                razon_social=f"Cliente {index}", cuit=f"20-{index:08d}-1",
+            )
+            ClientBalance.objects.update_or_create(user=client, defaults={
+                "outstanding": Decimal(outstanding), "pending_count": pending_count, "last_payment_date": last_payment_date,
+            })
+            cls.clients.append(client.pk)
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+        self.api.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {CustomTokenObtainPairSerializer.get_token(self.admin).access_token}"
+        )
+
+    def ids(self, **params):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", UnorderedObjectListWarning)
+            response = self.api.get("/api/v1/clients/", params)
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.data["results"]]
+
+    def test_balance_filters(self):
+        first, second, third, fourth = self.clients
+        for params, expected in (
+            ({"balance__outstanding__gt": "50"}, [first, second]),
+            ({"balance__outstanding__lte": "50"}, [third, fourth]),
+            ({"balance__pending_count": 1}, [second, third]),
+            ({"balance__pending_count__gte": 2}, [first]),
+            ({"balance__last_payment_date__gte": "2026-02-01"}, [first]),
+            ({"balance__last_payment_date__lt": "2026-02-01"}, [third]),
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.ids(**params), expected)
+
+    def test_ordering(self):
+        first, second, third, fourth = self.clients
+        self.assertEqual(self.ids(), [first, second, third, fourth])
+        # los empates de saldo se desempatan por id
+        self.assertEqual(self.ids(ordering="-balance__outstanding"), [first, second, third, fourth])
+        self.assertEqual(self.ids(ordering="balance__outstanding"), [fourth, third, first, second])
+        self.assertEqual(self.ids(ordering="-balance__outstanding", page_size=1, page=2), [second])
+        self.assertEqual(self.ids(ordering="-id"), [fourth, third, second, first])
@@ -1,49 +1,77 @@
-from rest_framework import viewsets, generics
-from rest_framework.permissions import IsAuthenticated
+from rest_framework import generics
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
+from django_filters.rest_framework import DjangoFilterBackend
 from .models import User
-from .serializers import UserSerializer
+from .serializers import UserListSerializer, UserSerializer
 from .permissions import IsAdmin, IsAdminOrEmployee
-from rest_framework.pagination import PageNumberPagination
 from drf_spectacular.utils import extend_schema
-
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 50
+from core.filters import StableOrderingFilter
+from core.pagination import StandardResultsSetPagination
+from core.request_cache import get_cached_object
+from apps.search.filters import IndexedSearchFilter
+from core.conditional import ConditionalGetMixin
+from core.viewsets import ReadPathModelViewSet
 
 
 # Create your views here.
 @extend_schema(tags=["Employees"])
-class EmployeeViewSet(viewsets.ModelViewSet):
+class EmployeeViewSet(ReadPathModelViewSet):
     """
         CRUD para Employees.
         - `admin` puede listar/crear/actualizar/eliminar empleados.
     """
     queryset = User.objects.filter(role='employee')
     serializer_class = UserSerializer
+    action_serializer_classes = {'list': UserListSerializer}
     permission_classes = [IsAuthenticated & IsAdmin]
     pagination_class = StandardResultsSetPagination
+    cache_namespaces = ('users',)
+    batch_actions = ('list', 'retrieve')
 
 @extend_schema(tags=["Clients"])
-class ClientViewSet(viewsets.ModelViewSet):
+class ClientViewSet(ReadPathModelViewSet):
     """
         CRUD para Clients.
         - `admin` y `employee` pueden listar/crear/actualizar/eliminar clientes.
+        - Filtra y ordena por saldo (`balance__outstanding`, ...) y `?search=` busca
+          por razón social, CUIT, usuario o email.
     """
     queryset = User.objects.filter(role='client')
     serializer_class = UserSerializer
+    action_serializer_classes = {'list': UserListSerializer}
     permission_classes = [IsAuthenticated & IsAdminOrEmployee]
     pagination_class = StandardResultsSetPagination
+    filter_backends = (DjangoFilterBackend, StableOrderingFilter, IndexedSearchFilter)
+    filterset_fields = {
+        'balance__outstanding': ['gt', 'gte', 'lt', 'lte'],
+        'balance__pending_count': ['exact', 'gt', 'gte'],
+        'balance__last_payment_date': ['lt', 'gte'],
+    }
+    ordering_fields = ('id', 'razon_social', 'balance__outstanding', 'balance__pending_count', 'balance__last_payment_date')
+    ordering = ('id',)
+    cache_namespaces = ('users',)
+    batch_actions = ('list', 'retrieve')
+    # el saldo no se devuelve pero filtra y ordena el listado
+    conditional_list_related = ('balance',)
+    search_kind = 'client'
 
 @extend_schema(tags=["Profile"])
-class ProfileViewSet(generics.RetrieveUpdateAPIView):
+class ProfileViewSet(ConditionalGetMixin, generics.RetrieveUpdateAPIView):
     """
         Perfil del usuario autenticado.
         - Permite al usuario ver y actualizar su propio perfil.
     """
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    batch_actions = ('retrieve',)
 
     def get_object(self):
-        return self.request.user
+        # request.user es un usuario del token (sin consulta), acá se necesita el modelo
+        queryset = User.objects.all()
+        if self.request.method in SAFE_METHODS:
+            # sólo las columnas que se devuelven (sin password, last_login, ...)
+            queryset = UserSerializer.setup_eager_loading(queryset, fields=self.get_serializer().fields)
+            queryset = self.with_conditional_fields(queryset)
+        # una consulta por request aunque la pidan los validadores y la respuesta
+        return get_cached_object(self.request, queryset, self.request.user.id)
     
\ No newline at end of file
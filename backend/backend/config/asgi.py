@@ -12,5 +12,13 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# las vistas de AsyncViewSetMixin sólo son corrutinas con SERVER_MODE=asgi
+os.environ.setdefault('SERVER_MODE', 'asgi')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# El stream SSE de notificaciones se atiende fuera del handler de Django
+# (importar después de configurar Django)
+from apps.notifications.stream import NotificationStreamMiddleware  # noqa: E402
+
+application = NotificationStreamMiddleware(django_application)
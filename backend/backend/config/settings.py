@@ -21,6 +21,19 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Tamaño máximo de los PDFs subidos por partes (honorarios y tickets)
+PDF_UPLOAD_MAX_SIZE = int(os.getenv('PDF_UPLOAD_MAX_SIZE', 25 * 1024 * 1024))
+# Los PDFs se guardan por contenido en MEDIA_ROOT/blobs (ver core/storage.py).
+# `collect_pdf_blobs` borra los que quedaron sin uso hace más de estas horas
+PDF_BLOB_GC_GRACE_HOURS = int(os.getenv('PDF_BLOB_GC_GRACE_HOURS', 24))
+# Binario de qpdf para `optimize_pdf_blobs` (recomprime y linealiza); opcional
+PDF_OPTIMIZER = os.getenv('PDF_OPTIMIZER', 'qpdf')
+# Binario de poppler que genera las vistas previas de los PDFs (jobs `pdf_previews`)
+PDF_RASTERIZER = os.getenv('PDF_RASTERIZER', 'pdftoppm')
+# Entrega de PDFs protegidos: 'django' (FileResponse), 'nginx' (X-Accel-Redirect) o 'apache' (X-Sendfile)
+PROTECTED_MEDIA_SERVER = os.getenv('PROTECTED_MEDIA_SERVER', 'django')
+# location `internal` de nginx que apunta a MEDIA_ROOT
+PROTECTED_MEDIA_INTERNAL_URL = os.getenv('PROTECTED_MEDIA_INTERNAL_URL', '/protected-media/')
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
@@ -47,7 +60,7 @@ INSTALLED_APPS = [
     'apps.users',
     'apps.honorarios',
     'apps.notifications',
-    'apps.documentos',
+    'apps.search',
     'corsheaders',
     'django_filters',
 ]
@@ -94,11 +107,94 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
         'PORT': os.getenv('DB_PORT'),
+        # segundos que se reutiliza una conexión entre requests del mismo thread (0 = una por request)
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 0)),
+        # antes de reutilizarla se verifica que siga viva (ej. MySQL la cerró por wait_timeout)
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Base SQLite local en lugar de MySQL (pruebas de carga, ver load_test.sh)
+if os.getenv('DB_ENGINE') == 'sqlite':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('DB_NAME') or BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        'CONN_HEALTH_CHECKS': True,
+        # SQLite ignora select_for_update: cada transacción toma el lock de escritura
+        # al empezar, así dos pagos simultáneos se serializan igual que con MySQL
+        'OPTIONS': {'timeout': 20, 'transaction_mode': 'IMMEDIATE'},
+        # en archivo: la base en memoria compartida no admite escrituras desde varios threads
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+    }
+
+# Réplica de lectura: DB_REPLICA_HOST (MySQL) o DB_REPLICA_NAME (otro archivo con
+# DB_ENGINE=sqlite, ej. una copia de db.sqlite3). Las vistas con ReadReplicaMixin
+# leen de ella; el resto y todas las escrituras usan `default` (core/db_router.py).
+if os.getenv('DB_REPLICA_HOST') or os.getenv('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.getenv('DB_REPLICA_HOST') or DATABASES['default'].get('HOST'),
+        'NAME': os.getenv('DB_REPLICA_NAME') or DATABASES['default']['NAME'],
+        'PORT': os.getenv('DB_REPLICA_PORT') or DATABASES['default'].get('PORT'),
+        # en los tests la réplica es la misma base de test que `default`
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+# segundos que un usuario lee de `default` después de escribir (read-your-writes) y que
+# lo recién invalidado de la caché se lee de `default`: tiene que cubrir el atraso de la réplica
+DATABASE_REPLICA_STICKY_SECONDS = int(os.getenv('DATABASE_REPLICA_STICKY_SECONDS', 5))
+
 AUTH_USER_MODEL = 'users.User'
 
+# Búsqueda (`?search=`, ver apps/search/services.py): máximo de resultados
+# rankeados; acota también los tokens que se leen por búsqueda
+SEARCH_MAX_RESULTS = int(os.getenv('SEARCH_MAX_RESULTS', 500))
+
+# Cache
+# CACHE_BACKEND: 'locmem' (por proceso), 'file' o 'redis' (requiere el paquete `redis`).
+# La denylist de tokens vive en esta caché: con varios workers tiene que ser
+# compartida ('redis' o 'file'); el check users.E001 no deja arrancar con locmem.
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+# 'wsgi' o 'asgi'; config/asgi.py lo fija en 'asgi' (ver AsyncViewSetMixin y gunicorn.conf.py)
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+# Procesos que atienden la API; gunicorn.conf.py lo exporta con los workers calculados
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 1))
+CACHE_LOCATIONS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'appestudio'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', '/var/tmp/appestudio_cache'),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+}
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_LOCATIONS[CACHE_BACKEND][0],
+        'LOCATION': os.getenv('CACHE_LOCATION', CACHE_LOCATIONS[CACHE_BACKEND][1]),
+    }
+}
+# Segundos que vive una respuesta cacheada de la API (se invalida antes por signals)
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', 600))
+
+# Batch de GETs (`POST /api/batch/`, ver core/batch.py): sub-requests por
+# batch y threads que los ejecutan en paralelo en cada proceso (1 = en serie)
+BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', 20))
+BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', 4))
+
+# Stream SSE de notificaciones (apps.notifications.hub)
+NOTIFICATIONS_HUB = os.getenv('NOTIFICATIONS_HUB', 'apps.notifications.hub.InProcessHub')
+NOTIFICATIONS_POLL_INTERVAL = float(os.getenv('NOTIFICATIONS_POLL_INTERVAL', 1))
+# ids hacia atrás que se releen en cada consulta (filas confirmadas fuera de orden)
+NOTIFICATIONS_POLL_LOOKBACK = int(os.getenv('NOTIFICATIONS_POLL_LOOKBACK', 100))
+NOTIFICATIONS_STREAM_HEARTBEAT = int(os.getenv('NOTIFICATIONS_STREAM_HEARTBEAT', 15))
+# eventos que puede acumular una conexión lenta antes de cortarla
+NOTIFICATIONS_STREAM_QUEUE_SIZE = int(os.getenv('NOTIFICATIONS_STREAM_QUEUE_SIZE', 100))
+# milisegundos que espera el navegador antes de reconectar
+NOTIFICATIONS_STREAM_RETRY = int(os.getenv('NOTIFICATIONS_STREAM_RETRY', 3000))
+# segundos que vale el ticket de un solo uso para abrir el stream (el token no va en la URL)
+NOTIFICATIONS_STREAM_TICKET_TTL = int(os.getenv('NOTIFICATIONS_STREAM_TICKET_TTL', 30))
+# `purge_jobs` borra los jobs terminados hace más de estos días
+JOBS_RETENTION_DAYS = int(os.getenv('JOBS_RETENTION_DAYS', 7))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -143,7 +239,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.StatelessRoleJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -154,6 +250,8 @@ REST_FRAMEWORK = {
 from datetime import timedelta
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=15),
+    # role/id viajan en el token: la autenticación no consulta la tabla de usuarios
+    "TOKEN_USER_CLASS": "core.authentication.RoleTokenUser",
 }
 
 SPECTACULAR_SETTINGS = {
@@ -0,0 +1,41 @@
+"""
+Perfil de producción: `DJANGO_SETTINGS_MODULE=config.settings_production`.
+
+Se usa con `gunicorn -c gunicorn.conf.py` (ver ese archivo para los workers).
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, REST_FRAMEWORK, SERVER_MODE
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.getenv('DJANGO_ALLOWED_HOSTS', '*').split(',')
+
+# Bajo WSGI cada thread de gunicorn conserva su conexión a MySQL: el pool son los
+# `workers * threads` threads y se evita el handshake en cada request. Bajo ASGI
+# Django atiende cada request en un thread nuevo, así que una conexión persistente
+# quedaría abierta sin dueño; ahí se cierra al terminar (o se usa un pooler como
+# ProxySQL delante de MySQL apuntando DB_HOST a él).
+DATABASES['default']['CONN_MAX_AGE'] = int(
+    os.getenv('DB_CONN_MAX_AGE', 300 if SERVER_MODE == 'wsgi' else 0)
+)
+
+# Sin la API navegable: sólo JSON
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+}
+
+# Detrás de un proxy que termina TLS (nginx)
+SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+SESSION_COOKIE_SECURE = True
+CSRF_COOKIE_SECURE = True
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {'console': {'class': 'logging.StreamHandler'}},
+    'root': {'handlers': ['console'], 'level': os.getenv('DJANGO_LOG_LEVEL', 'WARNING')},
+}
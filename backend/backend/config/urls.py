@@ -16,25 +16,25 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from rest_framework_simplejwt.views import (
-    TokenRefreshView,
-)
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 import apps.users.urls  as users_urls
 import apps.honorarios.urls as honorarios_urls
-import apps.documentos.urls as documentos_urls
+import apps.notifications.urls as notifications_urls
 from apps.users.views import ProfileViewSet
-from core.jwt import CustomTokenObtainPairView
+from core.jwt import CustomTokenObtainPairView, CustomTokenRefreshView
+from core.views import BatchView, CacheStatsView
 
 urlpatterns = [
     path('api/token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/token/refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'),
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/schema/swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('api/', include(users_urls), name='users'),
     path('api/', include(honorarios_urls)),
-    path('api/', include(documentos_urls)),
+    path('api/', include(notifications_urls)),
     path('api/profile/', ProfileViewSet.as_view(), name='profile'),
+    path('api/cache/stats/', CacheStatsView.as_view(), name='cache-stats'),
+    path('api/batch/', BatchView.as_view(), name='batch'),
 ]
 
 from django.conf.urls.static import static
@@ -0,0 +1,163 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models.fields.files import FieldFile, FileField
+from django.http import Http404
+from django.views.decorators.csrf import csrf_exempt
+from django_filters import ModelChoiceFilter
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+
+class AsyncViewSetMixin:
+    """Atiende `list`, `retrieve` y `create` como corrutinas bajo ASGI.
+
+    Cada acción de `async_actions` tiene su versión `a<acción>` que usa el ORM
+    async (`acount`, `aget`, iteración async). Lo que sólo existe sincrónico
+    se ejecuta con `sync_to_async`: la validación de filtros por FK de
+    django-filter, la validación del serializer y `perform_create` (las
+    transacciones y `select_for_update` no pueden cruzar un `await`).
+    Los archivos subidos se escriben en el storage en el pool de threads
+    antes de abrir la transacción.
+
+    Los permisos, filtros, paginación y `get_queryset` son los mismos de la
+    vista sincrónica. Sólo con `SERVER_MODE = 'asgi'` `as_view` devuelve una
+    corrutina; bajo WSGI devuelve la vista sincrónica de DRF (una vista async
+    levantaría un event loop por request). Los demás métodos de la ruta
+    (PUT/PATCH/DELETE) van siempre por la vista sincrónica.
+    """
+
+    async_actions = ("list", "retrieve", "create")
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        async_methods = {method for method, action in actions.items() if action in cls.async_actions}
+        if settings.SERVER_MODE != "asgi" or not async_methods:
+            return view
+        sync_view = sync_to_async(view)
+
+        @wraps(view)
+        async def async_view(request, *args, **kwargs):
+            if request.method.lower() not in async_methods or not isinstance(request, ASGIRequest):
+                return await sync_view(request, *args, **kwargs)
+            self = cls(**initkwargs)
+            self.action_map = actions
+            for method, action in actions.items():
+                setattr(self, method, getattr(self, action))
+            self.args = args
+            self.kwargs = kwargs
+            return await self.adispatch(request, *args, **kwargs)
+
+        # la vista sincrónica, para quien ya corre en un thread (ver core.batch)
+        async_view.blocking_view = view
+        return csrf_exempt(async_view)
+
+    async def adispatch(self, request, *args, **kwargs):
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            if request.method in SAFE_METHODS:
+                # JWT sin estado y permisos por rol: no consultan la base
+                self.initial(request, *args, **kwargs)
+            else:
+                # los permisos de escritura pueden cargar objetos (ej. PaymentPermission)
+                await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await getattr(self, f"a{self.action}")(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def afilter_queryset(self, queryset):
+        # los filtros por FK (ej. `?user=`) validan el id contra la base
+        if self._filters_query_database():
+            return await sync_to_async(self.filter_queryset)(queryset)
+        return self.filter_queryset(queryset)
+
+    def _filters_query_database(self):
+        params = self.request.query_params
+        # `?search=` de IndexedSearchFilter consulta el índice al filtrar
+        if any(getattr(backend, "search_param", None) in params for backend in self.filter_backends):
+            return True
+        if DjangoFilterBackend not in self.filter_backends:
+            return False
+        filterset_class = DjangoFilterBackend().get_filterset_class(self, self.get_queryset())
+        if filterset_class is None:
+            return False
+        return any(
+            isinstance(filter_, ModelChoiceFilter) and name in params
+            for name, filter_ in filterset_class.base_filters.items()
+        )
+
+    async def aget_object(self):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, DjangoValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        if self.paginator is not None:
+            if hasattr(self.paginator, "apaginate_queryset"):
+                page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+            else:
+                page = await sync_to_async(self.paginate_queryset)(queryset)
+            if page is not None:
+                return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        rows = [obj async for obj in queryset]
+        return Response(self.get_serializer(rows, many=True).data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(self.get_serializer(instance).data)
+
+    async def acreate(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        stored = await self.astore_files(serializer)
+        try:
+            await sync_to_async(self.perform_create)(serializer)
+        except Exception:
+            for field_file in stored:
+                if getattr(field_file.storage, "shared_files", False):
+                    continue
+                await sync_to_async(field_file.storage.delete, thread_sensitive=False)(field_file.name)
+            raise
+        # las relaciones de la instancia son los objetos que cargó la validación
+        data = serializer.data
+        return Response(data, status=status.HTTP_201_CREATED, headers=self.get_success_headers(data))
+
+    async def astore_files(self, serializer):
+        """Escribe los archivos subidos en el storage fuera de la transacción.
+
+        El storage de Django es sincrónico: la escritura va al pool de threads
+        (`thread_sensitive=False`) y el campo queda apuntando al archivo ya
+        guardado, así `save()` no lo vuelve a escribir dentro de la transacción.
+        """
+        model = serializer.Meta.model
+        stored = []
+        for name, value in list(serializer.validated_data.items()):
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if not isinstance(field, FileField) or not value or isinstance(value, FieldFile):
+                continue
+            filename = field.generate_filename(None, value.name)
+            saved_name = await sync_to_async(field.storage.save, thread_sensitive=False)(filename, value)
+            field_file = FieldFile(None, field, saved_name)
+            serializer.validated_data[name] = field_file
+            stored.append(field_file)
+        return stored
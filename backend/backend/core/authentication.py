@@ -0,0 +1,66 @@
+import time
+
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+DENYLIST_KEY = 'jwt:revoked:{user_id}'
+
+
+def revoke_user_tokens(user_id):
+    """Invalida todos los tokens emitidos hasta ahora para el usuario.
+
+    Se guarda en la caché el momento de la revocación; los tokens con `iat`
+    anterior se rechazan. Dura lo mismo que un refresh token, después ya no
+    queda ningún token viejo válido.
+    """
+    cache.set(
+        DENYLIST_KEY.format(user_id=user_id),
+        int(time.time()),
+        timeout=int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds()),
+    )
+
+
+def is_token_revoked(token):
+    revoked_at = cache.get(DENYLIST_KEY.format(user_id=token.get(api_settings.USER_ID_CLAIM)))
+    return revoked_at is not None and token.get('iat', 0) < revoked_at
+
+
+class RoleTokenUser(TokenUser):
+    """Usuario armado desde los claims del access token (sin consultar la base).
+
+    Se configura como `SIMPLE_JWT['TOKEN_USER_CLASS']`.
+    """
+
+    @cached_property
+    def id(self):
+        # El claim llega como texto; los modelos comparan contra ids enteros (obj.user_id == user.id)
+        user_id = self.token[api_settings.USER_ID_CLAIM]
+        return int(user_id) if isinstance(user_id, str) and user_id.isdigit() else user_id
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+    @property
+    def role(self):
+        return self.token.get('role')
+
+
+class StatelessRoleJWTAuthentication(JWTStatelessUserAuthentication):
+    """Autenticación JWT que no carga el `User` de MySQL en cada request.
+
+    El `role` y el id viajan como claims del token. Las desactivaciones y los
+    cambios de rol/contraseña se aplican con la denylist en caché (ver
+    `apps.users.signals`).
+    """
+
+    def get_user(self, validated_token):
+        if 'role' not in validated_token:
+            raise InvalidToken('Token has no role claim, please log in again.')
+        if is_token_revoked(validated_token):
+            raise AuthenticationFailed('Token has been revoked.', code='token_revoked')
+        return super().get_user(validated_token)
@@ -0,0 +1,150 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import serializers
+
+from core.request_cache import get_request_cache
+
+# headers que puede traer cada sub-request; el resto (host, idioma, Accept) es el del batch
+SUBREQUEST_HEADERS = ('If-None-Match', 'If-Modified-Since')
+# headers de cada respuesta que se devuelven
+RESPONSE_HEADERS = ('ETag', 'Last-Modified', 'X-Cache')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    # se crea en el primer batch: con `preload_app` de gunicorn los threads no sobreviven al fork
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.BATCH_MAX_WORKERS, thread_name_prefix='batch')
+    return _executor
+
+
+def batch_action(view):
+    """Acción de un GET a `view`: la del router en los viewsets, `retrieve` en las vistas genéricas."""
+    actions = getattr(view, 'actions', None)
+    if actions is not None:
+        return actions.get('get')
+    return 'retrieve'
+
+
+class BatchItemSerializer(serializers.Serializer):
+    id = serializers.CharField(max_length=100, required=False)
+    path = serializers.CharField(max_length=2000)
+    headers = serializers.DictField(child=serializers.CharField(max_length=500), required=False)
+
+    def validate_path(self, value):
+        url = urlsplit(value)
+        if url.scheme or url.netloc or not url.path.startswith('/'):
+            raise serializers.ValidationError('Must be an absolute path, e.g. /api/v1/honorario/.')
+        try:
+            match = resolve(url.path)
+        except Resolver404:
+            raise serializers.ValidationError(f'Unknown path {url.path}.')
+        view_class = getattr(match.func, 'cls', None)
+        if batch_action(match.func) not in getattr(view_class, 'batch_actions', ()):
+            raise serializers.ValidationError(f'GET {url.path} cannot be batched.')
+        return value
+
+    def validate_headers(self, value):
+        allowed = {name.lower(): name for name in SUBREQUEST_HEADERS}
+        unknown = sorted(name for name in value if name.lower() not in allowed)
+        if unknown:
+            raise serializers.ValidationError(f"Unsupported headers: {', '.join(unknown)}.")
+        return {allowed[name.lower()]: header for name, header in value.items()}
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = BatchItemSerializer(many=True, allow_empty=False)
+
+    def validate_requests(self, value):
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(f'At most {settings.BATCH_MAX_REQUESTS} requests per batch.')
+        return value
+
+
+class SubRequest(HttpRequest):
+    """GET interno de un batch, armado como lo haría el servidor.
+
+    Copia del request del batch el host, el esquema y los headers (salvo los
+    condicionales, que trae cada sub-request), así las URLs absolutas, las
+    claves de la caché de respuestas y los ETag son los de un GET directo.
+    Hereda el usuario ya autenticado y la caché de objetos del request.
+    """
+
+    def __init__(self, request, path, headers):
+        super().__init__()
+        url = urlsplit(path)
+        self.method = 'GET'
+        self.path = self.path_info = url.path
+        self.META = {
+            key: value
+            for key, value in request.META.items()
+            if isinstance(value, str) and not key.startswith(('HTTP_IF_', 'CONTENT_'))
+        }
+        self.META.update(REQUEST_METHOD='GET', PATH_INFO=url.path, QUERY_STRING=url.query)
+        for name, value in headers.items():
+            self.META['HTTP_' + name.upper().replace('-', '_')] = value
+        self.GET = QueryDict(url.query)
+        self.resolver_match = resolve(url.path)
+        self._scheme = request.scheme
+        # DRF toma estos como el resultado de la autenticación (no vuelve a validar el JWT)
+        self._force_auth_user = request.user
+        self._force_auth_token = request.auth
+        self._object_cache = get_request_cache(request)
+
+    def _get_scheme(self):
+        return self._scheme
+
+
+def run_subrequest(request, item, in_thread=False):
+    """Ejecuta un sub-request y devuelve `{id, status, headers, body}`."""
+    subrequest = SubRequest(request, item['path'], item.get('headers', {}))
+    match = subrequest.resolver_match
+    # bajo ASGI los viewsets de ReadPathModelViewSet son corrutinas: acá se usa su versión sincrónica
+    view = getattr(match.func, 'blocking_view', match.func)
+    if in_thread:
+        close_old_connections()
+    try:
+        response = view(subrequest, *match.args, **match.kwargs)
+    finally:
+        if in_thread:
+            # cada thread del pool tiene su conexión: se respeta CONN_MAX_AGE como en un request
+            close_old_connections()
+    return {
+        'id': item.get('id'),
+        'status': response.status_code,
+        'headers': {name: response[name] for name in RESPONSE_HEADERS if name in response},
+        'body': getattr(response, 'data', None),
+    }
+
+
+def run_batch(request, items):
+    """Ejecuta los GET de `items` y devuelve sus respuestas en el mismo orden.
+
+    Son lecturas, independientes entre sí: corren en paralelo en el pool de
+    `BATCH_MAX_WORKERS` threads, cada uno con su conexión a la base. Dentro de
+    una transacción (ej. `ATOMIC_REQUESTS`) corren en el thread del request,
+    porque otra conexión no vería lo que todavía no se confirmó.
+
+    Cada sub-request corre en una copia del contexto del request
+    (`contextvars`, ej. la réplica de `core.db_router`): hereda sus valores y
+    lo que fije no queda en el thread del pool para el próximo batch.
+    """
+    if len(items) == 1 or settings.BATCH_MAX_WORKERS < 2 or connection.in_atomic_block:
+        return [run_subrequest(request, item) for item in items]
+    executor = get_executor()
+    futures = [
+        executor.submit(contextvars.copy_context().run, run_subrequest, request, item, in_thread=True)
+        for item in items
+    ]
+    return [future.result() for future in futures]
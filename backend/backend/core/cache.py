@@ -0,0 +1,155 @@
+import hashlib
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+# Las claves llevan la versión de cada namespace del que depende la respuesta.
+# Invalidar es incrementar una versión: las entradas viejas quedan huérfanas y
+# expiran solas. Cada namespace tiene tres niveles:
+#   gen      -> invalida todo el namespace
+#   all      -> respuestas de admin/employee (ven todo)
+#   user:<id> -> respuestas de un cliente (sólo ve lo suyo)
+VERSION_KEY = 'api:v:{namespace}:{scope}'
+STATS_KEY = 'api:stats:{namespace}:{result}'
+# Scopes recién invalidados: hasta que la réplica se ponga al día sus lecturas
+# van a `default`, si no volverían a llenar la caché con datos viejos bajo la
+# versión nueva (ver `recently_invalidated` y `ReadReplicaMixin`).
+PRIMARY_KEY = 'db:primary:{namespace}:{scope}'
+
+
+def _incr(key):
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def _bump(namespace, scopes):
+    for scope in scopes:
+        _incr(VERSION_KEY.format(namespace=namespace, scope=scope))
+    if settings.DATABASE_REPLICAS:
+        cache.set_many(
+            {PRIMARY_KEY.format(namespace=namespace, scope=scope): 1 for scope in scopes},
+            timeout=settings.DATABASE_REPLICA_STICKY_SECONDS,
+        )
+
+
+def _user_scope(user):
+    return 'all' if getattr(user, 'role', None) in ('admin', 'employee') else f'user:{user.id}'
+
+
+def invalidate(namespace, *user_ids):
+    """Invalida las respuestas cacheadas de `namespace` al confirmar la transacción.
+
+    Con `user_ids` se invalidan las de staff y las de esos clientes; sin
+    `user_ids` (ej. `UPDATE` masivos) se invalida todo el namespace.
+    """
+    if user_ids:
+        scopes = ['all'] + [f'user:{user_id}' for user_id in set(user_ids) if user_id is not None]
+    else:
+        scopes = ['gen']
+    transaction.on_commit(partial(_bump, namespace, scopes))
+
+
+def recently_invalidated(namespaces, user):
+    """True si algo de `namespaces` que ve `user` se invalidó hace menos de `DATABASE_REPLICA_STICKY_SECONDS`."""
+    scopes = ('gen', _user_scope(user))
+    keys = [PRIMARY_KEY.format(namespace=namespace, scope=scope) for namespace in namespaces for scope in scopes]
+    return bool(keys) and bool(cache.get_many(keys))
+
+
+def response_cache_key(request, namespaces, prefix):
+    user = request.user
+    role = getattr(user, 'role', None)
+    scope = _user_scope(user)
+    version_keys = []
+    for namespace in namespaces:
+        version_keys.append(VERSION_KEY.format(namespace=namespace, scope='gen'))
+        version_keys.append(VERSION_KEY.format(namespace=namespace, scope=scope))
+    versions = cache.get_many(version_keys)
+    version = '.'.join(str(versions.get(key, 0)) for key in version_keys)
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return f'api:resp:{prefix}:{version}:{role}:{user.id}:{url}'
+
+
+def record_stat(namespace, result):
+    _incr(STATS_KEY.format(namespace=namespace, result=result))
+
+
+def get_stats(namespaces):
+    keys = {
+        (namespace, result): STATS_KEY.format(namespace=namespace, result=result)
+        for namespace in namespaces
+        for result in ('hit', 'miss')
+    }
+    values = cache.get_many(keys.values())
+    stats = {}
+    for (namespace, result), key in keys.items():
+        stats.setdefault(namespace, {'hit': 0, 'miss': 0})[result] = values.get(key, 0)
+    return stats
+
+
+class CachedResponseMixin:
+    """Cachea las respuestas de `list` y `retrieve` de un viewset.
+
+    La clave depende del rol, del usuario, de la URL completa (filtros, orden y
+    página) y de las versiones de `cache_namespaces`; los signals de los
+    modelos las invalidan (ver `invalidate`). Agrega `X-Cache: HIT|MISS`.
+    """
+
+    cache_namespaces = ()
+    cache_timeout = None
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response('list', super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response('retrieve', super().retrieve, request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        return await self._acached_response('list', super().alist, request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self._acached_response('retrieve', super().aretrieve, request, *args, **kwargs)
+
+    def _cached_response(self, action, handler, request, *args, **kwargs):
+        namespace = self.cache_namespaces[0]
+        key = response_cache_key(request, self.cache_namespaces, f'{namespace}.{action}')
+        data = cache.get(key)
+        if data is not None:
+            record_stat(namespace, 'hit')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        record_stat(namespace, 'miss')
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = self.cache_timeout if self.cache_timeout is not None else settings.API_CACHE_TIMEOUT
+            cache.set(key, response.data, timeout=timeout)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    async def _acached_response(self, action, handler, request, *args, **kwargs):
+        # Versión para AsyncViewSetMixin. Las lecturas de caché (locmem/redis)
+        # tardan menos que un salto a un thread, se hacen en línea.
+        namespace = self.cache_namespaces[0]
+        key = response_cache_key(request, self.cache_namespaces, f'{namespace}.{action}')
+        data = cache.get(key)
+        if data is not None:
+            record_stat(namespace, 'hit')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        record_stat(namespace, 'miss')
+        response = await handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = self.cache_timeout if self.cache_timeout is not None else settings.API_CACHE_TIMEOUT
+            cache.set(key, response.data, timeout=timeout)
+        response['X-Cache'] = 'MISS'
+        return response
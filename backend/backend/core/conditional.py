@@ -0,0 +1,158 @@
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class ConditionalGetMixin:
+    """ETag y Last-Modified en `list` y `retrieve`; `304 Not Modified` si nada cambió.
+
+    Los validadores salen de `updated_at` (`conditional_field`) de las filas y
+    de las relaciones que lee el serializer (su `select_related`, ej. la
+    `razon_social` del cliente):
+
+    - Listado: un `SELECT COUNT(*), MAX(updated_at)` sobre el queryset ya
+      filtrado, antes de paginar, de la caché de respuestas y de serializar.
+      El `COUNT` detecta las bajas, que no dejan `updated_at`.
+      `conditional_list_related` agrega relaciones que no se devuelven pero
+      filtran u ordenan el listado.
+    - Detalle: el objeto que cargó `get_object` (con los permisos ya aplicados).
+
+    El ETag incluye el usuario, la URL completa (filtros, página, `?fields=`)
+    y el formato, así no se comparte entre usuarios ni entre páginas. Las
+    respuestas van con `Cache-Control: private, no-cache`: el navegador las
+    guarda y las revalida solo con `If-None-Match`. `If-Modified-Since` sólo
+    se evalúa en el detalle: en un listado una baja no mueve el `MAX`.
+    """
+
+    conditional_field = 'updated_at'
+    conditional_list_related = ()
+
+    def list(self, request, *args, **kwargs):
+        validators = self.get_list_validators(self.filter_queryset(self.get_queryset()))
+        if self.is_not_modified(request, *validators):
+            return self.not_modified_response(*validators)
+        return self.add_validators(super().list(request, *args, **kwargs), *validators)
+
+    def retrieve(self, request, *args, **kwargs):
+        validators = self.get_object_validators(self.get_object())
+        if self.is_not_modified(request, *validators, detail=True):
+            return self.not_modified_response(*validators)
+        return self.add_validators(super().retrieve(request, *args, **kwargs), *validators)
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        validators = self._list_validators(await queryset.aaggregate(**self._list_aggregates(queryset.model)))
+        if self.is_not_modified(request, *validators):
+            return self.not_modified_response(*validators)
+        return self.add_validators(await super().alist(request, *args, **kwargs), *validators)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        validators = self.get_object_validators(await self.aget_object())
+        if self.is_not_modified(request, *validators, detail=True):
+            return self.not_modified_response(*validators)
+        return self.add_validators(await super().aretrieve(request, *args, **kwargs), *validators)
+
+    # `retrieve` carga el objeto para los validadores: la acción reutiliza ese
+    def get_object(self):
+        if getattr(self, '_conditional_object', None) is None:
+            self._conditional_object = super().get_object()
+        return self._conditional_object
+
+    async def aget_object(self):
+        if getattr(self, '_conditional_object', None) is None:
+            self._conditional_object = await super().aget_object()
+        return self._conditional_object
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if getattr(self, 'action', None) == 'retrieve':
+            queryset = self.with_conditional_fields(queryset)
+        return queryset
+
+    def with_conditional_fields(self, queryset):
+        """Suma al `only()` del queryset las columnas de los validadores (leerlas no es otra consulta)."""
+        names, defer = queryset.query.deferred_loading
+        if names and not defer:
+            queryset = queryset.only(*names, *self.get_conditional_paths(queryset.model))
+        return queryset
+
+    def get_conditional_paths(self, model, relations=()):
+        """`updated_at` del modelo y de las relaciones del serializer que lo tienen."""
+        serializer_class = self.get_serializer_class()
+        if hasattr(serializer_class, 'get_select_related'):
+            relations = (*serializer_class.get_select_related(self.get_serializer().fields), *relations)
+        paths = [self.conditional_field]
+        for relation in dict.fromkeys(relations):
+            related_model = model
+            for part in relation.split('__'):
+                related_model = related_model._meta.get_field(part).related_model
+            try:
+                related_model._meta.get_field(self.conditional_field)
+            except FieldDoesNotExist:
+                continue
+            paths.append(f'{relation}__{self.conditional_field}')
+        return paths
+
+    def get_list_validators(self, queryset):
+        return self._list_validators(queryset.aggregate(**self._list_aggregates(queryset.model)))
+
+    def _list_aggregates(self, model):
+        paths = self.get_conditional_paths(model, self.conditional_list_related)
+        return {'count': Count('pk'), **{f'max_{index}': Max(path) for index, path in enumerate(paths)}}
+
+    def _list_validators(self, values):
+        count = values.pop('count')
+        return self.make_validators(count, *values.values())
+
+    def get_object_validators(self, instance):
+        timestamps = []
+        for path in self.get_conditional_paths(type(instance)):
+            value = instance
+            for attr in path.split('__'):
+                value = getattr(value, attr, None) if value is not None else None
+            timestamps.append(value)
+        return self.make_validators(instance.pk, *timestamps)
+
+    def make_validators(self, key, *timestamps):
+        """`(etag, last_modified)`; el ETag es débil: dos formatos del mismo contenido no son idénticos."""
+        request = self.request
+        user = request.user
+        renderer = getattr(request, 'accepted_renderer', None)
+        parts = (
+            type(self).__name__, getattr(self, 'action', None), getattr(user, 'role', None), user.id,
+            getattr(renderer, 'format', None), request.get_full_path(), key,
+            *(timestamp.isoformat() if timestamp else '' for timestamp in timestamps),
+        )
+        etag = 'W/"%s"' % hashlib.md5('|'.join(map(str, parts)).encode()).hexdigest()
+        last_modified = max((timestamp for timestamp in timestamps if timestamp), default=None)
+        return etag, last_modified
+
+    def is_not_modified(self, request, etag, last_modified, detail=False):
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            # comparación débil: se ignora el prefijo W/
+            tags = {tag.removeprefix('W/') for tag in parse_etags(if_none_match)}
+            return '*' in tags or etag.removeprefix('W/') in tags
+        if detail and last_modified is not None:
+            since = parse_http_date_safe(request.headers.get('If-Modified-Since'))
+            return since is not None and int(last_modified.timestamp()) <= since
+        return False
+
+    def not_modified_response(self, etag, last_modified):
+        return self.add_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified)
+
+    def add_validators(self, response, etag, last_modified):
+        if response.status_code not in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        patch_cache_control(response, private=True, no_cache=True)
+        # la misma URL devuelve otra cosa con otro token
+        patch_vary_headers(response, ('Authorization',))
+        return response
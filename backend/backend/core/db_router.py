@@ -0,0 +1,95 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+from core.cache import recently_invalidated
+
+STICKY_KEY = 'db:sticky:{user_id}'
+
+# Alias de la réplica elegida para el request en curso. Es una ContextVar: bajo
+# WSGI es por thread y bajo ASGI por request, y `sync_to_async` la propaga.
+_read_alias = ContextVar('read_alias', default=None)
+
+
+class ReplicaRouter:
+    """Manda las lecturas a una réplica sólo cuando la vista lo pidió.
+
+    Fuera de `ReadReplicaMixin` (escrituras, comandos, workers, admin) no
+    devuelve nada y Django usa `default` o la base de la instancia relacionada.
+    Las escrituras van siempre a `default`.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # las réplicas son copias de `default`: los objetos se pueden relacionar
+        return True
+
+
+def mark_sticky(user_id):
+    """Las lecturas de `user_id` van a `default` durante `DATABASE_REPLICA_STICKY_SECONDS`.
+
+    Así quien acaba de escribir ve su cambio aunque la réplica venga atrasada.
+    Con varios workers la caché tiene que ser compartida (redis).
+    """
+    cache.set(STICKY_KEY.format(user_id=user_id), 1, timeout=settings.DATABASE_REPLICA_STICKY_SECONDS)
+
+
+def is_sticky(user_id):
+    return cache.get(STICKY_KEY.format(user_id=user_id)) is not None
+
+
+class ReadReplicaMixin:
+    """Atiende las acciones de `replica_actions` desde una réplica de lectura.
+
+    Sólo para métodos seguros y si hay réplicas configuradas
+    (`DATABASE_REPLICAS`). Después de un POST/PUT/PATCH/DELETE exitoso el
+    usuario lee de `default` por unos segundos (ver `mark_sticky`); lo mismo
+    cualquiera que lea un `cache_namespaces` recién invalidado, así la réplica
+    atrasada no vuelve a llenar la caché con lo viejo. Con `replica_actions = ()`
+    el viewset usa siempre `default`.
+    """
+
+    replica_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        _read_alias.set(self.get_read_database(request))
+        super().initial(request, *args, **kwargs)
+
+    def get_read_database(self, request):
+        if request.method not in SAFE_METHODS or self.action not in self.replica_actions:
+            return None
+        if not settings.DATABASE_REPLICAS:
+            return None
+        user = request.user
+        if user.is_authenticated and is_sticky(user.id):
+            return None
+        if recently_invalidated(getattr(self, 'cache_namespaces', ()), user):
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        alias = _read_alias.get()
+        # `export/` itera el queryset mientras se envía la respuesta, después de
+        # `finalize_response`: la base se fija acá y no depende del router
+        return queryset.using(alias) if alias else queryset
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        _read_alias.set(None)
+        user = getattr(request, 'user', None)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and user is not None
+            and user.is_authenticated
+        ):
+            mark_sticky(user.id)
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,16 @@
+from rest_framework.filters import OrderingFilter
+
+
+class StableOrderingFilter(OrderingFilter):
+    """`OrderingFilter` que desempata por pk.
+
+    Con un campo que se repite (ej. el saldo de los clientes) el orden de los
+    empates queda librado a la base y la paginación por `OFFSET` puede
+    repetir o saltear filas entre una página y la siguiente.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and not any(field.lstrip('-') in ('pk', 'id') for field in ordering):
+            ordering = (*ordering, 'pk')
+        return ordering
@@ -0,0 +1,244 @@
+import csv
+
+from django.core.exceptions import FieldDoesNotExist
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import action
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.serializers import ListSerializer
+
+from core.xlsx import CONTENT_TYPE as XLSX_CONTENT_TYPE, stream_xlsx
+
+
+class SparseFieldsetsMixin:
+    """`?fields=id,title` devuelve sólo esos campos y `?omit=user` los saca.
+
+    Se aplica al serializer raíz (o a cada fila de un listado) en los métodos
+    de lectura; en las escrituras se validan y devuelven todos los campos.
+    Los nombres que no existen se ignoran. Como los campos se filtran antes
+    de armar el queryset, `EagerLoadingSerializerMixin` tampoco lee (`only()`)
+    ni une (`select_related`) lo que se omitió.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        if request is None or request.method not in SAFE_METHODS or not self._is_root():
+            return fields
+        requested = _param_set(request, "fields")
+        omitted = _param_set(request, "omit")
+        return {
+            name: field
+            for name, field in fields.items()
+            if (not requested or name in requested) and name not in omitted
+        }
+
+    def _is_root(self):
+        parent = self.parent
+        return parent is None or (isinstance(parent, ListSerializer) and parent.parent is None)
+
+
+def _param_set(request, name):
+    value = request.query_params.get(name, "")
+    return {part.strip() for part in value.split(",") if part.strip()}
+
+
+class EagerLoadingSerializerMixin:
+    """Mixin para serializers que declaran sus relaciones.
+
+    En el `Meta` del serializer se declaran las relaciones que necesita:
+
+    - `select_related`: FKs que se leen al serializar (ej. `user.razon_social`).
+    - `prefetch_related`: relaciones múltiples.
+
+    Las columnas para `only()` se calculan a partir de los campos del serializer.
+    """
+
+    @classmethod
+    def get_select_related(cls, fields=None):
+        """Relaciones de `Meta.select_related`; con `fields`, sólo las que esos campos leen."""
+        select_related = tuple(getattr(cls.Meta, "select_related", ()))
+        if fields is None:
+            return select_related
+        paths = cls._field_paths(fields)
+        if paths is None:
+            return select_related
+        return tuple(
+            relation for relation in select_related if any(path.startswith(relation + "__") for path in paths)
+        )
+
+    @classmethod
+    def get_prefetch_related(cls):
+        return tuple(getattr(cls.Meta, "prefetch_related", ()))
+
+    @classmethod
+    def get_only_fields(cls, extra_select_related=(), fields=None):
+        """Columnas que usa el serializer (o sus `fields`), o `None` si no se pueden determinar."""
+        if fields is None:
+            fields = cls().fields
+        paths = cls._field_paths(fields)
+        if paths is None:
+            return None
+        only = {cls.Meta.model._meta.pk.name, *paths}
+        # Las relaciones de select_related no pueden quedar diferidas
+        only.update(cls.get_select_related(fields))
+        only.update(extra_select_related)
+        return tuple(sorted(only))
+
+    @classmethod
+    def _field_paths(cls, fields):
+        # un campo con `source="*"` declara las columnas que lee en `source_fields`
+        model = cls.Meta.model
+        paths = set()
+        for field in fields.values():
+            if field.write_only:
+                continue
+            if field.source == "*":
+                source_fields = getattr(field, "source_fields", None)
+                if source_fields is None:
+                    return None
+                paths.update(source_fields)
+                continue
+            path = _field_path(model, field.source_attrs)
+            if path is None:
+                return None
+            paths.add(path)
+        return paths
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, only=True, extra_select_related=(), fields=None):
+        """`fields` son los campos del serializer del request (ver `SparseFieldsetsMixin`)."""
+        select_related = cls.get_select_related(fields) + tuple(extra_select_related)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        prefetch_related = cls.get_prefetch_related()
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        if only:
+            only_fields = cls.get_only_fields(extra_select_related, fields)
+            if only_fields:
+                queryset = queryset.only(*only_fields)
+        return queryset
+
+
+def _field_path(model, attrs):
+    # Traduce `user.razon_social` a `user__razon_social` recorriendo las relaciones
+    parts = []
+    for attr in attrs:
+        if model is None:
+            return None
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        if field.many_to_many or field.one_to_many:
+            return None
+        parts.append(field.name)
+        model = field.related_model
+    return "__".join(parts)
+
+
+class EagerLoadingViewSetMixin:
+    """Aplica el eager loading declarado por el serializer de cada acción.
+
+    Se engancha en `filter_queryset` para que funcione aunque la vista
+    sobreescriba `get_queryset` (scoping por rol). `only()` sólo se aplica en
+    las acciones de lectura, las de escritura cargan el objeto completo.
+    `object_select_related` agrega relaciones sólo en las rutas de detalle, por
+    ejemplo las que lee un `has_object_permission`.
+    """
+
+    eager_loading_only_actions = ("list", "retrieve")
+    object_select_related = ()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer_class = self.get_serializer_class()
+        if hasattr(serializer_class, "setup_eager_loading"):
+            only = getattr(self, "action", None) in self.eager_loading_only_actions
+            extra = self.object_select_related if getattr(self, "detail", False) else ()
+            # los campos que pidió el request (`?fields=`/`?omit=`), no todos los del serializer
+            fields = self.get_serializer().fields if only else None
+            queryset = serializer_class.setup_eager_loading(
+                queryset, only=only, extra_select_related=extra, fields=fields
+            )
+        return queryset
+
+
+class ActionSerializerMixin:
+    """Serializer por acción, ej. `action_serializer_classes = {"list": HonorarioListSerializer}`.
+
+    Las acciones que no figuran usan `serializer_class`.
+    """
+
+    action_serializer_classes = {}
+
+    def get_serializer_class(self):
+        serializer_class = self.action_serializer_classes.get(getattr(self, "action", None))
+        return serializer_class or super().get_serializer_class()
+
+
+class _Echo:
+    """Buffer mínimo para `csv.writer`: devuelve la línea en lugar de guardarla."""
+
+    def write(self, value):
+        return value
+
+
+class ExportMixin:
+    """Acciones `export/` (CSV) y `export/xlsx/` que descargan el listado filtrado en streaming.
+
+    Usan el mismo `get_queryset` (scoping por rol) y los mismos filtros que el
+    listado. Las filas se leen por lotes de `export_chunk_size` con paginación
+    por pk (`WHERE id > último`), así la memoria no crece con el total de filas
+    aun en MySQL, donde el driver no tiene cursores del lado del servidor.
+    """
+
+    export_fields = ()
+    export_chunk_size = 2000
+    export_filename = "export"
+
+    def export_chunks(self):
+        """Lotes de tuplas con los `export_fields` del listado filtrado, en orden de pk.
+
+        El queryset se arma al llamarla, durante la acción: el cuerpo se envía
+        después de `finalize_response` (ej. `ReadReplicaMixin` ya soltó la base).
+        """
+        queryset = self.filter_queryset(self.get_queryset()).order_by("pk")
+
+        def chunks():
+            last_pk = None
+            while True:
+                chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+                chunk = list(chunk.values_list("pk", *self.export_fields)[: self.export_chunk_size])
+                if not chunk:
+                    return
+                last_pk = chunk[-1][0]
+                yield [row[1:] for row in chunk]
+
+        return chunks()
+
+    def export_response(self, content, content_type, extension):
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{self.export_filename}.{extension}"'
+        return response
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        writer = csv.writer(_Echo())
+
+        chunks = self.export_chunks()
+
+        def rows():
+            yield writer.writerow(self.export_fields)
+            for chunk in chunks:
+                yield "".join(writer.writerow(row) for row in chunk)
+
+        return self.export_response(rows(), "text/csv", "csv")
+
+    @action(detail=False, methods=["get"], url_path="export/xlsx", url_name="export-xlsx")
+    def export_xlsx(self, request):
+        return self.export_response(
+            stream_xlsx(self.export_fields, self.export_chunks(), sheet_name=self.export_filename),
+            XLSX_CONTENT_TYPE,
+            "xlsx",
+        )
@@ -0,0 +1,216 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.core.paginator import InvalidPage
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def keyset_filter(queryset, field, value, pk, descending=False):
+    """Filas que siguen a `(value, pk)` en el orden `(field, pk)` (o el inverso si `descending`).
+
+    Se escribe como un rango sobre `field` sin el empate ya recorrido
+    (`field >= value AND NOT (field = value AND id <= pk)`) en lugar del OR
+    equivalente: así el recorrido del índice `(…, field, id)` arranca en
+    `value` aunque el planificador no combine las dos ramas de un OR.
+    """
+    if descending:
+        return queryset.filter(**{f'{field}__lte': value}).exclude(**{field: value, 'pk__gte': pk})
+    return queryset.filter(**{f'{field}__gte': value}).exclude(**{field: value, 'pk__lte': pk})
+
+
+class StandardResultsSetPagination(PageNumberPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+
+
+class OptionalCursorPagination(StandardResultsSetPagination):
+    """Paginación por página con modo cursor (keyset) opcional.
+
+    Por defecto se comporta como `StandardResultsSetPagination`. Si el request
+    trae `?pagination=cursor` o un `?cursor=`, pagina por la clave compuesta
+    (campo de ordenamiento, id) con `keyset_filter` en lugar de
+    `OFFSET`, así que el costo no depende de la profundidad de la página.
+    En modo cursor el `COUNT(*)` sólo se ejecuta si se pide con `?count=true`.
+    """
+
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    mode_query_param = 'pagination'
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_cursor = (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.count = None
+        if self.wants_count(request):
+            self.count = queryset.count()
+        return self.set_cursor_page(list(self.cursor_queryset(queryset, request)[:page_size + 1]), page_size)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Igual que `paginate_queryset` pero con `acount()` e iteración async (ver `AsyncViewSetMixin`)."""
+        self.use_cursor = (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        if not self.use_cursor:
+            paginator = self.django_paginator_class(queryset, page_size)
+            # `count` es un cached_property del Paginator: se precarga con acount()
+            paginator.count = await queryset.acount()
+            page_number = self.get_page_number(request, paginator)
+            try:
+                self.page = paginator.page(page_number)
+            except InvalidPage as exc:
+                raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+            self.page.object_list = [obj async for obj in self.page.object_list]
+            if paginator.num_pages > 1 and self.template is not None:
+                self.display_page_controls = True
+            return list(self.page)
+
+        self.count = None
+        if self.wants_count(request):
+            self.count = await queryset.acount()
+        rows = [obj async for obj in self.cursor_queryset(queryset, request)[:page_size + 1]]
+        return self.set_cursor_page(rows, page_size)
+
+    def wants_count(self, request):
+        return request.query_params.get(self.count_query_param) in ('1', 'true')
+
+    def cursor_queryset(self, queryset, request):
+        self.order_field, self.descending = self.get_cursor_ordering(queryset)
+        order = (self.order_field, 'pk')
+        if self.descending:
+            order = tuple('-' + name for name in order)
+
+        queryset = queryset.order_by(*order)
+        cursor = self.decode_cursor(request, queryset)
+        if cursor is not None:
+            queryset = keyset_filter(queryset, self.order_field, *cursor, descending=self.descending)
+        return queryset
+
+    def set_cursor_page(self, rows, page_size):
+        self.has_next = len(rows) > page_size
+        self.page_rows = rows[:page_size]
+        return self.page_rows
+
+    def get_cursor_ordering(self, queryset):
+        # Se respeta el primer campo de `ordering` (OrderingFilter) y se desempata por pk
+        ordering = [o for o in queryset.query.order_by if isinstance(o, str)]
+        if not ordering:
+            return 'pk', False
+        first = ordering[0]
+        return first.lstrip('-'), first.startswith('-')
+
+    def encode_cursor(self, obj):
+        value = obj
+        for attr in self.order_field.split('__'):
+            value = getattr(value, attr)
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        payload = json.dumps([value, obj.pk], default=str).encode()
+        return base64.urlsafe_b64encode(payload).decode()
+
+    def decode_cursor(self, request, queryset):
+        """`(valor, pk)` del cursor, convertidos con `to_python()` de los campos del queryset.
+
+        Un cursor mal formado (o editado a mano) es un 404, como en el
+        `CursorPagination` de DRF, y nunca llega al `.filter()`.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if not isinstance(cursor, list) or len(cursor) != 2 or None in cursor:
+                raise ValueError(cursor)
+            value, pk = cursor
+            return self.get_cursor_field(queryset).to_python(value), queryset.model._meta.pk.to_python(pk)
+        except (TypeError, ValueError, DjangoValidationError, FieldDoesNotExist):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_cursor_field(self, queryset):
+        # el orden puede ser una anotación, ej. `search_rank` de apps.search
+        annotation = queryset.query.annotations.get(self.order_field)
+        if annotation is not None:
+            return annotation.output_field
+        model = queryset.model
+        field = model._meta.pk
+        for name in self.order_field.split('__'):
+            field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+            model = field.related_model or model
+        return field
+
+    def get_next_link(self):
+        if not self.use_cursor:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        url = replace_query_param(url, self.mode_query_param, 'cursor')
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page_rows[-1]))
+
+    def get_previous_link(self):
+        if not self.use_cursor:
+            return super().get_previous_link()
+        return None
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        fields = [('next', self.get_next_link()), ('results', data)]
+        if self.count is not None:
+            fields.insert(0, ('count', self.count))
+        return Response(OrderedDict(fields))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['required'] = ['results']
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters += [
+            {
+                'name': self.mode_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Use `cursor` for keyset pagination.',
+                'schema': {'type': 'string', 'enum': ['page', 'cursor']},
+            },
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Cursor returned in `next` (keyset mode).',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Include the total count in keyset mode.',
+                'schema': {'type': 'boolean'},
+            },
+        ]
+        return parameters
@@ -0,0 +1,14 @@
+from rest_framework.parsers import BaseParser
+
+
+class ChunkParser(BaseParser):
+    """Deja el cuerpo del request sin leer para poder copiarlo por bloques.
+
+    `request.data` queda como el stream crudo, así un chunk de una subida no se
+    carga entero en memoria ni pasa por los upload handlers de Django.
+    """
+
+    media_type = 'application/octet-stream'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return stream
@@ -0,0 +1,61 @@
+from rest_framework import serializers
+
+
+def get_request_cache(request):
+    """Diccionario de objetos compartido durante un request.
+
+    Se guarda en el `HttpRequest` de Django, así lo ven tanto los permisos como
+    los serializers y la vista aunque cada uno reciba el `Request` de DRF.
+    """
+    raw = getattr(request, "_request", request)
+    cache = getattr(raw, "_object_cache", None)
+    if cache is None:
+        cache = raw._object_cache = {}
+    return cache
+
+
+def get_cached_object(request, queryset, pk):
+    """Devuelve `queryset.get(pk=pk)` consultando la base una sola vez por request.
+
+    El usuario autenticado se resuelve desde `request.user` sin consulta y los
+    objetos que trajo un `select_related` quedan también en la caché (el
+    usuario de un honorario leído por el permiso lo reusa el serializer).
+    Propaga `DoesNotExist`/`ValueError` igual que `get()`.
+    """
+    model = queryset.model
+    user = getattr(request, "user", None)
+    if isinstance(user, model) and str(user.pk) == str(pk):
+        return user
+
+    key = (model._meta.label, str(pk))
+    cache = get_request_cache(request)
+    if key not in cache:
+        cache[key] = queryset.get(pk=pk)
+        for related in cache[key]._state.fields_cache.values():
+            if related is not None:
+                cache.setdefault((related._meta.label, str(related.pk)), related)
+    return cache[key]
+
+
+class RequestCachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """`PrimaryKeyRelatedField` que reutiliza los objetos ya cargados en el request.
+
+    Sólo usa la caché cuando el queryset es el de todos los objetos del modelo;
+    con querysets filtrados se comporta como el campo de DRF.
+    """
+
+    def to_internal_value(self, data):
+        request = self.context.get("request")
+        queryset = self.get_queryset()
+        if request is None or queryset.query.where:
+            return super().to_internal_value(data)
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return get_cached_object(request, queryset, data)
+        except queryset.model.DoesNotExist:
+            self.fail("does_not_exist", pk_value=data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
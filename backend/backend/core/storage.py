@@ -0,0 +1,95 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+BLOB_DIR = 'blobs'
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Guarda cada archivo con el nombre del sha256 de su contenido.
+
+    `blobs/ab/cd/abcd….pdf`: dos subidas con el mismo contenido terminan en el
+    mismo archivo y se escribe una sola vez. El nombre que se pidió sólo
+    aporta la extensión. Los archivos viejos (`honorarios/…`, `tickets/…`)
+    siguen funcionando porque la ubicación es la misma de `default_storage`.
+    Quién usa cada blob lo lleva `PdfBlob.refcount` (ver apps/honorarios/blobs.py):
+    esta clase nunca borra un blob compartido por su cuenta.
+    """
+
+    block_size = 64 * 1024
+    # un archivo puede ser de varias filas: quien deshace una escritura no lo
+    # borra, los blobs sin uso los recolecta `collect_pdf_blobs`
+    shared_files = True
+
+    def blob_name(self, digest, extension):
+        return '/'.join((BLOB_DIR, digest[:2], digest[2:4], digest + extension))
+
+    @staticmethod
+    def is_blob(name):
+        return bool(name) and name.startswith(BLOB_DIR + '/')
+
+    @staticmethod
+    def digest(name):
+        return os.path.splitext(os.path.basename(name))[0]
+
+    def get_available_name(self, name, max_length=None):
+        # el nombre final lo decide el contenido en `_save`
+        return name
+
+    def _save(self, name, content):
+        extension = os.path.splitext(name)[1].lower()
+        directory = self.path(BLOB_DIR)
+        os.makedirs(directory, exist_ok=True)
+        # se hashea mientras se copia: una sola pasada sobre el archivo
+        digest = hashlib.sha256()
+        handle, temporary = tempfile.mkstemp(dir=directory, suffix='.part')
+        try:
+            with os.fdopen(handle, 'wb') as destination:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks(self.block_size):
+                    digest.update(chunk)
+                    destination.write(chunk)
+            return self._store(temporary, digest.hexdigest(), extension)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    def ingest(self, path, extension='.pdf', digest=None):
+        """Mueve a su blob un archivo que ya está en disco (ej. una subida por partes).
+
+        Con `digest` (de `file_digest`) no se vuelve a leer: sólo se renombra.
+        """
+        return self._store(path, digest or self.file_digest(path), extension)
+
+    def file_digest(self, path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as source:
+            while block := source.read(self.block_size):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _store(self, path, digest, extension):
+        name = self.blob_name(digest, extension)
+        target = self.path(name)
+        if os.path.exists(target):
+            # duplicado: se descarta la copia nueva; el mtime marca el blob como
+            # recién usado para que el recolector respete el período de gracia
+            os.utime(target)
+            os.remove(path)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            # mkstemp crea el archivo con 0600
+            os.chmod(path, self.file_permissions_mode or 0o644)
+            # atómico: una escritura concurrente del mismo contenido deja el mismo archivo
+            os.replace(path, target)
+        return name
+
+
+def pdf_storage():
+    """Storage de los PDFs de honorarios y tickets (callable: no se evalúa en las migraciones)."""
+    return ContentAddressedStorage()
@@ -0,0 +1,106 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.http import http_date, parse_http_date_safe
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def serve_protected_file(request, field_file, as_attachment=False, filename=None):
+    """Entrega un archivo de MEDIA_ROOT ya autorizado por la vista.
+
+    Según `PROTECTED_MEDIA_SERVER` delega la transferencia al proxy
+    (`X-Accel-Redirect` en nginx, `X-Sendfile` en apache) o la hace Django con
+    `FileResponse`, soportando `Range`, `ETag`/`If-None-Match` y
+    `Last-Modified`/`If-Modified-Since`. `filename` es el nombre que ve el
+    usuario (los blobs se guardan con el hash de su contenido).
+    """
+    filename = filename or os.path.basename(field_file.name)
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    disposition = "attachment" if as_attachment else "inline"
+    server = settings.PROTECTED_MEDIA_SERVER
+
+    if server in ("nginx", "apache"):
+        response = HttpResponse(content_type=content_type)
+        if server == "nginx":
+            response["X-Accel-Redirect"] = quote(settings.PROTECTED_MEDIA_INTERNAL_URL + field_file.name)
+        else:
+            response["X-Sendfile"] = field_file.path
+    else:
+        response = _file_response(request, field_file.path, content_type)
+
+    response["Content-Disposition"] = f"{disposition}; filename*=UTF-8''{quote(filename)}"
+    return response
+
+
+def _file_response(request, path, content_type):
+    stat = os.stat(path)
+    etag = f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+    last_modified = int(stat.st_mtime)
+
+    if_none_match = request.headers.get("If-None-Match")
+    if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+    if (if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]) or (
+        not if_none_match and if_modified_since and if_modified_since >= last_modified
+    ):
+        response = HttpResponse(status=304)
+    else:
+        response = _ranged_response(request, path, stat.st_size, etag, content_type)
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Accept-Ranges"] = "bytes"
+    # contenido privado: el navegador lo guarda pero revalida con el ETag
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _ranged_response(request, path, size, etag, content_type):
+    match = RANGE_RE.match(request.headers.get("Range", ""))
+    if_range = request.headers.get("If-Range")
+    if not match or (if_range and if_range != etag) or not _valid_range(*match.groups()):
+        return FileResponse(open(path, "rb"), content_type=content_type)
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # bytes=-N: los últimos N bytes
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start >= size:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    length = end - start + 1
+    handle = open(path, "rb")
+    handle.seek(start)
+    response = FileResponse(_limited(handle, length), status=206, content_type=content_type)
+    response["Content-Length"] = str(length)
+    response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return response
+
+
+def _valid_range(first, last):
+    # `bytes=5-2` no es un rango insatisfacible sino mal formado: se ignora (RFC 9110 §14.1.1)
+    if first and last:
+        return int(first) <= int(last)
+    return bool(first or last)
+
+
+def _limited(handle, length, block_size=64 * 1024):
+    try:
+        while length > 0:
+            block = handle.read(min(block_size, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+    finally:
+        handle.close()
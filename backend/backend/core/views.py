@@ -0,0 +1,44 @@
+from drf_spectacular.utils import extend_schema
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.users.permissions import IsAdmin
+from core.batch import BatchSerializer, run_batch
+from core.cache import get_stats
+
+
+@extend_schema(tags=["Cache"])
+class CacheStatsView(APIView):
+    """
+        Hits/misses de la caché de respuestas por namespace.
+        - Sólo `admin`.
+    """
+    permission_classes = [IsAuthenticated & IsAdmin]
+    namespaces = ('honorarios', 'payments', 'users')
+
+    def get(self, request):
+        stats = get_stats(self.namespaces)
+        for values in stats.values():
+            total = values['hit'] + values['miss']
+            values['hit_ratio'] = round(values['hit'] / total, 3) if total else None
+        return Response(stats)
+
+
+@extend_schema(tags=["Batch"], request=BatchSerializer)
+class BatchView(APIView):
+    """
+        Varios GET de la API en un solo request (ej. la carga del dashboard).
+        - Body: `{"requests": [{"id": "honorarios", "path": "/api/v1/honorario/?page_size=10",
+          "headers": {"If-None-Match": "..."}}]}`; sólo las acciones que cada vista
+          declara en `batch_actions`.
+        - El token se valida una vez y los sub-requests comparten la caché de objetos.
+        - Devuelve `{"responses": [{"id", "status", "headers", "body"}]}` en el mismo
+          orden; cada sub-request tiene su status (un 403 o 404 no corta el batch).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({'responses': run_batch(request, serializer.validated_data['requests'])})
@@ -0,0 +1,44 @@
+from rest_framework import viewsets
+
+from core.async_views import AsyncViewSetMixin
+from core.cache import CachedResponseMixin
+from core.conditional import ConditionalGetMixin
+from core.db_router import ReadReplicaMixin
+from core.mixins import ActionSerializerMixin, EagerLoadingViewSetMixin
+
+
+class ReadPathModelViewSet(
+    ReadReplicaMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    ActionSerializerMixin,
+    EagerLoadingViewSetMixin,
+    AsyncViewSetMixin,
+    viewsets.ModelViewSet,
+):
+    """`ModelViewSet` con el camino de lectura de la API: réplica, 304, caché de
+    respuestas, serializer por acción, eager loading y versión async.
+
+    Cada mixin sobreescribe métodos de DRF y llama a `super()`, así que el orden
+    es parte del comportamiento (lo fija `ReadPathViewSetTests`):
+
+    1. `ReadReplicaMixin` va primero: elige la base en `initial`, antes de los
+       permisos y de cualquier consulta, y la suelta en `finalize_response`
+       después de todo lo demás. Su `filter_queryset` envuelve al de los
+       siguientes y fija `.using()` sobre el queryset ya terminado.
+    2. `ConditionalGetMixin` antes de la caché: responde 304 con los
+       validadores sin leer ni serializar la respuesta, y agrega ETag y
+       Last-Modified también a los HIT.
+    3. `CachedResponseMixin` guarda el cuerpo que arman las acciones de abajo.
+    4. `ActionSerializerMixin` y `EagerLoadingViewSetMixin`: el serializer de
+       la acción decide los `select_related`/`only()` que se aplican después
+       de los filtros de DRF.
+    5. `AsyncViewSetMixin` justo antes de `ModelViewSet`: sus `alist`,
+       `aretrieve` y `acreate` son las acciones base que los mixins de arriba
+       envuelven con `super()`, igual que `list`/`retrieve` de DRF.
+
+    Las subclases declaran `cache_namespaces` (el primero nombra la caché) y,
+    si corresponde, `replica_actions`, `action_serializer_classes`,
+    `object_select_related` y `batch_actions` (ver `core.batch`). Los mixins
+    que agregan rutas, como `ExportMixin`, van antes de esta clase.
+    """
@@ -0,0 +1,46 @@
+# Configuración de gunicorn para producción: `gunicorn -c gunicorn.conf.py`
+#
+# SERVER_MODE=wsgi  workers gthread (2 * CPUs + 1) con GUNICORN_THREADS threads cada uno.
+#                   Es el modo de mayor throughput para la API (ver benchmark_api).
+# SERVER_MODE=asgi  un worker de uvicorn por CPU: vistas async y stream SSE de
+#                   notificaciones con conexiones abiertas.
+# WEB_CONCURRENCY pisa la cantidad de workers calculada.
+import multiprocessing
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings_production")
+
+mode = os.getenv("SERVER_MODE", "wsgi")
+cpus = multiprocessing.cpu_count()
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+if mode == "asgi":
+    wsgi_app = "config.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+    workers = int(os.getenv("WEB_CONCURRENCY", cpus))
+else:
+    wsgi_app = "config.wsgi:application"
+    worker_class = "gthread"
+    workers = int(os.getenv("WEB_CONCURRENCY", cpus * 2 + 1))
+    threads = int(os.getenv("GUNICORN_THREADS", 4))
+# lo leen los settings (check users.E001: la denylist de tokens tiene que ser compartida)
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+# se carga Django una vez en el master y los workers lo comparten (copy-on-write)
+preload_app = True
+# recicla workers periódicamente para acotar el crecimiento de memoria
+max_requests = 2000
+max_requests_jitter = 200
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+backlog = 2048
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+
+
+def on_starting(server):
+    # gunicorn no corre los system checks de Django (manage.py sí): un error aborta el arranque
+    from django.core.management import call_command
+
+    call_command("check")
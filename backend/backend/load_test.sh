@@ -0,0 +1,27 @@
+#!/bin/sh
+# Prueba de carga reproducible de los endpoints principales con el perfil de producción.
+#
+#   DB_ENGINE=sqlite ./load_test.sh          # base SQLite local (db.sqlite3)
+#   ./load_test.sh                           # MySQL configurado en .env
+#
+# Variables: SERVER_MODE (wsgi|asgi), CONCURRENCY, DURATION, HONORARIOS, PORT.
+# Los datos salen de seed_honorarios con semilla fija, así dos corridas son comparables.
+set -e
+
+export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:-config.settings_production}"
+PORT="${PORT:-8001}"
+PIDFILE="$(mktemp -u /tmp/appestudio-loadtest.XXXXXX).pid"
+
+python manage.py migrate --noinput -v0
+if [ -z "$(python manage.py shell -v0 -c "from apps.users.models import User; print(User.objects.filter(username__startswith='seed42-').exists() or '')")" ]; then
+    python manage.py seed_honorarios --seed 42 --clients 200 --honorarios "${HONORARIOS:-50000}" --payments 20000
+    python manage.py rebuild_client_balances
+fi
+python manage.py shell -v0 -c "from apps.users.models import User; User.objects.get_or_create(username='loadtest', defaults={'role': 'admin', 'email': 'loadtest@example.com'})"
+
+GUNICORN_ACCESS_LOG=/dev/null gunicorn -c gunicorn.conf.py --bind "127.0.0.1:$PORT" --pid "$PIDFILE" --daemon
+trap 'kill "$(cat "$PIDFILE")"' EXIT
+sleep 3
+
+python manage.py benchmark_api --main-endpoints "http://127.0.0.1:$PORT" --username loadtest \
+    --concurrency "${CONCURRENCY:-100}" --duration "${DURATION:-30}"
@@ -0,0 +1,23 @@
+import axios from "axios";
+import attachAuthInterceptors from './attachAuthInterceptors'
+
+const API_URL = import.meta.env.VITE_API_URL;
+const batchApi = axios.create({ baseURL: `${API_URL}/api/batch/` });
+attachAuthInterceptors(batchApi);
+
+// Several GETs in one round trip: requests is [{ id, path, headers }], e.g.
+// { id: 'honorarios', path: '/api/v1/honorario/?page_size=10' }. Only
+// If-None-Match/If-Modified-Since are accepted in headers. Resolves to
+// { [id]: { status, headers, body } }; each entry has its own status (403/404/304).
+export const getBatch = (requests) => batchApi.post('', { requests }).then(({ data }) =>
+    Object.fromEntries(data.responses.map((response, index) => [response.id ?? String(index), response]))
+)
+
+// What the admin/employee dashboard needs on load
+export const getDashboard = () => getBatch([
+    { id: 'honorarios', path: '/api/v1/honorario/?page_size=10' },
+    { id: 'payments', path: '/api/v1/payment/?page_size=10' },
+    { id: 'clients', path: '/api/v1/clients/?page_size=10' },
+    { id: 'unread', path: '/api/v1/notifications/unread_count/' },
+    { id: 'profile', path: '/api/profile/' },
+])
@@ -6,6 +6,10 @@ const honorariosApi = axios.create({ baseURL: `${API_URL}/api/v1/honorario/` });
 attachAuthInterceptors(honorariosApi);
 
 // Allow passing query params (status, user, page, page_size, search, etc.)
+// `search` matches the title by word prefix and returns results by relevance unless `ordering` is given
+// For keyset paging pass { pagination: 'cursor' } and then follow the `next` URL (or its `cursor` param)
+// Lists and details carry an ETag: the browser revalidates them on its own (If-None-Match) and an
+// unchanged response comes back as a 304 that axios sees as the cached 200, with no body over the wire
 export const getHonorarios = (params) => honorariosApi.get('', { params })
 export const getHonorario = (id) => honorariosApi.get(`${id}`)
 // createHonorario expects either an object or FormData; when sending FormData axios will set multipart headers
@@ -13,6 +17,10 @@ export const createHonorario = (honorario) => honorariosApi.post('', honorario)
 export const updateHonorario = (id, honorario) => honorariosApi.put(`/${id}/`, honorario)
 export const partialUpdateHonorario = (id, honorario) => honorariosApi.patch(`/${id}/`, honorario)
 export const deleteHonorario = (id) => honorariosApi.delete(`/${id}/`)
+// Each honorario/payment carries `thumbnail_url` and `preview_url` (JPEG of the first page, a few KB)
+// so lists don't need to open the PDF; they require the auth header, so fetch them as a blob
+// (404 means the worker has not generated it yet: show the file icon instead)
+export const getPreview = (url) => honorariosApi.get(url, { responseType: 'blob' })
 
 
 const paymentApi = axios.create({ baseURL: `${API_URL}/api/v1/payment/` });
@@ -0,0 +1,52 @@
+import axios from "axios";
+import attachAuthInterceptors from './attachAuthInterceptors'
+
+const API_URL = import.meta.env.VITE_API_URL;
+const notificationsApi = axios.create({ baseURL: `${API_URL}/api/v1/notifications/` });
+attachAuthInterceptors(notificationsApi);
+
+// Pass { unread: true } to list only unread notifications
+export const getNotifications = (params) => notificationsApi.get('', { params })
+export const getUnreadCount = () => notificationsApi.get('unread_count/')
+export const markNotificationRead = (id) => notificationsApi.post(`/${id}/read/`)
+export const markAllNotificationsRead = () => notificationsApi.post('read_all/')
+
+// Server-Sent Events stream: calls onNotification for each new notification and onReset
+// when the server dropped queued events (refetch the list). Returns a function that closes it.
+// EventSource cannot send headers and a token in the URL would end up in access logs, so the
+// stream is opened with a single-use ticket. A spent ticket can't be reused by the browser's own
+// reconnect: when the connection drops (or the token expired) a new ticket is requested, which
+// also refreshes the access token through the interceptors.
+export const subscribeNotifications = (onNotification, onReset) => {
+    let source = null;
+    let closed = false;
+    let lastEventId = '';
+    const reconnect = (delay) => {
+        if (source) source.close();
+        if (!closed) setTimeout(connect, delay);
+    };
+    const connect = async () => {
+        let ticket;
+        try {
+            ticket = (await notificationsApi.post('stream_ticket/')).data.ticket;
+        } catch (error) {
+            reconnect(3000);
+            return;
+        }
+        if (closed) return;
+        const params = new URLSearchParams({ ticket, last_event_id: lastEventId });
+        source = new EventSource(`${API_URL}/api/v1/notifications/stream/?${params}`);
+        source.addEventListener('notification', (event) => {
+            lastEventId = event.lastEventId;
+            onNotification(JSON.parse(event.data));
+        });
+        source.addEventListener('reset', () => onReset && onReset());
+        source.addEventListener('expired', () => reconnect(0));
+        source.onerror = () => reconnect(3000);
+    };
+    connect();
+    return () => {
+        closed = true;
+        if (source) source.close();
+    };
+}
@@ -29,6 +29,7 @@ const clientApi = axios.create({ baseURL: `${API_URL}/api/v1/clients/` });
 attachAuthInterceptors(clientApi);
 
 // Keep previous signatures but we rely on interceptors for Authorization.
+// `{ search: 'perez 30-7123' }` matches razon_social, CUIT, username or email, ranked by relevance
 export const getClients = (params) => clientApi.get('', { params })
 // Fetch a full url (useful for paginated `next`/`previous` which may be absolute URLs)
 export const getClientsByUrl = (url, token) => {